@@ -12,8 +12,16 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
-import pbr.version
 
+def __getattr__(name):
+    # pbr.version pulls in setuptools, which is slow to import, and this
+    # package is imported on every openstack CLI run through the plugin
+    # entry point, so only compute the version when it is asked for.
+    if name == '__version__':
+        import pbr.version
 
-__version__ = pbr.version.VersionInfo(
-    'python-cyborgclient').version_string()
+        version = pbr.version.VersionInfo(
+            'python-cyborgclient').version_string()
+        globals()['__version__'] = version
+        return version
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
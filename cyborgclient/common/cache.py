@@ -0,0 +1,142 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""On-disk caches shared between runs of the accelerator commands."""
+
+import hashlib
+import json
+import logging
+import os
+import stat
+import tempfile
+import time
+
+LOG = logging.getLogger(__name__)
+
+
+def cache_dir():
+    """Return the directory holding the cyborgclient caches.
+
+    ``$OS_ACCELERATOR_CACHE_DIR`` if set, else ``cyborgclient`` under
+    ``$XDG_CACHE_HOME`` (``~/.cache`` by default).
+    """
+    path = os.environ.get('OS_ACCELERATOR_CACHE_DIR')
+    if path:
+        return path
+    base = (os.environ.get('XDG_CACHE_HOME') or
+            os.path.join(os.path.expanduser('~'), '.cache'))
+    return os.path.join(base, 'cyborgclient')
+
+
+def make_key(*parts):
+    """Build a cache key, safe to use as a file name, from ``parts``."""
+    data = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+class FileCache(object):
+    """A directory of JSON entries which expire at a given time.
+
+    The directory is only accessible by the current user and every entry is
+    written to a temporary file first and then renamed, so concurrent runs
+    never see a partially written entry.
+
+    With ``max_entries``, the least recently used entries are evicted when
+    more are stored. Reading an entry marks it as used.
+    """
+
+    def __init__(self, namespace, directory=None, max_entries=None):
+        self.path = os.path.join(directory or cache_dir(), namespace)
+        self.max_entries = max_entries
+
+    def _entry_path(self, key):
+        return os.path.join(self.path, key + '.json')
+
+    def get(self, key):
+        """Return the value stored under ``key``, or None if expired."""
+        try:
+            with open(self._entry_path(key)) as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            LOG.debug('Ignoring unreadable cache entry %s: %s', key, e)
+            return None
+
+        expires_at = entry.get('expires_at')
+        if expires_at is not None and expires_at <= time.time():
+            self.delete(key)
+            return None
+        if self.max_entries:
+            try:
+                os.utime(self._entry_path(key))
+            except OSError:
+                pass
+        return entry.get('value')
+
+    def set(self, key, value, expires_at=None):
+        """Store ``value`` under ``key`` until ``expires_at`` (epoch)."""
+        os.makedirs(self.path, mode=0o700, exist_ok=True)
+        if stat.S_IMODE(os.stat(self.path).st_mode) & 0o077:
+            os.chmod(self.path, 0o700)
+
+        # mkstemp creates the file readable and writable by its owner only.
+        fd, tmp_path = tempfile.mkstemp(dir=self.path, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump({'expires_at': expires_at, 'value': value}, f)
+            os.replace(tmp_path, self._entry_path(key))
+        except BaseException:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            raise
+        if self.max_entries:
+            self._evict()
+
+    def _entries(self):
+        try:
+            names = os.listdir(self.path)
+        except FileNotFoundError:
+            return []
+        return [os.path.join(self.path, name) for name in names
+                if name.endswith('.json')]
+
+    def _evict(self):
+        entries = []
+        for path in self._entries():
+            try:
+                entries.append((os.stat(path).st_mtime, path))
+            except FileNotFoundError:
+                pass
+        entries.sort()
+        for _mtime, path in entries[:len(entries) - self.max_entries]:
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+
+    def delete(self, key):
+        try:
+            os.unlink(self._entry_path(key))
+        except FileNotFoundError:
+            pass
+
+    def clear(self):
+        """Delete every entry."""
+        for path in self._entries():
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
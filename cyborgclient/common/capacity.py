@@ -0,0 +1,236 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Free and allocated accelerators of the cloud.
+
+The devices, deployables and accelerator_requests are listed once, in
+parallel, with :mod:`cyborgclient.common.raw`. Hosts, models and device
+profiles are interned to small integer codes as the records arrive, and
+the accelerators are counted in arrays indexed by those codes:
+
+* deployable ``num_accelerators`` -> its device (``device_id``)
+* bound accelerator_request -> the device of its deployable
+  (``device_rp_uuid``), or its ``hostname`` if the deployable is unknown
+* device -> its host and its model
+
+so the work is a few array additions per record and memory grows with
+the number of devices rather than with the raw records.
+"""
+
+import array
+import collections
+import itertools
+
+from cyborgclient.common import metrics
+from cyborgclient.common import raw
+from cyborgclient.common import resources
+from cyborgclient.common import utils
+
+GROUPS = ('host', 'model', 'device_profile')
+
+COLUMNS = {
+    'host': ('hostname', 'devices', 'total', 'allocated', 'free'),
+    'model': ('vendor', 'model', 'hosts', 'devices', 'total', 'allocated',
+              'free'),
+    'device_profile': ('device_profile_name', 'hosts', 'requested',
+                       'allocated'),
+}
+
+# Columns naming the group of a row.
+KEY_COLUMNS = {
+    'host': ('hostname',),
+    'model': ('vendor', 'model'),
+    'device_profile': ('device_profile_name',),
+}
+
+
+def _zeros(size):
+    return array.array('q', bytes(8 * size))
+
+
+def _sum_by(codes, group, values):
+    # Add up values per code, group holding the code of each position.
+    sums = _zeros(len(codes))
+    for code, value in zip(group, values):
+        sums[code] += value
+    return sums
+
+
+def _intern(codes, key):
+    code = codes.get(key)
+    if code is None:
+        code = codes[key] = len(codes)
+    return code
+
+
+class _Devices(object):
+    """The devices, as the codes of their host and model."""
+
+    def __init__(self, records):
+        self.positions = {}
+        self.hosts = {}
+        self.models = {}
+        self.host = array.array('q')
+        self.model = array.array('q')
+        for device in records:
+            self.positions[device.get('id')] = len(self.host)
+            self.host.append(_intern(self.hosts, device.get('hostname')))
+            self.model.append(_intern(self.models, (device.get('vendor'),
+                                                    device.get('model'))))
+
+
+class _Deployables(object):
+    """The accelerators of the deployables and their device, by rp_uuid."""
+
+    def __init__(self, records):
+        self.accelerators = collections.Counter()
+        self.device_ids = {}
+        for deployable in records:
+            device_id = deployable.get('device_id')
+            self.accelerators[device_id] += int(
+                deployable.get('num_accelerators') or 0)
+            if deployable.get('rp_uuid'):
+                self.device_ids[deployable['rp_uuid']] = device_id
+
+
+class _AcceleratorRequests(object):
+    """The bound accelerator_requests per rp_uuid, and per profile."""
+
+    def __init__(self, records):
+        self.by_rp = collections.Counter()
+        self.by_host = collections.Counter()
+        self.profiles = {}
+        self.requested = array.array('q')
+        self.allocated = array.array('q')
+        # (profile, hostname) of the bound accelerator_requests.
+        self.profile_hosts = set()
+        for arq in records:
+            name = arq.get('device_profile_name')
+            profile = self.profiles.get(name)
+            if profile is None:
+                profile = self.profiles[name] = len(self.requested)
+                self.requested.append(0)
+                self.allocated.append(0)
+            self.requested[profile] += 1
+            if arq.get('state') != metrics.IN_USE_STATE:
+                continue
+            self.allocated[profile] += 1
+            hostname = arq.get('hostname')
+            self.profile_hosts.add((profile, hostname))
+            if arq.get('device_rp_uuid'):
+                self.by_rp[arq['device_rp_uuid'], hostname] += 1
+            else:
+                self.by_host[hostname] += 1
+
+
+class Capacity(object):
+    """The accelerators of the cloud counted per device.
+
+    Built by :func:`count` or :func:`collect`.
+    """
+
+    def __init__(self, devices, deployables, arqs):
+        self._devices = devices
+        self._arqs = arqs
+        total = _zeros(len(devices.host))
+        allocated = _zeros(len(devices.host))
+        positions = devices.positions
+
+        # Accelerators of unknown devices, and accelerator_requests bound
+        # to unknown deployables, are only counted on their host.
+        self._host_total = collections.Counter()
+        self._host_allocated = collections.Counter(arqs.by_host)
+        for device_id, count in deployables.accelerators.items():
+            position = positions.get(device_id)
+            if position is None:
+                self._host_total[None] += count
+            else:
+                total[position] += count
+        for (rp_uuid, hostname), count in arqs.by_rp.items():
+            position = positions.get(deployables.device_ids.get(rp_uuid))
+            if position is None:
+                self._host_allocated[hostname] += count
+            else:
+                allocated[position] += count
+        self._total = total
+        self._allocated = allocated
+
+    def per_host(self):
+        """Yield the rows of :data:`COLUMNS` ``host``."""
+        devices = self._devices
+        hosts = dict(devices.hosts)
+        for hostname in list(self._host_total) + list(self._host_allocated):
+            _intern(hosts, hostname)
+        count = _sum_by(hosts, devices.host, itertools.repeat(1))
+        total = _sum_by(hosts, devices.host, self._total)
+        allocated = _sum_by(hosts, devices.host, self._allocated)
+        for hostname, code in hosts.items():
+            host_total = total[code] + self._host_total[hostname]
+            host_allocated = allocated[code] + self._host_allocated[hostname]
+            yield (hostname, count[code], host_total, host_allocated,
+                   host_total - host_allocated)
+
+    def per_model(self):
+        """Yield the rows of :data:`COLUMNS` ``model``.
+
+        accelerator_requests bound to unknown deployables are left out.
+        """
+        devices = self._devices
+        count = _sum_by(devices.models, devices.model, itertools.repeat(1))
+        total = _sum_by(devices.models, devices.model, self._total)
+        allocated = _sum_by(devices.models, devices.model, self._allocated)
+        hosts = [set() for _ in devices.models]
+        for model, host in zip(devices.model, devices.host):
+            hosts[model].add(host)
+        for (vendor, model), code in devices.models.items():
+            yield (vendor, model, len(hosts[code]), count[code],
+                   total[code], allocated[code],
+                   total[code] - allocated[code])
+
+    def per_device_profile(self):
+        """Yield the rows of :data:`COLUMNS` ``device_profile``."""
+        arqs = self._arqs
+        hosts = _sum_by(arqs.profiles,
+                        (profile for profile, _ in arqs.profile_hosts),
+                        itertools.repeat(1))
+        for name, code in arqs.profiles.items():
+            yield (name, hosts[code],
+                   arqs.requested[code], arqs.allocated[code])
+
+    def rows(self, group):
+        """Yield the rows of :data:`COLUMNS` ``group``."""
+        return getattr(self, 'per_' + group)()
+
+
+def count(devices, deployables, accelerator_requests):
+    """Count iterables of device, deployable and accelerator_request records.
+
+    :returns: a :class:`Capacity`.
+    """
+    return Capacity(_Devices(devices), _Deployables(deployables),
+                    _AcceleratorRequests(accelerator_requests))
+
+
+def collect(acc_client):
+    """List the devices, deployables and accelerator_requests once.
+
+    :returns: a :class:`Capacity`.
+    """
+    readers = (
+        (resources.Device, _Devices),
+        (resources.Deployable, _Deployables),
+        (resources.AcceleratorRequest, _AcceleratorRequests),
+    )
+    return Capacity(*utils.concurrent_map(
+        lambda item: item[1](raw.list_records(acc_client, item[0])),
+        readers, len(readers)))
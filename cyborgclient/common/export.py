@@ -0,0 +1,245 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Export of the accelerator inventory to files with typed columns.
+
+Each collection is written to its own CSV, Parquet or Arrow IPC file. The
+records are read from the API pages with :mod:`cyborgclient.common.raw`,
+converted to the column types of :data:`FIELDS` and written
+:data:`BATCH_SIZE` records at a time, so memory does not grow with the
+size of the inventory. Parquet and Arrow need pyarrow, which is installed
+by the ``arrow`` extra of python-cyborgclient.
+"""
+
+import csv
+import datetime
+import json
+import os
+import tempfile
+
+from openstack.accelerator.v2 import attribute as _attribute
+from openstack.accelerator.v2 import device_profile as _device_profile
+
+from cyborgclient.common import raw
+from cyborgclient.common import resources
+from cyborgclient import exceptions as exc
+from cyborgclient.i18n import _
+
+# Number of records converted and written at a time.
+BATCH_SIZE = 4096
+
+FORMATS = ('csv', 'parquet', 'arrow')
+
+# Column types. JSON columns hold strings, other values are JSON encoded.
+STRING = 'string'
+INTEGER = 'integer'
+TIMESTAMP = 'timestamp'
+JSON = 'json'
+
+COLLECTIONS = {
+    'devices': resources.Device,
+    'deployables': resources.Deployable,
+    'attributes': _attribute.Attribute,
+    'device_profiles': _device_profile.DeviceProfile,
+    'accelerator_requests': resources.AcceleratorRequest,
+}
+
+FIELDS = {
+    'devices': (
+        ('uuid', STRING), ('type', STRING), ('vendor', STRING),
+        ('model', STRING), ('hostname', STRING), ('std_board_info', JSON),
+        ('vendor_board_info', JSON), ('status', STRING),
+        ('created_at', TIMESTAMP), ('updated_at', TIMESTAMP),
+    ),
+    'deployables': (
+        ('uuid', STRING), ('name', STRING), ('parent_id', INTEGER),
+        ('root_id', INTEGER), ('num_accelerators', INTEGER),
+        ('device_id', INTEGER), ('rp_uuid', STRING),
+        ('created_at', TIMESTAMP), ('updated_at', TIMESTAMP),
+    ),
+    'attributes': (
+        ('uuid', STRING), ('deployable_id', INTEGER), ('key', STRING),
+        ('value', STRING), ('created_at', TIMESTAMP),
+        ('updated_at', TIMESTAMP),
+    ),
+    'device_profiles': (
+        ('uuid', STRING), ('name', STRING), ('description', STRING),
+        ('groups', JSON), ('created_at', TIMESTAMP),
+        ('updated_at', TIMESTAMP),
+    ),
+    'accelerator_requests': (
+        ('uuid', STRING), ('state', STRING),
+        ('device_profile_name', STRING),
+        ('device_profile_group_id', INTEGER), ('hostname', STRING),
+        ('device_rp_uuid', STRING), ('instance_uuid', STRING),
+        ('attach_handle_type', STRING), ('attach_handle_info', JSON),
+    ),
+}
+
+
+def _to_string(value):
+    return value if value is None else str(value)
+
+
+def _to_integer(value):
+    return None if value is None or value == '' else int(value)
+
+
+def _to_timestamp(value):
+    if not value:
+        return None
+    timestamp = datetime.datetime.fromisoformat(value)
+    if timestamp.tzinfo is None:
+        # The API returns UTC times.
+        timestamp = timestamp.replace(tzinfo=datetime.timezone.utc)
+    return timestamp
+
+
+def _to_json(value):
+    if value is None or isinstance(value, str):
+        return value
+    return json.dumps(value, sort_keys=True)
+
+
+_CONVERTERS = {
+    STRING: _to_string,
+    INTEGER: _to_integer,
+    TIMESTAMP: _to_timestamp,
+    JSON: _to_json,
+}
+
+
+def batches(records, fields, size=BATCH_SIZE):
+    """Convert records to rows of typed values, ``size`` rows at a time.
+
+    :raises ValueError: if a value cannot be converted to its column type.
+    """
+    converters = [(name, _CONVERTERS[kind]) for name, kind in fields]
+    batch = []
+    for record in records:
+        row = []
+        for name, convert in converters:
+            try:
+                row.append(convert(record.get(name)))
+            except (TypeError, ValueError):
+                raise ValueError(
+                    _('Invalid %(field)s of %(uuid)s: %(value)r')
+                    % {'field': name, 'uuid': record.get('uuid'),
+                       'value': record.get(name)})
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class _CSVWriter(object):
+
+    def __init__(self, f, fields):
+        self._writer = csv.writer(f)
+        self._writer.writerow([name for name, kind in fields])
+
+    def write(self, batch):
+        self._writer.writerows(
+            [value.isoformat() if isinstance(value, datetime.datetime)
+             else value for value in row] for row in batch)
+
+    def close(self):
+        pass
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+        from pyarrow import ipc  # noqa: F401
+        from pyarrow import parquet  # noqa: F401
+    except ImportError:
+        raise exc.CommandError(_('Parquet and Arrow exports need pyarrow, '
+                                 'install python-cyborgclient[arrow]'))
+    return pyarrow
+
+
+class _ArrowWriter(object):
+
+    def __init__(self, f, fields, fmt):
+        pa = _import_pyarrow()
+        types = {
+            STRING: pa.string(),
+            INTEGER: pa.int64(),
+            TIMESTAMP: pa.timestamp('us', tz='UTC'),
+            JSON: pa.string(),
+        }
+        self._pa = pa
+        self._schema = pa.schema([(name, types[kind])
+                                  for name, kind in fields])
+        if fmt == 'parquet':
+            self._writer = pa.parquet.ParquetWriter(f, self._schema)
+        else:
+            self._writer = pa.ipc.new_file(f, self._schema)
+
+    def write(self, batch):
+        columns = zip(*batch)
+        self._writer.write_batch(self._pa.RecordBatch.from_arrays(
+            [self._pa.array(column, type=field.type)
+             for column, field in zip(columns, self._schema)],
+            schema=self._schema))
+
+    def close(self):
+        self._writer.close()
+
+
+def write(path, records, fields, fmt, batch_size=BATCH_SIZE):
+    """Write records to a file, replacing it once complete.
+
+    :param fields: the ``(name, type)`` of each column.
+    :param fmt: one of :data:`FORMATS`.
+    :returns: the number of records written.
+    """
+    if fmt != 'csv':
+        _import_pyarrow()
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.export-')
+    count = 0
+    try:
+        # Like the files the export replaces, not private to the user.
+        os.fchmod(fd, 0o644)
+        if fmt == 'csv':
+            f = os.fdopen(fd, 'w', newline='')
+        else:
+            f = os.fdopen(fd, 'wb')
+        with f:
+            writer = (_CSVWriter(f, fields) if fmt == 'csv'
+                      else _ArrowWriter(f, fields, fmt))
+            for batch in batches(records, fields, batch_size):
+                writer.write(batch)
+                count += len(batch)
+            writer.close()
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    return count
+
+
+def export(acc_client, name, directory, fmt, batch_size=BATCH_SIZE):
+    """Export a collection of the inventory to ``<directory>/<name>.<fmt>``.
+
+    :returns: the path of the file and the number of records written.
+    """
+    path = os.path.join(directory, '%s.%s' % (name, fmt))
+    records = raw.list_records(acc_client, COLLECTIONS[name])
+    return path, write(path, records, FIELDS[name], fmt, batch_size)
@@ -0,0 +1,157 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Revalidation of accelerator API responses with conditional requests.
+
+A :class:`ConditionalGetAdapter` mounted on the accelerator endpoint keeps
+the body of every GET response carrying an ``ETag`` or ``Last-Modified``
+validator. The next GET of the same URL is sent with ``If-None-Match`` or
+``If-Modified-Since`` and, when the server answers ``304 Not Modified``,
+the kept body is returned in place of the empty one. It works below the
+SDK, so show and list calls are revalidated alike.
+
+Responses depend on the project and user the request is authenticated as,
+so entries are also keyed by the auth scope of the client: its project and
+the cache id of its auth plugin, or the token itself when the plugin has
+none. A body cached for one project is never replayed for another.
+"""
+
+import atexit
+import base64
+import collections
+import hashlib
+import logging
+
+from keystoneauth1 import session as ks_session
+
+from cyborgclient.common import cache
+
+LOG = logging.getLogger(__name__)
+
+# Number of responses kept, the least recently used ones are evicted first.
+MAX_ENTRIES = 256
+
+# Response headers restored along with a kept body.
+_REPLAYED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified',
+                     'OpenStack-API-Version')
+
+
+class ConditionalGetAdapter(ks_session.TCPKeepAliveAdapter):
+    """A transport adapter sending conditional GET requests.
+
+    :param file_cache: the :class:`cache.FileCache` holding the responses.
+    :param scope: a function returning the ``(project_id, cache_id)`` the
+        requests are authenticated with, called on the first request.
+    """
+
+    def __init__(self, *args, file_cache=None, scope=None, **kwargs):
+        super(ConditionalGetAdapter, self).__init__(*args, **kwargs)
+        self.cache = file_cache or cache.FileCache('http',
+                                                   max_entries=MAX_ENTRIES)
+        self.stats = collections.Counter()
+        self._get_scope = scope or (lambda: (None, None))
+        self._scope = None
+
+    def _key(self, request):
+        if self._scope is None:
+            self._scope = tuple(self._get_scope())
+        scope = self._scope
+        if scope[1] is None:
+            # Without a cache id the token is the only sign of the user.
+            token = request.headers.get('X-Auth-Token') or ''
+            scope += (hashlib.sha256(token.encode('utf-8')).hexdigest(),)
+        # The body depends on the negotiated representation as well.
+        return cache.make_key(request.url,
+                              request.headers.get('Accept'),
+                              request.headers.get('OpenStack-API-Version'),
+                              *scope)
+
+    def send(self, request, **kwargs):
+        if request.method != 'GET':
+            return super(ConditionalGetAdapter, self).send(request, **kwargs)
+
+        key = self._key(request)
+        entry = self.cache.get(key)
+        if entry:
+            if entry.get('etag'):
+                request.headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                request.headers['If-Modified-Since'] = entry['last_modified']
+            self.stats['conditional'] += 1
+
+        response = super(ConditionalGetAdapter, self).send(request, **kwargs)
+        self.stats['requests'] += 1
+
+        if response.status_code == 304 and entry:
+            self.stats['not_modified'] += 1
+            LOG.debug('%s not modified, reusing the cached body',
+                      request.url)
+            return self._replay(response, entry)
+        if response.status_code == 200:
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+            if etag or last_modified:
+                self.cache.set(key, {
+                    'etag': etag,
+                    'last_modified': last_modified,
+                    'headers': {name: response.headers[name]
+                                for name in _REPLAYED_HEADERS
+                                if name in response.headers},
+                    'body': base64.b64encode(
+                        response.content).decode('ascii'),
+                })
+        return response
+
+    @staticmethod
+    def _replay(response, entry):
+        response.status_code = 200
+        response.reason = 'OK'
+        response.headers.update(entry['headers'])
+        response._content = base64.b64decode(entry['body'])
+        response._content_consumed = True
+        return response
+
+    @property
+    def hit_rate(self):
+        """Share of the conditional requests answered by 304."""
+        if not self.stats['conditional']:
+            return 0.0
+        return self.stats['not_modified'] / self.stats['conditional']
+
+    def log_stats(self):
+        if self.stats['conditional']:
+            LOG.info('Revalidated %(not_modified)d of %(conditional)d '
+                     'cached accelerator API responses (%(rate).0f%%), '
+                     '%(requests)d GET requests',
+                     {'not_modified': self.stats['not_modified'],
+                      'conditional': self.stats['conditional'],
+                      'requests': self.stats['requests'],
+                      'rate': self.hit_rate * 100})
+
+
+def _auth_scope(acc_client):
+    auth = acc_client.session.auth
+    return (acc_client.get_project_id(),
+            getattr(auth, 'get_cache_id', lambda: None)())
+
+
+def install(acc_client):
+    """Mount a :class:`ConditionalGetAdapter` on the accelerator endpoint.
+
+    :returns: the adapter, whose statistics are logged when the process
+        exits.
+    """
+    adapter = ConditionalGetAdapter(scope=lambda: _auth_scope(acc_client))
+    acc_client.session.session.mount(acc_client.get_endpoint(), adapter)
+    atexit.register(adapter.log_stats)
+    return adapter
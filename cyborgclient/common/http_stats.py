@@ -0,0 +1,256 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Statistics of the HTTP requests made by a command.
+
+:class:`HTTPStats` is a response hook of the requests session under the
+keystoneauth session, so it sees the identity requests as well as the
+accelerator ones. Each call is recorded with its method, URL template (ids
+replaced by ``{id}``), status, latency, bytes sent and received and request
+id. The summary printed at exit gives the latency percentiles per URL
+template and splits the run time into the time spent waiting for the
+identity service (``auth``), for the accelerator API (``fetch``) and for
+any other service (``other``), the time spent formatting the output
+(``output``, timed with :func:`span`) and the rest, spent in the client
+(``client``).
+"""
+
+import atexit
+import collections
+import contextlib
+import logging
+import math
+import re
+import sys
+import time
+import urllib.parse
+
+LOG = logging.getLogger(__name__)
+
+Call = collections.namedtuple('Call', [
+    'method', 'url', 'template', 'status', 'started', 'latency',
+    'request_bytes', 'response_bytes', 'request_id'])
+
+_ID_SEGMENT = re.compile(r'^(?:[0-9a-fA-F]{8}-?(?:[0-9a-fA-F]{4}-?){3}'
+                         r'[0-9a-fA-F]{12}|\d+)$')
+_REQUEST_ID_HEADERS = ('x-openstack-request-id', 'x-compute-request-id')
+_VERSION_SEGMENT = re.compile(r'/v\d+(?:\.\d+)?/*$')
+
+PHASES = ('auth', 'fetch', 'other', 'output', 'client')
+
+# The HTTPStats of install(), timing the spans of the commands.
+_INSTALLED = []
+
+
+def url_template(url):
+    """Return ``url`` without its query and with ids replaced by ``{id}``."""
+    parts = urllib.parse.urlsplit(url)
+    path = '/'.join('{id}' if _ID_SEGMENT.match(segment) else segment
+                    for segment in parts.path.split('/'))
+    return '%s://%s%s' % (parts.scheme, parts.netloc, path)
+
+
+def _service_root(url):
+    # The endpoint without its version, so that the version discovery
+    # requests sent to the root of a service count for that service.
+    parts = urllib.parse.urlsplit(url)
+    return (parts.scheme.lower(), parts.netloc.lower(),
+            _VERSION_SEGMENT.sub('', parts.path).rstrip('/'))
+
+
+def _is_under(url, root):
+    parts = urllib.parse.urlsplit(url)
+    scheme, netloc, path = root
+    return (parts.scheme.lower() == scheme and
+            parts.netloc.lower() == netloc and
+            (parts.path == path or parts.path.startswith(path + '/')))
+
+
+def _phase(url, roots):
+    for name, root in roots:
+        if _is_under(url, root):
+            return name
+    return 'other'
+
+
+def percentile(values, percent):
+    """Return the nearest-rank percentile of sorted ``values``."""
+    if not values:
+        return None
+    rank = max(1, int(math.ceil(percent / 100.0 * len(values))))
+    return values[rank - 1]
+
+
+def _busy_time(intervals):
+    # Time covered by the (start, end) intervals, overlaps counted once.
+    total = 0.0
+    current_start = current_end = None
+    for start, end in sorted(intervals):
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                total += current_end - current_start
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    if current_end is not None:
+        total += current_end - current_start
+    return total
+
+
+def _table(headers, rows):
+    rows = [[('%.1f' % value if isinstance(value, float) else
+              '' if value is None else str(value)) for value in row]
+            for row in rows]
+    widths = [max(len(str(cell)) for cell in column)
+              for column in zip(headers, *rows)]
+    line = '+%s+' % '+'.join('-' * (width + 2) for width in widths)
+    lines = [line, '| %s |' % ' | '.join(
+        header.ljust(width) for header, width in zip(headers, widths)),
+        line]
+    lines.extend('| %s |' % ' | '.join(
+        cell.ljust(width) for cell, width in zip(row, widths))
+        for row in rows)
+    lines.append(line)
+    return '\n'.join(lines)
+
+
+class HTTPStats(object):
+    """Record the HTTP calls made through a keystoneauth session.
+
+    :param endpoint: the accelerator endpoint, calls to it count as
+        ``fetch``.
+    :param auth_url: the identity endpoint, calls to it count as ``auth``.
+        Calls to other URLs count as ``other``.
+    """
+
+    def __init__(self, endpoint=None, auth_url=None):
+        self.endpoint = endpoint
+        self.auth_url = auth_url
+        self.started = time.monotonic()
+        self.calls = []
+        # (name, started, ended) of the spans timed by span().
+        self.spans = []
+
+    def install(self, session):
+        """Record the calls made through a keystoneauth ``session``."""
+        session.session.hooks['response'].append(self.record)
+        return self
+
+    def record(self, response, *args, **kwargs):
+        request = response.request
+        latency = response.elapsed.total_seconds()
+        length = response.headers.get('Content-Length')
+        call = Call(
+            method=request.method,
+            url=request.url,
+            template=url_template(request.url),
+            status=response.status_code,
+            started=time.monotonic() - latency,
+            latency=latency,
+            request_bytes=len(request.body or b''),
+            response_bytes=(int(length) if length is not None
+                            else len(response.content)),
+            request_id=next((response.headers[name]
+                             for name in _REQUEST_ID_HEADERS
+                             if name in response.headers), None))
+        self.calls.append(call)
+        LOG.debug('%(method)s %(url)s %(status)s %(ms).1fms %(sent)dB sent '
+                  '%(received)dB received request-id %(id)s',
+                  {'method': call.method, 'url': call.url,
+                   'status': call.status, 'ms': call.latency * 1000,
+                   'sent': call.request_bytes,
+                   'received': call.response_bytes,
+                   'id': call.request_id})
+
+    @contextlib.contextmanager
+    def span(self, name):
+        """Time the block as the ``name`` phase, ``output`` for instance."""
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.spans.append((name, started, time.monotonic()))
+
+    def summary(self):
+        """Return the statistics of the calls per method and URL template.
+
+        :returns: a list of ``(method, template, count, p50_ms, p95_ms,
+            max_ms, request_bytes, response_bytes)`` tuples.
+        """
+        groups = collections.OrderedDict()
+        for call in self.calls:
+            groups.setdefault((call.method, call.template), []).append(call)
+        rows = []
+        for (method, template), calls in groups.items():
+            latencies = sorted(call.latency * 1000 for call in calls)
+            rows.append((method, template, len(calls),
+                         percentile(latencies, 50),
+                         percentile(latencies, 95), latencies[-1],
+                         sum(call.request_bytes for call in calls),
+                         sum(call.response_bytes for call in calls)))
+        return rows
+
+    def phases(self, now=None):
+        """Split the time since the stats were created between phases.
+
+        :returns: a dict mapping each of :data:`PHASES` to seconds. The
+            calls waited for are counted once, in the phase of their URL,
+            even when they are made concurrently or while the output is
+            formatted.
+        """
+        elapsed = (now or time.monotonic()) - self.started
+        roots = [(name, _service_root(url))
+                 for name, url in (('fetch', self.endpoint),
+                                   ('auth', self.auth_url)) if url]
+        intervals = {'auth': [], 'fetch': [], 'other': []}
+        for call in self.calls:
+            intervals[_phase(call.url, roots)].append(
+                (call.started, call.started + call.latency))
+        phases = {name: _busy_time(value)
+                  for name, value in intervals.items()}
+        waiting_intervals = sum(intervals.values(), [])
+        waiting = _busy_time(waiting_intervals)
+        phases['output'] = _busy_time(
+            waiting_intervals + [(started, ended)
+                                 for name, started, ended in self.spans
+                                 if name == 'output']) - waiting
+        phases['client'] = max(0.0, elapsed - waiting - phases['output'])
+        return phases
+
+    def print_summary(self, stream=None):
+        stream = stream or sys.stderr
+        stream.write(_table(
+            ('Method', 'URL', 'Count', 'p50 ms', 'p95 ms', 'Max ms',
+             'Sent B', 'Received B'),
+            self.summary()) + '\n')
+        phases = self.phases()
+        stream.write(_table(
+            ('Phase', 'Seconds'),
+            [(name, '%.3f' % phases[name]) for name in PHASES]) + '\n')
+
+
+def install(session, endpoint=None, auth_url=None):
+    """Record the calls of ``session`` and print their summary at exit."""
+    stats = HTTPStats(endpoint, auth_url).install(session)
+    _INSTALLED.append(stats)
+    atexit.register(stats.print_summary)
+    return stats
+
+
+@contextlib.contextmanager
+def span(name):
+    """Time the block as the ``name`` phase of the installed stats."""
+    with contextlib.ExitStack() as stack:
+        for stats in _INSTALLED:
+            stack.enter_context(stats.span(name))
+        yield
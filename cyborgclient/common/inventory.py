@@ -0,0 +1,343 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Accelerator inventory of the cloud, joined per host.
+
+The inventory is made of the devices, deployables, attributes and
+accelerator_requests collections. They are fetched in parallel and joined
+with hash indexes in a single pass over each collection:
+
+* device ``id`` -> deployables (``device_id``)
+* deployable ``id`` -> attributes (``deployable_id``)
+* deployable ``rp_uuid`` -> accelerator_requests (``device_rp_uuid``)
+
+The collections listed by the list commands can also be kept in a local
+cache for a few seconds with :class:`InventoryCache`.
+"""
+
+import collections
+import logging
+import os
+import time
+
+from openstack.accelerator.v2 import attribute as _attribute
+from openstack.accelerator.v2 import device_profile as _device_profile
+
+from cyborgclient.common import cache
+from cyborgclient.common import resources
+from cyborgclient.common import utils
+from cyborgclient.i18n import _
+
+LOG = logging.getLogger(__name__)
+
+COLLECTIONS = ('devices', 'deployables', 'attributes',
+               'accelerator_requests')
+
+# Resource class of each collection kept by the InventoryCache.
+CACHED_COLLECTIONS = {
+    'devices': resources.Device,
+    'deployables': resources.Deployable,
+    'attributes': _attribute.Attribute,
+    'device_profiles': _device_profile.DeviceProfile,
+}
+
+# Number of queries cached per collection and scope, the least recently used
+# ones are evicted first.
+CACHE_MAX_ENTRIES = 32
+
+# Collections followed by "inventory sync".
+SYNC_COLLECTIONS = ('devices', 'deployables', 'attributes')
+
+Inventory = collections.namedtuple('Inventory', COLLECTIONS)
+
+
+def _fetchers(acc_client, hostname=None):
+    if hostname:
+        devices = (lambda: resources.Device.list(acc_client,
+                                                 hostname=hostname))
+    else:
+        devices = acc_client.devices
+    return (
+        devices,
+        lambda: resources.Deployable.list(acc_client),
+        acc_client.attributes,
+        acc_client.accelerator_requests,
+    )
+
+
+def fetch(acc_client, hostname=None):
+    """Fetch the four inventory collections in parallel.
+
+    :param hostname: only fetch the devices of this host. The other
+        collections cannot be filtered by host on the server.
+    :returns: an :class:`Inventory` of lists.
+    """
+    return Inventory(*utils.concurrent_map(
+        lambda fetcher: list(fetcher()),
+        _fetchers(acc_client, hostname), len(COLLECTIONS)))
+
+
+def _arq_dict(arq):
+    return {'uuid': arq.uuid,
+            'state': arq.state,
+            'device_profile_name': arq.device_profile_name,
+            'instance_uuid': arq.instance_uuid}
+
+
+def join(inventory):
+    """Join the inventory collections per host.
+
+    :returns: a dict mapping each hostname to a nested view of its devices,
+        their deployables with their attributes and the accelerator_requests
+        bound to them. accelerator_requests bound to the host but to none of
+        the known deployables are listed under the host itself.
+    """
+    deployables_by_device = collections.defaultdict(list)
+    for deployable in inventory.deployables:
+        deployables_by_device[deployable.device_id].append(deployable)
+    attributes_by_deployable = collections.defaultdict(dict)
+    for attribute in inventory.attributes:
+        attributes_by_deployable[attribute.deployable_id][attribute.key] = \
+            attribute.value
+    arqs_by_rp = collections.defaultdict(list)
+    arqs_by_host = collections.defaultdict(list)
+    for arq in inventory.accelerator_requests:
+        if arq.device_rp_uuid:
+            arqs_by_rp[arq.device_rp_uuid].append(arq)
+        elif arq.hostname:
+            arqs_by_host[arq.hostname].append(arq)
+
+    hosts = {}
+    for device in inventory.devices:
+        host = hosts.get(device.hostname)
+        if host is None:
+            host = hosts[device.hostname] = {
+                'hostname': device.hostname,
+                'devices': [],
+                'accelerator_requests': [],
+            }
+        deployables = []
+        for deployable in deployables_by_device.pop(device.id, ()):
+            rp_uuid = getattr(deployable, 'rp_uuid', None)
+            deployables.append({
+                'uuid': deployable.id,
+                'name': deployable.name,
+                'num_accelerators': deployable.num_accelerators,
+                'rp_uuid': rp_uuid,
+                'attributes': attributes_by_deployable.get(deployable.id,
+                                                           {}),
+                'accelerator_requests': [
+                    _arq_dict(arq) for arq in arqs_by_rp.pop(rp_uuid, ())
+                ] if rp_uuid else [],
+            })
+        host['devices'].append({
+            'uuid': device.uuid,
+            'type': device.type,
+            'vendor': device.vendor,
+            'model': device.model,
+            'status': device.status,
+            'deployables': deployables,
+        })
+
+    # Bound accelerator_requests whose resource provider is not one of the
+    # known deployables are still shown on their host.
+    for arqs in arqs_by_rp.values():
+        for arq in arqs:
+            arqs_by_host[arq.hostname].append(arq)
+    for hostname, arqs in arqs_by_host.items():
+        if hostname in hosts:
+            hosts[hostname]['accelerator_requests'].extend(
+                _arq_dict(arq) for arq in arqs)
+    return hosts
+
+
+def flatten(host):
+    """Yield one row per deployable of a host returned by :func:`join`.
+
+    Rows are dicts with the keys of :data:`FLAT_COLUMNS`.
+    """
+    for device in host['devices']:
+        for deployable in device['deployables'] or [{}]:
+            arqs = deployable.get('accelerator_requests', [])
+            yield {
+                'hostname': host['hostname'],
+                'device_uuid': device['uuid'],
+                'type': device['type'],
+                'vendor': device['vendor'],
+                'model': device['model'],
+                'deployable_uuid': deployable.get('uuid'),
+                'deployable_name': deployable.get('name'),
+                'num_accelerators': deployable.get('num_accelerators'),
+                'attributes': deployable.get('attributes', {}),
+                'accelerator_requests': [arq['uuid'] for arq in arqs],
+                'instances': [arq['instance_uuid'] for arq in arqs
+                              if arq['instance_uuid']],
+            }
+
+
+FLAT_COLUMNS = ('hostname', 'device_uuid', 'type', 'vendor', 'model',
+                'deployable_uuid', 'deployable_name', 'num_accelerators',
+                'attributes', 'accelerator_requests', 'instances')
+
+
+def add_cache_arguments(parser):
+    """Add the --cache-ttl and --no-cache options to a command parser."""
+    parser.add_argument(
+        '--cache-ttl',
+        metavar='<seconds>',
+        type=int,
+        default=os.environ.get('OS_ACCELERATOR_CACHE_TTL', '0'),
+        help=_("Serve the inventory from a local cache refreshed at most "
+               "every <seconds> (Env: OS_ACCELERATOR_CACHE_TTL, default: 0, "
+               "disabled)")
+    )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        default=False,
+        help=_("Always query the API, even if --cache-ttl is set")
+    )
+
+
+class InventoryCache(object):
+    """Inventory collections cached on disk for ``ttl`` seconds.
+
+    Entries are kept per scope, the endpoint, the project and the
+    microversion of ``acc_client``, and keyed by the query, so different
+    clouds, projects or API versions never share an entry.
+    """
+
+    def __init__(self, acc_client, ttl, directory=None,
+                 max_entries=CACHE_MAX_ENTRIES):
+        self.acc_client = acc_client
+        self.ttl = ttl
+        self.directory = directory
+        self.max_entries = max_entries
+        self._scope = None
+
+    @classmethod
+    def from_args(cls, acc_client, parsed_args):
+        """Return the cache enabled on the command line, or None."""
+        if parsed_args.no_cache or parsed_args.cache_ttl <= 0:
+            return None
+        return cls(acc_client, parsed_args.cache_ttl)
+
+    def _file_cache(self, collection):
+        if self._scope is None:
+            self._scope = cache.make_key(self.acc_client.get_endpoint(),
+                                         self.acc_client.get_project_id(),
+                                         self.acc_client.default_microversion)
+        return cache.FileCache(
+            os.path.join('inventory-' + collection, self._scope),
+            directory=self.directory, max_entries=self.max_entries)
+
+    def _key(self, query):
+        return cache.make_key(query or {})
+
+    def _fresh_items(self, collection, query):
+        entry = self._file_cache(collection).get(self._key(query))
+        if entry is None or time.time() - entry['fetched_at'] >= self.ttl:
+            return None
+        return entry['items']
+
+    def list(self, collection, fetch, query=None):
+        """Return the ``collection`` resources matching ``query``.
+
+        They are fetched by calling ``fetch`` unless the cached ones are
+        younger than the TTL.
+        """
+        resource_class = CACHED_COLLECTIONS[collection]
+        items = self._fresh_items(collection, query)
+        if items is not None:
+            LOG.debug('Serving %s from the cache', collection)
+            return [resource_class.existing(**item) for item in items]
+
+        now = time.time()
+        data = list(fetch())
+        self._file_cache(collection).set(
+            self._key(query),
+            {'fetched_at': now,
+             'items': [r.to_dict(computed=False, original_names=True)
+                       for r in data]},
+            expires_at=now + self.ttl)
+        return data
+
+    def find(self, collection, value, fields=('id',)):
+        """Find a resource in the fresh cached ``collection``.
+
+        :param fields: the resource fields ``value`` is compared to.
+        :returns: the resource, or None if the whole collection is not
+            cached or the resource is not in it.
+        """
+        items = self._fresh_items(collection, None)
+        for item in items or ():
+            resource = CACHED_COLLECTIONS[collection].existing(**item)
+            if any(getattr(resource, field) == value for field in fields):
+                LOG.debug('Serving %s %s from the cache', collection, value)
+                return resource
+        return None
+
+    def invalidate(self, collection):
+        """Drop the ``collection`` cached for the scope of the client."""
+        self._file_cache(collection).clear()
+
+
+def invalidate(acc_client, collection, directory=None):
+    """Drop the ``collection`` cached for ``acc_client``, once modified.
+
+    Only the entries of the scope of ``acc_client`` are dropped, see
+    :class:`InventoryCache`.
+    """
+    InventoryCache(acc_client, 0, directory=directory).invalidate(collection)
+
+
+def collection_fetchers(acc_client):
+    """Return the function listing each collection of the inventory."""
+    return {
+        'devices': acc_client.devices,
+        'deployables': lambda: resources.Deployable.list(acc_client),
+        'attributes': acc_client.attributes,
+        'device_profiles': acc_client.device_profiles,
+        'accelerator_requests': acc_client.accelerator_requests,
+    }
+
+
+def _stamp(record):
+    return record.get('updated_at') or record.get('created_at')
+
+
+def diff(previous, current):
+    """Compare two states of a collection.
+
+    :param previous: dict mapping the uuids of the resources of the last
+        sync to their record.
+    :param current: dict mapping the uuids of the resources listed now to
+        their record.
+    :returns: a list of ``(change, uuid, record)`` tuples where change is
+        ``add``, ``update`` or ``delete``. A resource is updated when its
+        ``updated_at`` (or ``created_at``) changed, or when any field did if
+        it has neither.
+    """
+    changes = []
+    for uuid, record in current.items():
+        old = previous.get(uuid)
+        if old is None:
+            changes.append(('add', uuid, record))
+            continue
+        stamp = _stamp(record)
+        if stamp != _stamp(old) or (stamp is None and record != old):
+            changes.append(('update', uuid, record))
+    for uuid, record in previous.items():
+        if uuid not in current:
+            changes.append(('delete', uuid, record))
+    return changes
@@ -0,0 +1,177 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Accelerator inventory metrics in the OpenMetrics text format.
+
+The devices, deployables and accelerator_requests are listed once, in
+parallel, with :mod:`cyborgclient.common.raw`, and each record is counted
+as its page arrives, so memory only grows with the number of distinct
+label values. The deployables are counted per device and attributed to the
+host of their device once the devices are listed.
+
+Each bound accelerator_request holds one accelerator. Like in
+:mod:`cyborgclient.common.capacity`, it is attributed to the host of the
+device of its deployable (``device_rp_uuid``), or to its own ``hostname``
+if the deployable is unknown.
+
+The text is meant for the textfile collector of the Prometheus node
+exporter, which reads the ``*.prom`` files of a directory: :func:`write`
+replaces the file at once so the collector never reads a partial one.
+"""
+
+import collections
+import os
+import tempfile
+import time
+
+from cyborgclient.common import raw
+from cyborgclient.common import resources
+from cyborgclient.common import utils
+
+# State of the accelerator_requests holding an accelerator.
+IN_USE_STATE = 'Bound'
+
+# A metric, its samples mapping the values of its labels to its value.
+Family = collections.namedtuple('Family', 'name type help labels samples')
+
+
+def _count_devices(records):
+    devices = collections.Counter()
+    hostnames = {}
+    for device in records:
+        hostname = device.get('hostname')
+        devices[hostname, device.get('status'), device.get('vendor')] += 1
+        hostnames[device.get('id')] = hostname
+    return devices, hostnames
+
+
+def _count_deployables(records):
+    accelerators = collections.Counter()
+    device_ids = {}
+    for deployable in records:
+        device_id = deployable.get('device_id')
+        accelerators[device_id] += int(
+            deployable.get('num_accelerators') or 0)
+        if deployable.get('rp_uuid'):
+            device_ids[deployable['rp_uuid']] = device_id
+    return accelerators, device_ids
+
+
+def _count_accelerator_requests(records):
+    arqs = collections.Counter()
+    # Bound accelerator_requests by (device_rp_uuid, hostname).
+    in_use = collections.Counter()
+    for arq in records:
+        state = arq.get('state')
+        arqs[state, arq.get('device_profile_name')] += 1
+        if state == IN_USE_STATE:
+            in_use[arq.get('device_rp_uuid'), arq.get('hostname')] += 1
+    return arqs, in_use
+
+
+def collect(acc_client):
+    """List the inventory once and count it.
+
+    :returns: a list of :class:`Family`.
+    """
+    counters = (
+        (resources.Device, _count_devices),
+        (resources.Deployable, _count_deployables),
+        (resources.AcceleratorRequest, _count_accelerator_requests),
+    )
+    ((devices, hostnames), (accelerators_by_device, device_ids),
+     (arqs, in_use_by_rp)) = utils.concurrent_map(
+        lambda item: item[1](raw.list_records(acc_client, item[0])),
+        counters, len(counters))
+
+    accelerators = collections.Counter()
+    for device_id, count in accelerators_by_device.items():
+        accelerators[hostnames.get(device_id)] += count
+    in_use = collections.Counter()
+    for (rp_uuid, hostname), count in in_use_by_rp.items():
+        device_id = device_ids.get(rp_uuid)
+        if device_id in hostnames:
+            hostname = hostnames[device_id]
+        in_use[hostname] += count
+
+    def _by_host(counter):
+        return {(hostname,): count for hostname, count in counter.items()}
+
+    return [
+        Family('cyborg_devices', 'gauge',
+               'Accelerator devices',
+               ('hostname', 'status', 'vendor'), dict(devices)),
+        Family('cyborg_accelerators', 'gauge',
+               'Accelerators of the deployables',
+               ('hostname',), _by_host(accelerators)),
+        Family('cyborg_accelerators_in_use', 'gauge',
+               'Accelerators held by bound accelerator_requests',
+               ('hostname',), _by_host(in_use)),
+        Family('cyborg_accelerator_requests', 'gauge',
+               'Accelerator requests',
+               ('state', 'device_profile_name'), dict(arqs)),
+    ]
+
+
+def _escape(value):
+    if value is None:
+        return ''
+    return (str(value).replace('\\', '\\\\').replace('"', '\\"')
+            .replace('\n', '\\n'))
+
+
+def _sort_key(labels):
+    return tuple('' if value is None else str(value) for value in labels)
+
+
+def render(families, timestamp=None):
+    """Yield the lines of the OpenMetrics text of ``families``.
+
+    A ``cyborg_metrics_timestamp_seconds`` gauge with ``timestamp``, by
+    default the current time, tells when the metrics were collected.
+    """
+    timestamp = time.time() if timestamp is None else timestamp
+    families = list(families) + [
+        Family('cyborg_metrics_timestamp_seconds', 'gauge',
+               'Time the accelerator metrics were collected', (),
+               {(): timestamp})]
+    for family in families:
+        yield '# HELP %s %s.\n' % (family.name, family.help)
+        yield '# TYPE %s %s\n' % (family.name, family.type)
+        for labels in sorted(family.samples, key=_sort_key):
+            if labels:
+                yield '%s{%s} %s\n' % (family.name, ','.join(
+                    '%s="%s"' % (name, _escape(value))
+                    for name, value in zip(family.labels, labels)),
+                    family.samples[labels])
+            else:
+                yield '%s %s\n' % (family.name, family.samples[labels])
+    yield '# EOF\n'
+
+
+def write(path, families, timestamp=None):
+    """Write the metrics to ``path``, replacing it once complete."""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.metrics-')
+    try:
+        # The collector usually runs as another user than the cron job.
+        os.fchmod(fd, 0o644)
+        with os.fdopen(fd, 'w') as f:
+            f.writelines(render(families, timestamp))
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
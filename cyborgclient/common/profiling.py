@@ -0,0 +1,138 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""CPU and memory profiling of the accelerator commands.
+
+Every accelerator command inherits :class:`ProfilingMixin`, which adds the
+``--profile-out <file>`` and ``--trace-memory`` options. They profile the
+command itself, its ``take_action`` and the output formatting, but not the
+startup of the openstack CLI or the authentication done before.
+"""
+
+import contextlib
+import cProfile
+import linecache
+import logging
+import tracemalloc
+
+from cyborgclient.common import http_stats
+from cyborgclient.i18n import _
+
+LOG = logging.getLogger(__name__)
+
+# Number of source lines listed in the memory report.
+TOP_ALLOCATIONS = 25
+
+# Frames of tracebacks kept by tracemalloc.
+_TRACE_FRAMES = 1
+
+
+@contextlib.contextmanager
+def profile(path):
+    """Profile the block with cProfile and dump the pstats data to a file."""
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        try:
+            profiler.dump_stats(path)
+        except OSError as e:
+            LOG.error('Failed to write the profile to %s: %s', path, e)
+        else:
+            LOG.info('Profile written to %s, read it with '
+                     '"python -m pstats %s"', path, path)
+
+
+def _size(size):
+    return '%.1f KiB' % (size / 1024.0)
+
+
+@contextlib.contextmanager
+def trace_memory(stream, limit=TOP_ALLOCATIONS):
+    """Trace the allocations of the block and report them to ``stream``.
+
+    The report gives the peak of traced memory and the ``limit`` source
+    lines holding the most memory at the end of the block.
+    """
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start(_TRACE_FRAMES)
+    tracemalloc.reset_peak()
+    try:
+        yield
+    finally:
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        ))
+        current, peak = tracemalloc.get_traced_memory()
+        if not tracing:
+            tracemalloc.stop()
+
+        stream.write('Traced memory: peak %s, at exit %s\n'
+                     % (_size(peak), _size(current)))
+        stream.write('Top %d lines by memory allocated:\n' % limit)
+        for index, stat in enumerate(
+                snapshot.statistics('lineno')[:limit], 1):
+            frame = stat.traceback[0]
+            stream.write('%3d. %s:%d: %s in %d blocks\n'
+                         % (index, frame.filename, frame.lineno,
+                            _size(stat.size), stat.count))
+            line = linecache.getline(frame.filename, frame.lineno).strip()
+            if line:
+                stream.write('       %s\n' % line)
+
+
+class ProfilingMixin(object):
+    """Add the profiling options to a command.
+
+    ``--profile-out`` and ``--trace-memory`` wrap the run of the command,
+    that is its ``take_action`` and, for commands showing data, the output
+    formatting.
+    """
+
+    def get_parser(self, prog_name):
+        parser = super(ProfilingMixin, self).get_parser(prog_name)
+        group = parser.add_argument_group(_('profiling'))
+        group.add_argument(
+            '--profile-out',
+            metavar='<file>',
+            help=_("Profile the command with cProfile and write the pstats "
+                   "data to <file>")
+        )
+        group.add_argument(
+            '--trace-memory',
+            action='store_true',
+            default=False,
+            help=_("Trace the memory allocated by the command and report "
+                   "its peak and the %d source lines allocating the most "
+                   "on stderr") % TOP_ALLOCATIONS
+        )
+        return parser
+
+    def run(self, parsed_args):
+        with contextlib.ExitStack() as stack:
+            if getattr(parsed_args, 'trace_memory', False):
+                stack.enter_context(trace_memory(self.app.stderr))
+            if getattr(parsed_args, 'profile_out', None):
+                stack.enter_context(profile(parsed_args.profile_out))
+            return super(ProfilingMixin, self).run(parsed_args)
+
+    def produce_output(self, parsed_args, column_names, data):
+        # Only called by the commands showing data, whose rows may still
+        # be fetched while they are formatted.
+        with http_stats.span('output'):
+            return super(ProfilingMixin, self).produce_output(
+                parsed_args, column_names, data)
@@ -0,0 +1,120 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Accelerator API responses passed through as they are received.
+
+With ``--raw`` the list and show commands write the JSON records of the
+API to stdout without building SDK resources or output columns: show
+commands write the response body as is, list commands write each record of
+each page on its own line as soon as the page arrives.
+
+The requests are the ones the SDK resources make: the path, the collection
+key and the query parameters sent to the server come from the resource
+class, and the other filters are applied to each record on the client.
+"""
+
+import json
+
+from openstack import exceptions as sdk_exc
+
+from cyborgclient.i18n import _
+
+
+def add_raw_argument(parser):
+    parser.add_argument(
+        '--raw',
+        action='store_true',
+        default=False,
+        help=_("Write the JSON returned by the API, one record per line "
+               "for lists, instead of formatted output. Output options "
+               "and the local cache are ignored")
+    )
+
+
+def _get(acc_client, uri, params=None):
+    response = acc_client.get(uri, params=params)
+    sdk_exc.raise_from_response(response)
+    return response
+
+
+def list_records(acc_client, resource_cls, **query):
+    """Yield the records of a collection as the API returns them.
+
+    :param resource_cls: the SDK resource class of the collection.
+    :param query: filters, sent to the server when the resource class
+        declares them as query parameters and applied to each record
+        otherwise.
+    """
+    server_keys = set(resource_cls._query_mapping._mapping)
+    params = {key: value for key, value in query.items()
+              if key in server_keys}
+    filters = {key: value for key, value in query.items()
+               if key not in server_keys}
+    limit = params.get('limit')
+
+    uri = resource_cls.base_path
+    while uri:
+        data = _get(acc_client, uri, params).json()
+        records = data.get(resource_cls.resources_key) or []
+        for record in records:
+            if all(record.get(key) == value
+                   for key, value in filters.items()):
+                yield record
+
+        uri = None
+        next_link = data.get('next')
+        if next_link:
+            uri, params = next_link, None
+        elif limit and len(records) >= int(limit):
+            # Like the SDK, keep paging with a marker while pages are full.
+            uri = resource_cls.base_path
+            params = dict(params, marker=records[-1]['uuid'])
+
+
+def write_list(stdout, records):
+    """Write each record as a JSON object on its own line.
+
+    Each line is flushed as soon as it is written, so a consumer reading
+    from a pipe sees the records as the pages arrive.
+    """
+    encoder = json.JSONEncoder(separators=(',', ':'))
+    for record in records:
+        stdout.write(encoder.encode(record) + '\n')
+        stdout.flush()
+
+
+def write_one(stdout, acc_client, resource_cls, id):
+    """Write the body of the response to the GET of a resource.
+
+    :raises openstack.exceptions.ResourceNotFound: if there is no such
+        resource.
+    """
+    response = _get(acc_client, '%s/%s' % (resource_cls.base_path, id))
+    stdout.write(response.text.rstrip('\n'))
+    stdout.write('\n')
+    stdout.flush()
+
+
+class RawOutputMixin(object):
+    """Let a command write its own output when ``--raw`` is given.
+
+    Commands using it call :func:`add_raw_argument` in their parser and
+    implement ``take_raw_action(parsed_args)``, which is called in place of
+    ``take_action`` and the output formatters.
+    """
+
+    def run(self, parsed_args):
+        if getattr(parsed_args, 'raw', False):
+            self.take_raw_action(parsed_args)
+            return 0
+        return super(RawOutputMixin, self).run(parsed_args)
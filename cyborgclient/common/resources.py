@@ -0,0 +1,51 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Accelerator resources aware of the Cyborg API list filters.
+
+The openstacksdk accelerator resources only declare the ``limit`` and
+``marker`` query parameters, so any other filter given to the proxy is
+applied on the client after each page has been downloaded. The resources
+below declare the filters the Cyborg API understands so that those are sent
+with the request. Filters on other resource attributes keep being applied
+on the client, one resource at a time, as the pages arrive.
+
+Use them through :meth:`openstack.resource.Resource.list` with the
+accelerator proxy as session, e.g.
+``resources.Device.list(acc_client, hostname='compute-1')``.
+"""
+
+from openstack.accelerator.v2 import accelerator_request as _arq
+from openstack.accelerator.v2 import deployable as _deployable
+from openstack.accelerator.v2 import device as _device
+from openstack import resource
+
+
+class AcceleratorRequest(_arq.AcceleratorRequest):
+    _query_mapping = resource.QueryParameters('instance', 'bind_state')
+
+    uuid = resource.Body('uuid', alternate_id=True)
+
+
+class Device(_device.Device):
+    _query_mapping = resource.QueryParameters('hostname', 'type', 'vendor')
+
+    uuid = resource.Body('uuid', alternate_id=True)
+
+
+class Deployable(_deployable.Deployable):
+    id = resource.Body('uuid', alternate_id=True)
+
+    #: The UUID of the placement resource provider of the deployable, which
+    #: is the ``device_rp_uuid`` of the accelerator_requests using it.
+    rp_uuid = resource.Body('rp_uuid')
@@ -0,0 +1,362 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Snapshot files of the accelerator inventory.
+
+A snapshot holds the devices, deployables, attributes, device profiles and
+accelerator_requests of a cloud as the API returned them. The file is laid
+out as::
+
+    MAGIC
+    chunk ... chunk      zlib compressed JSON lists of CHUNK_SIZE records
+    index                zlib compressed JSON document
+    footer               index offset and length, MAGIC
+
+The index gives the offset of every chunk of each collection and maps the
+UUID (and the name of device profiles) of every record to its chunk and its
+position in it. :class:`Snapshot` maps the file in memory and only
+decompresses the chunks a lookup or a listing needs.
+
+:class:`SnapshotAdapter` answers the GET requests of the accelerator API
+from a snapshot, so the SDK and the commands work on it unchanged, and
+:func:`diff` compares the collections of two snapshots.
+"""
+
+import functools
+import hashlib
+import http
+import json
+import mmap
+import os
+import struct
+import tempfile
+import urllib.parse
+import zlib
+
+import requests
+from requests import adapters
+
+MAGIC = b'CYBORGSNAP1\n'
+_FOOTER = struct.Struct('>QQ')
+
+# Number of records compressed together.
+CHUNK_SIZE = 512
+
+# Collections of a snapshot with the key of their list in API responses.
+COLLECTIONS = {
+    'devices': 'devices',
+    'deployables': 'deployables',
+    'attributes': 'attributes',
+    'device_profiles': 'device_profiles',
+    'accelerator_requests': 'arqs',
+}
+
+# Fields a record can be looked up by, uuid by default.
+_INDEX_FIELDS = {
+    'device_profiles': ('uuid', 'name'),
+}
+
+# Fields left out when comparing the records of two snapshots.
+DIFF_IGNORED_FIELDS = ('links', 'updated_at')
+
+# Query parameters of the API which do not have the name of the field they
+# filter on.
+_QUERY_FIELDS = {
+    'accelerator_requests': {'instance': 'instance_uuid'},
+}
+
+# States of the accelerator_requests listed with bind_state=resolved.
+_RESOLVED_STATES = ('Bound', 'BindFailed', 'Deleting')
+
+
+def _chunks(records, size):
+    chunk = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def write(path, collections, metadata=None):
+    """Write a snapshot file.
+
+    :param collections: dict mapping collection names to an iterable of
+        records, which are consumed one chunk at a time.
+    :param metadata: JSON serializable information stored in the index.
+    :returns: a dict mapping collection names to their number of records.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.snapshot-')
+    counts = {}
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(MAGIC)
+            index = {'metadata': metadata or {}, 'collections': {}}
+            for name, records in collections.items():
+                fields = _INDEX_FIELDS.get(name, ('uuid',))
+                chunks = []
+                keys = {}
+                count = 0
+                for number, chunk in enumerate(_chunks(records, CHUNK_SIZE)):
+                    data = zlib.compress(json.dumps(
+                        chunk, separators=(',', ':')).encode('utf-8'))
+                    chunks.append((f.tell(), len(data)))
+                    f.write(data)
+                    for position, record in enumerate(chunk):
+                        for field in fields:
+                            if record.get(field) is not None:
+                                keys.setdefault(str(record[field]),
+                                                (number, position))
+                    count += len(chunk)
+                index['collections'][name] = {
+                    'count': count, 'chunks': chunks, 'keys': keys}
+                counts[name] = count
+
+            data = zlib.compress(json.dumps(
+                index, separators=(',', ':')).encode('utf-8'))
+            offset = f.tell()
+            f.write(data)
+            f.write(_FOOTER.pack(offset, len(data)) + MAGIC)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+    return counts
+
+
+class Snapshot(object):
+    """A snapshot file, mapped in memory.
+
+    :raises ValueError: if the file is not a snapshot.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            try:
+                self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise ValueError('%s is empty' % path)
+        footer_size = _FOOTER.size + len(MAGIC)
+        if (len(self._map) < len(MAGIC) + footer_size or
+                self._map[:len(MAGIC)] != MAGIC or
+                self._map[-len(MAGIC):] != MAGIC):
+            self.close()
+            raise ValueError('%s is not an accelerator snapshot' % path)
+        offset, length = _FOOTER.unpack(
+            self._map[-footer_size:-len(MAGIC)])
+        try:
+            self._index = json.loads(
+                zlib.decompress(self._map[offset:offset + length]))
+        except (zlib.error, ValueError) as e:
+            self.close()
+            raise ValueError('%s has a corrupted index: %s' % (path, e))
+        self._chunk = functools.lru_cache(maxsize=8)(self._read_chunk)
+
+    @property
+    def metadata(self):
+        return self._index['metadata']
+
+    def count(self, name):
+        return self._index['collections'].get(name, {}).get('count', 0)
+
+    def _read_chunk(self, name, number):
+        offset, length = self._index['collections'][name]['chunks'][number]
+        return json.loads(zlib.decompress(self._map[offset:offset + length]))
+
+    def records(self, name):
+        """Yield the records of a collection, one chunk at a time."""
+        chunks = self._index['collections'].get(name, {}).get('chunks', ())
+        for number in range(len(chunks)):
+            yield from self._read_chunk(name, number)
+
+    def get(self, name, key):
+        """Return the record of a collection with the given key, or None."""
+        location = self._index['collections'].get(name, {}).get(
+            'keys', {}).get(key)
+        if location is None:
+            return None
+        number, position = location
+        return self._chunk(name, number)[position]
+
+    def close(self):
+        self._map.close()
+
+
+_CANONICAL_ENCODER = json.JSONEncoder(sort_keys=True, separators=(',', ':'))
+
+
+def _fingerprint(record, ignored_fields):
+    data = {key: value for key, value in record.items()
+            if key not in ignored_fields}
+    return hashlib.blake2b(_CANONICAL_ENCODER.encode(data).encode('utf-8'),
+                           digest_size=16).digest()
+
+
+def diff(old, new, name, ignored_fields=DIFF_IGNORED_FIELDS):
+    """Compare a collection of two snapshots.
+
+    The records of ``old`` are reduced to a fingerprint keyed by their uuid,
+    then the records of ``new`` are joined on it one chunk at a time, so
+    only the fingerprints are held in memory. The fields of a record are
+    only compared when the fingerprints differ.
+
+    :param old: the :class:`Snapshot` taken first.
+    :param new: the :class:`Snapshot` taken last.
+    :param ignored_fields: fields whose changes are not reported.
+    :returns: an iterator of ``(change, uuid, field, old_value, new_value)``
+        tuples where change is ``add``, ``update`` or ``delete``. An update
+        yields one tuple per changed field, the others have no field.
+    """
+    fingerprints = {}
+    for record in old.records(name):
+        if record.get('uuid') is not None:
+            fingerprints[record['uuid']] = _fingerprint(record,
+                                                        ignored_fields)
+
+    for record in new.records(name):
+        uuid = record.get('uuid')
+        if uuid is None:
+            continue
+        fingerprint = fingerprints.pop(uuid, None)
+        if fingerprint is None:
+            yield 'add', uuid, None, None, None
+        elif fingerprint != _fingerprint(record, ignored_fields):
+            previous = old.get(name, uuid)
+            for field in sorted(set(previous) | set(record)):
+                if (field not in ignored_fields and
+                        previous.get(field) != record.get(field)):
+                    yield ('update', uuid, field, previous.get(field),
+                           record.get(field))
+
+    for uuid in fingerprints:
+        yield 'delete', uuid, None, None, None
+
+
+class SnapshotAdapter(adapters.BaseAdapter):
+    """A transport adapter answering accelerator API GETs from a snapshot.
+
+    Requests other than GET fail with ``405 Method Not Allowed``.
+
+    :param snapshot: a :class:`Snapshot`.
+    :param endpoint: the endpoint URL the adapter is mounted on.
+    """
+
+    def __init__(self, snapshot, endpoint):
+        super(SnapshotAdapter, self).__init__()
+        self.snapshot = snapshot
+        self.base_path = urllib.parse.urlsplit(endpoint).path.rstrip('/')
+
+    def send(self, request, **kwargs):
+        url = urllib.parse.urlsplit(request.url)
+        parts = [urllib.parse.unquote(part) for part in
+                 url.path[len(self.base_path):].strip('/').split('/')]
+        if request.method != 'GET':
+            return self._response(request, 405, {
+                'faultstring': 'The accelerator snapshot %s is read only'
+                               % self.snapshot.path})
+        if parts == ['']:
+            return self._response(request, 200, self._version(request.url))
+        if parts[0] not in COLLECTIONS or len(parts) > 2:
+            return self._response(request, 404, {
+                'faultstring': 'Not found: %s' % url.path})
+
+        name = parts[0]
+        if len(parts) == 2:
+            record = self.snapshot.get(name, parts[1])
+            if record is None:
+                return self._response(request, 404, {
+                    'faultstring': '%s %s not found' % (name, parts[1])})
+            return self._response(request, 200, record)
+
+        query = dict(urllib.parse.parse_qsl(url.query))
+        return self._response(request, 200, {
+            COLLECTIONS[name]: self._list(name, query)})
+
+    def _version(self, url):
+        # The version document of the API the snapshot was taken from.
+        microversion = self.snapshot.metadata.get('microversion') or '2.0'
+        return {'version': {
+            'id': 'v2.0', 'status': 'CURRENT', 'min_version': '2.0',
+            'max_version': microversion,
+            'links': [{'rel': 'self', 'href': url}]}}
+
+    def _list(self, name, query):
+        limit = query.pop('limit', None)
+        marker = query.pop('marker', None)
+        states = (_RESOLVED_STATES
+                  if query.pop('bind_state', None) == 'resolved' else None)
+        fields = _QUERY_FIELDS.get(name, {})
+        filters = {fields.get(key, key): value
+                   for key, value in query.items()}
+
+        records = []
+        found_marker = marker is None
+        for record in self.snapshot.records(name):
+            if not found_marker:
+                found_marker = record.get('uuid') == marker
+                continue
+            # Like on the server, a record without the field filtered on
+            # does not match.
+            if (all(key in record and str(record[key]) == value
+                    for key, value in filters.items()) and
+                    (states is None or record.get('state') in states)):
+                records.append(record)
+                if limit and len(records) >= int(limit):
+                    break
+        return records
+
+    @staticmethod
+    def _response(request, status, body):
+        response = requests.Response()
+        response.status_code = status
+        response.reason = http.HTTPStatus(status).phrase
+        response.headers['Content-Type'] = 'application/json'
+        response._content = json.dumps(body).encode('utf-8')
+        response.encoding = 'utf-8'
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+def connect(endpoint, microversion='2.0', adapter=None):
+    """Return a connection to the accelerator API at ``endpoint``.
+
+    The connection does not authenticate. With ``adapter``, a transport
+    adapter such as :class:`SnapshotAdapter`, the requests to ``endpoint``
+    are answered by it and none leaves the process.
+
+    :param microversion: the default microversion of the requests.
+    """
+    from openstack.config import loader
+    from openstack import connection
+
+    cloud_region = loader.OpenStackConfig(
+        load_yaml_config=False, load_envvars=False).get_one(
+            auth_type='none',
+            accelerator_endpoint_override=endpoint,
+            accelerator_api_version='2',
+            accelerator_default_microversion=microversion)
+    conn = connection.Connection(config=cloud_region)
+    if adapter is not None:
+        conn.session.session.mount(endpoint, adapter)
+    return conn
@@ -13,6 +13,15 @@
 #   under the License.
 #
 
+import argparse
+import collections
+from concurrent import futures
+import functools
+import operator
+import threading
+import time
+
+from cliff import columns as cliff_columns
 from oslo_serialization import jsonutils
 
 from cyborgclient import exceptions as exc
@@ -23,6 +32,81 @@ def json_formatter(js):
     return jsonutils.dumps(js, indent=2, ensure_ascii=False)
 
 
+def is_complete(resource, attrs):
+    """Tell whether ``resource`` has a value for every one of ``attrs``.
+
+    Used to decide whether the resource returned by a create or update call
+    can be shown as is, or has to be fetched again first.
+    """
+    return all(getattr(resource, attr, None) is not None for attr in attrs)
+
+
+def positive_float(value):
+    """argparse type of options taking a number of seconds above zero."""
+    try:
+        number = float(value)
+    except ValueError:
+        number = None
+    if number is None or not number > 0:
+        raise argparse.ArgumentTypeError(
+            _('%s is not a positive number') % value)
+    return number
+
+
+def _is_formattable_column(formatter):
+    if isinstance(formatter, functools.partial):
+        formatter = formatter.func
+    return (isinstance(formatter, type) and
+            issubclass(formatter, cliff_columns.FormattableColumn))
+
+
+def make_row_getter(fields, formatters=None, mixed_case_fields=()):
+    """Compile ``fields`` into a function returning the row of an item.
+
+    The rows are the ones of :func:`osc_lib.utils.get_item_properties`, but
+    the attribute names and formatters are resolved once, and the
+    attributes are read with a single :func:`operator.attrgetter` call, so
+    list commands can build rows for many resources cheaply.
+
+    :param fields: tuple of strings with the desired field names.
+    :param formatters: dictionary mapping field names to FormattableColumn
+        subclasses, or partials wrapping one, to format the values.
+    :param mixed_case_fields: tuple of field names to preserve case.
+    :returns: a function taking an item and returning a tuple.
+    """
+    formatters = formatters or {}
+    names = tuple(field.replace(' ', '_') if field in mixed_case_fields
+                  else field.lower().replace(' ', '_') for field in fields)
+    compiled = []
+    for position, field in enumerate(fields):
+        if field in formatters:
+            if not _is_formattable_column(formatters[field]):
+                raise exc.CommandError(_('Invalid formatter provided.'))
+            compiled.append((position, formatters[field]))
+
+    if not names:
+        return lambda item: ()
+    attrgetter = operator.attrgetter(*names)
+
+    def get_values(item):
+        try:
+            values = attrgetter(item)
+        except AttributeError:
+            # Like get_item_properties, missing attributes are empty.
+            return tuple(getattr(item, name, '') for name in names)
+        return values if len(names) > 1 else (values,)
+
+    if not compiled:
+        return get_values
+
+    def get_row(item):
+        row = list(get_values(item))
+        for position, formatter in compiled:
+            row[position] = formatter(row[position])
+        return tuple(row)
+    return get_row
+
+
 def split_and_deserialize(string):
     """Split and try to JSON deserialize a string.
 
@@ -61,3 +145,50 @@ def args_array_to_patch(op, attributes):
         else:
             raise exc.CommandError(_('Unknown PATCH operation: %s') % op)
     return patch
+
+
+def concurrent_map(func, items, concurrency=1):
+    """Apply ``func`` to each of ``items`` using a bounded thread pool.
+
+    Results are yielded in the order of ``items``. At most ``concurrency``
+    calls are in flight at any time and ``items`` is consumed lazily, so
+    arbitrarily long iterables can be processed in constant memory. With a
+    concurrency of one the calls are made serially in the calling thread.
+    """
+    if concurrency <= 1:
+        for item in items:
+            yield func(item)
+        return
+
+    pending = collections.deque()
+    with futures.ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for item in items:
+            if len(pending) >= concurrency:
+                yield pending.popleft().result()
+            pending.append(executor.submit(func, item))
+        while pending:
+            yield pending.popleft().result()
+
+
+class RateLimiter(object):
+    """Spread calls so that at most ``rate`` of them start per second.
+
+    Safe to share between the threads of :func:`concurrent_map`. A rate of
+    zero or None means no limit.
+    """
+
+    def __init__(self, rate=None):
+        self.interval = 1.0 / rate if rate else 0
+        self._lock = threading.Lock()
+        self._next = time.monotonic()
+
+    def wait(self):
+        """Block until the next call is allowed to start."""
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            time.sleep(delay)
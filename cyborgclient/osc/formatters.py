@@ -0,0 +1,66 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Output formatters for the accelerator commands.
+
+The formatters are added to the list commands of the accelerator service
+with :class:`NDJSONMixin` rather than registered as ``cliff.formatter``
+entry points, which would add them to every command of the openstack
+client.
+"""
+
+import json
+
+from cliff import columns
+from cliff.formatters import base
+from stevedore import extension
+
+
+def _json_default(value):
+    if isinstance(value, columns.FormattableColumn):
+        return value.machine_readable()
+    return str(value)
+
+
+class NDJSONFormatter(base.ListFormatter):
+    """Write each row as a JSON object on its own line (JSON Lines).
+
+    Unlike the json and table formatters, rows are written and flushed as
+    soon as the command produces them, so a long listing uses constant
+    memory and can be piped to ``jq`` or a log shipper while it runs.
+    """
+
+    def add_argument_group(self, parser):
+        pass
+
+    def emit_list(self, column_names, data, stdout, parsed_args):
+        column_names = list(column_names)
+        encoder = json.JSONEncoder(default=_json_default)
+        for row in data:
+            stdout.write(encoder.encode(dict(zip(column_names, row))))
+            stdout.write('\n')
+            stdout.flush()
+
+
+class NDJSONMixin(object):
+    """Add the ``ndjson`` format to a list command.
+
+    Goes before :class:`cliff.lister.Lister` in the bases of the command.
+    """
+
+    def _load_formatter_plugins(self):
+        manager = super(NDJSONMixin, self)._load_formatter_plugins()
+        if 'ndjson' not in manager.names():
+            manager.extensions.append(extension.Extension(
+                'ndjson', None, NDJSONFormatter, NDJSONFormatter()))
+        return manager
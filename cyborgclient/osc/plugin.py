@@ -13,19 +13,40 @@
 
 """OpenStackClient plugin for Accelerator management service."""
 
+import argparse
 import logging
+import time
 
-from openstack.config import cloud_region
-from openstack.config import defaults as config_defaults
-from openstack import connection
 from osc_lib import utils
 
+# NOTE: openstacksdk is imported where it is used rather than here. The
+# openstack CLI loads every plugin module at startup, even for commands of
+# other services, and importing openstack.connection is expensive.
+
 LOG = logging.getLogger(__name__)
 
 DEFAULT_ACCELERATOR_API_VERSION = '2.3'
+# The newest microversion this client knows how to use.
+MAX_ACCELERATOR_API_VERSION = '2.3'
+AUTO_API_VERSION = 'auto'
 API_VERSION_OPTION = 'os_accelerator_api_version'
 API_NAME = 'accelerator'
 CURRENT_API_VERSION = '2'
+TOKEN_CACHE_OPTION = 'accelerator_token_cache'
+HTTP_CACHE_OPTION = 'accelerator_http_cache'
+STATS_OPTION = 'accelerator_stats'
+SNAPSHOT_OPTION = 'accelerator_from_snapshot'
+# Endpoint of the accelerator API served from a snapshot, never contacted.
+SNAPSHOT_ENDPOINT = 'http://accelerator-snapshot.invalid/v2'
+# Cached tokens are dropped this many seconds before they expire.
+TOKEN_CACHE_EXPIRY_MARGIN = 300
+# How long the maximum microversion of an endpoint is cached, in seconds.
+VERSION_CACHE_TTL = 3600
+
+# Set when --os-accelerator-api-version is "auto". OSC picks the command
+# group from the version option, so the option itself is replaced by the
+# newest known version and make_client negotiates the actual version.
+OS_ACCELERATOR_API_AUTO = False
 
 
 def _make_key(service_type, key):
@@ -37,6 +58,9 @@ def _make_key(service_type, key):
 
 
 def _get_config_from_profile(profile, **kwargs):
+    from openstack.config import cloud_region
+    from openstack.config import defaults as config_defaults
+
     # Deal with clients still trying to use legacy profile objects
     region_name = None
     for service in profile.get_services():
@@ -64,7 +88,108 @@ def _get_config_from_profile(profile, **kwargs):
     return config
 
 
+def _use_token_cache(cloud_region):
+    """Reuse the token and accelerator endpoint of a previous run.
+
+    On a cache hit the cached authentication state is installed in the auth
+    plugin of ``cloud_region`` and the cached endpoint is used as endpoint
+    override, so neither Keystone nor the service catalog is queried. On a
+    miss this authenticates immediately and stores the result.
+    """
+    from cyborgclient.common import cache
+
+    auth = cloud_region.get_auth()
+    cache_id = getattr(auth, 'get_cache_id', lambda: None)()
+    if not cache_id:
+        LOG.debug('Token cache not supported by auth plugin %s', auth)
+        return
+
+    auth_args = cloud_region.auth or {}
+    key = cache.make_key(
+        cloud_region.name, cloud_region.region_name,
+        auth_args.get('project_id'), auth_args.get('project_name'),
+        auth_args.get('project_domain_id'),
+        auth_args.get('project_domain_name'), cache_id)
+    tokens = cache.FileCache('tokens')
+    endpoint_key = _make_key(API_NAME, 'endpoint_override')
+
+    entry = tokens.get(key)
+    if entry:
+        LOG.debug('Using cached token for %s', cloud_region.name)
+        auth.set_auth_state(entry['auth_state'])
+        if entry.get('endpoint'):
+            cloud_region.config.setdefault(endpoint_key, entry['endpoint'])
+        return
+
+    session = cloud_region.get_session()
+    access = auth.get_access(session)
+    endpoint = cloud_region.config.get(endpoint_key) or session.get_endpoint(
+        service_type=API_NAME,
+        interface=cloud_region.get_interface(API_NAME),
+        region_name=cloud_region.region_name)
+    if access.expires is None:
+        return
+    tokens.set(key,
+               {'auth_state': auth.get_auth_state(), 'endpoint': endpoint},
+               expires_at=(access.expires.timestamp() -
+                           TOKEN_CACHE_EXPIRY_MARGIN))
+
+
+def _negotiate_api_version(cloud_region):
+    """Return the newest microversion supported by client and server.
+
+    The maximum microversion of the endpoint is read from its version
+    document once and then cached on disk for ``VERSION_CACHE_TTL``
+    seconds, so later runs negotiate without any request.
+    """
+    from keystoneauth1 import discover
+    from keystoneauth1 import exceptions as ksa_exc
+    from openstack import exceptions as sdk_exc
+
+    from cyborgclient.common import cache
+
+    session = cloud_region.get_session()
+    interface = cloud_region.get_interface(API_NAME)
+    endpoint = (cloud_region.config.get(_make_key(API_NAME,
+                                                  'endpoint_override')) or
+                session.get_endpoint(service_type=API_NAME,
+                                     interface=interface,
+                                     region_name=cloud_region.region_name))
+    versions = cache.FileCache('versions')
+    key = cache.make_key(endpoint)
+
+    server_max = versions.get(key)
+    if server_max is None:
+        try:
+            data = session.get_endpoint_data(
+                service_type=API_NAME, interface=interface,
+                region_name=cloud_region.region_name,
+                endpoint_override=endpoint,
+                min_version=CURRENT_API_VERSION,
+                max_version=CURRENT_API_VERSION + '.latest')
+        except (ksa_exc.DiscoveryFailure, ksa_exc.HttpError,
+                ksa_exc.ConnectionError, sdk_exc.HttpException,
+                ValueError) as e:
+            LOG.warning('Failed to discover the accelerator API version, '
+                        'using %s: %s', DEFAULT_ACCELERATOR_API_VERSION, e)
+            return DEFAULT_ACCELERATOR_API_VERSION
+        server_max = CURRENT_API_VERSION + '.0'
+        if data is not None and data.max_microversion:
+            server_max = discover.version_to_string(data.max_microversion)
+        versions.set(key, server_max,
+                     expires_at=time.time() + VERSION_CACHE_TTL)
+
+    version = min(discover.normalize_version_number(server_max),
+                  discover.normalize_version_number(
+                      MAX_ACCELERATOR_API_VERSION))
+    LOG.debug('Negotiated accelerator API version %s (server maximum %s)',
+              discover.version_to_string(version), server_max)
+    return discover.version_to_string(version)
+
+
 def create_connection(prof=None, cloud_region=None, **kwargs):
+    from openstack import connection
+
     version_key = _make_key(API_NAME, 'api_version')
     kwargs[version_key] = CURRENT_API_VERSION
 
@@ -72,11 +197,19 @@ def create_connection(prof=None, cloud_region=None, **kwargs):
         if prof:
             cloud_region = _get_config_from_profile(prof, **kwargs)
     else:
-        # If we got the CloudRegion from python-openstackclient and it doesn't
-        # already have a default microversion set, set it here.
+        if cloud_region.config.get(TOKEN_CACHE_OPTION):
+            _use_token_cache(cloud_region)
         microversion_key = _make_key(API_NAME, 'default_microversion')
-        api_version = kwargs.get('api_version', CURRENT_API_VERSION)
-        cloud_region.config.setdefault(microversion_key, api_version)
+        if kwargs.get('api_version') == AUTO_API_VERSION:
+            # A negotiated version wins over any default microversion from
+            # clouds.yaml or the environment, as the user asked for it.
+            kwargs['api_version'] = _negotiate_api_version(cloud_region)
+            cloud_region.config[microversion_key] = kwargs['api_version']
+        else:
+            # If we got the CloudRegion from python-openstackclient and it
+            # doesn't already have a default microversion set, set it here.
+            api_version = kwargs.get('api_version', CURRENT_API_VERSION)
+            cloud_region.config.setdefault(microversion_key, api_version)
 
     user_agent = kwargs.pop('user_agent', None)
     app_name = kwargs.pop('app_name', None)
@@ -90,28 +223,137 @@ def create_connection(prof=None, cloud_region=None, **kwargs):
         app_version=app_version, **kwargs)
 
 
+def _create_snapshot_connection(path):
+    """Return a connection answering accelerator requests from a snapshot.
+
+    The connection does not authenticate and its accelerator endpoint is
+    served by a :class:`cyborgclient.common.snapshot.SnapshotAdapter`, so
+    no request leaves the process.
+    """
+    from cyborgclient.common import snapshot
+    from cyborgclient import exceptions as exc
+
+    try:
+        snap = snapshot.Snapshot(path)
+    except (OSError, ValueError) as e:
+        raise exc.CommandError('Cannot read the accelerator snapshot: %s'
+                               % e)
+    conn = snapshot.connect(
+        SNAPSHOT_ENDPOINT,
+        snap.metadata.get('microversion') or CURRENT_API_VERSION + '.0',
+        snapshot.SnapshotAdapter(snap, SNAPSHOT_ENDPOINT))
+    LOG.debug('Serving the accelerator API from snapshot %s taken at %s',
+              path, snap.metadata.get('created_at'))
+    return conn
+
+
 def make_client(instance):
     """Returns a accelerator proxy"""
+    snapshot_path = instance._cli_options.config.get(SNAPSHOT_OPTION)
+    if snapshot_path:
+        acc_client = _create_snapshot_connection(snapshot_path).accelerator
+        if instance._cli_options.config.get(STATS_OPTION):
+            from cyborgclient.common import http_stats
+
+            http_stats.install(acc_client.session, SNAPSHOT_ENDPOINT)
+        return acc_client
+
+    stats = None
+    if instance._cli_options.config.get(STATS_OPTION):
+        from cyborgclient.common import http_stats
+
+        # Installed before the connection is created to also record the
+        # requests of the authentication and of the version negotiation.
+        stats = http_stats.install(
+            instance._cli_options.get_session(),
+            auth_url=instance._cli_options.config.get(
+                'auth', {}).get('auth_url'))
+
+    api_version = instance._api_version[API_NAME]
+    if OS_ACCELERATOR_API_AUTO:
+        api_version = AUTO_API_VERSION
     conn = create_connection(
         cloud_region=instance._cli_options,
-        api_version=instance._api_version[API_NAME]
+        api_version=api_version
     )
 
     LOG.debug('Connection: %s', conn)
     LOG.debug('Accelerator client initialized using OpenStackSDK: %s',
               conn.accelerator)
+    if instance._cli_options.config.get(HTTP_CACHE_OPTION):
+        from cyborgclient.common import http_cache
+
+        http_cache.install(conn.accelerator)
+    if stats:
+        stats.endpoint = conn.accelerator.get_endpoint()
     return conn.accelerator
 
 
+def _resolve_api_version(value):
+    global OS_ACCELERATOR_API_AUTO
+
+    OS_ACCELERATOR_API_AUTO = value.lower() == AUTO_API_VERSION
+    if OS_ACCELERATOR_API_AUTO:
+        LOG.debug("Replacing '%s' API version with '%s' until the version "
+                  "is negotiated", value, MAX_ACCELERATOR_API_VERSION)
+        return MAX_ACCELERATOR_API_VERSION
+    return value
+
+
+class ResolveAutoVersion(argparse.Action):
+    """Handle the ``auto`` accelerator API version."""
+
+    def __call__(self, parser, namespace, values, option_string=None):
+        setattr(namespace, self.dest, _resolve_api_version(values))
+
+
 def build_option_parser(parser):
     """Hook to add global options"""
     parser.add_argument(
         '--os-accelerator-api-version',
         metavar='<accelerator-api-version>',
-        default=utils.env(
+        action=ResolveAutoVersion,
+        default=_resolve_api_version(utils.env(
             'OS_ACCELERATOR_API_VERSION',
-            default=DEFAULT_ACCELERATOR_API_VERSION),
+            default=DEFAULT_ACCELERATOR_API_VERSION)),
         help='Accelerator API version, default=' +
              DEFAULT_ACCELERATOR_API_VERSION +
+             '. Use "auto" to negotiate the newest version supported by '
+             'both the client and the server'
              ' (Env: OS_ACCELERATOR_API_VERSION)')
+    parser.add_argument(
+        '--os-accelerator-token-cache',
+        action='store_true',
+        default=utils.env('OS_ACCELERATOR_TOKEN_CACHE',
+                          default='').lower() in ('1', 'true', 'yes'),
+        help='Cache the token and accelerator endpoint on disk and reuse '
+             'them until the token expires, skipping authentication on '
+             'later runs (Env: OS_ACCELERATOR_TOKEN_CACHE)')
+    parser.add_argument(
+        '--os-accelerator-http-cache',
+        action='store_true',
+        default=utils.env('OS_ACCELERATOR_HTTP_CACHE',
+                          default='').lower() in ('1', 'true', 'yes'),
+        help='Keep the accelerator API responses carrying an ETag or '
+             'Last-Modified validator on disk and revalidate them with '
+             'conditional requests, reusing the kept body when the server '
+             'answers 304 Not Modified (Env: OS_ACCELERATOR_HTTP_CACHE)')
+    parser.add_argument(
+        '--os-accelerator-from-snapshot',
+        metavar='<file>',
+        default=utils.env('OS_ACCELERATOR_FROM_SNAPSHOT'),
+        help='Read the accelerator inventory from a file written by '
+             '"accelerator snapshot save" instead of the API. Commands '
+             'which modify resources fail. Use with --os-auth-type none to '
+             'skip authentication too (Env: OS_ACCELERATOR_FROM_SNAPSHOT)')
+    parser.add_argument(
+        '--os-accelerator-stats',
+        action='store_true',
+        default=utils.env('OS_ACCELERATOR_STATS',
+                          default='').lower() in ('1', 'true', 'yes'),
+        help='Record the HTTP calls of the command and print, on exit, '
+             'their count and latency percentiles per URL and the time '
+             'spent authenticating, waiting for the accelerator API and in '
+             'the client. Each call is logged with --debug '
+             '(Env: OS_ACCELERATOR_STATS)')
     return parser
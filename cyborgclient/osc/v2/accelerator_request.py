@@ -14,18 +14,37 @@
 
 """Cyborg v2 Acceleration accelerator action implementations"""
 
+import csv
+import json
 import logging
+import random
+import re
+import time
 
 from openstack import exceptions as sdk_exc
 from osc_lib.command import command
 from osc_lib import utils as oscutils
+from oslo_serialization import jsonutils
 
+from cyborgclient.common import profiling
+from cyborgclient.common import raw
+from cyborgclient.common import resources
 from cyborgclient.common import utils
 from cyborgclient import exceptions as exc
 from cyborgclient.i18n import _
+from cyborgclient.osc import formatters
 
 
-class ListAcceleratorRequest(command.Lister):
+# Fields the server always returns for an accelerator_request, used to tell
+# a complete API response from one that has to be fetched again.
+_REQUIRED_FIELDS = ('uuid', 'state', 'device_profile_name')
+
+# States in which "arq wait" stops waiting for an accelerator_request.
+WAIT_TERMINAL_STATES = ('Bound', 'BindFailed')
+
+
+class ListAcceleratorRequest(profiling.ProfilingMixin, raw.RawOutputMixin,
+                             formatters.NDJSONMixin, command.Lister):
     """List all accelerator requests"""
 
     def get_parser(self, prog_name):
@@ -37,8 +56,14 @@ class ListAcceleratorRequest(command.Lister):
             default=False,
             help=_("List additional fields in output")
         )
+        raw.add_raw_argument(parser)
         return parser
 
+    def take_raw_action(self, parsed_args):
+        acc_client = self.app.client_manager.accelerator
+        raw.write_list(self.app.stdout, raw.list_records(
+            acc_client, resources.AcceleratorRequest))
+
     def take_action(self, parsed_args):
         acc_client = self.app.client_manager.accelerator
 
@@ -84,13 +109,38 @@ class ListAcceleratorRequest(command.Lister):
         data = acc_client.accelerator_requests()
         if not data:
             return (), ()
-        formatters = {}
-        return (column_headers,
-                (oscutils.get_item_properties(
-                    s, columns, formatters=formatters) for s in data))
-
-
-class CreateAcceleratorRequest(command.ShowOne):
+        return column_headers, map(utils.make_row_getter(columns), data)
+
+
+class _ListOutputMixin(object):
+    """Show the rows of a ShowOne command given --count as a list.
+
+    Goes after :class:`profiling.ProfilingMixin` in the bases of the
+    command, so the output formatting is timed and profiled either way.
+    """
+
+    def produce_output(self, parsed_args, column_names, data):
+        if parsed_args.count == 1:
+            return super(_ListOutputMixin, self).produce_output(
+                parsed_args, column_names, data)
+
+        columns = list(column_names)
+        if parsed_args.columns:
+            columns = [column for column in parsed_args.columns
+                       if column in column_names]
+            if not columns:
+                raise exc.CommandError(
+                    _('No recognized column names in %s')
+                    % ', '.join(parsed_args.columns))
+            indexes = [list(column_names).index(column)
+                       for column in columns]
+            data = [[row[index] for index in indexes] for row in data]
+        self.formatter.emit_list(columns, data, self.app.stdout, parsed_args)
+        return 0
+
+
+class CreateAcceleratorRequest(profiling.ProfilingMixin, _ListOutputMixin,
+                               command.ShowOne):
     """Register a new accelerator_request with the accelerator service"""
 
     log = logging.getLogger(__name__ + ".CreateAcceleratorRequest")
@@ -113,9 +163,37 @@ class CreateAcceleratorRequest(command.ShowOne):
             metavar='<glance_image_uuid>',
             dest='img_uuid',
             help=_("The uuid of image saved in glance."))
+        parser.add_argument(
+            '--refresh',
+            action='store_true',
+            default=False,
+            help=_("Fetch the accelerator_request again instead of "
+                   "showing the API response")
+        )
+        parser.add_argument(
+            '--count',
+            metavar='<N>',
+            type=int,
+            default=1,
+            help=_("Number of accelerator_requests to create. With more "
+                   "than one they are shown as a table (default: 1)")
+        )
+        parser.add_argument(
+            '--concurrency',
+            metavar='<N>',
+            type=int,
+            default=10,
+            help=_("Number of accelerator_requests to create in parallel "
+                   "when --count is given (default: 10)")
+        )
 
         return parser
 
+    def run(self, parsed_args):
+        self.failed = False
+        result = super(CreateAcceleratorRequest, self).run(parsed_args)
+        return 1 if self.failed else result
+
     def take_action(self, parsed_args):
         self.log.debug("take_action(%s)", parsed_args)
 
@@ -127,13 +205,57 @@ class CreateAcceleratorRequest(command.ShowOne):
             'image_uuid': parsed_args.img_uuid,
         }
 
-        accelerator_request = acc_client.create_accelerator_request(**attrs)
-
-        return _show_accelerator_request(acc_client,
-                                         accelerator_request.uuid)
+        if parsed_args.count != 1:
+            return self._create_many(acc_client, attrs, parsed_args)
 
+        accelerator_request = acc_client.create_accelerator_request(**attrs)
 
-class DeleteAcceleratorRequest(command.Command):
+        return _show_accelerator_request_response(
+            acc_client, accelerator_request.uuid, accelerator_request,
+            parsed_args.refresh)
+
+    def _create_many(self, acc_client, attrs, parsed_args):
+        # The Cyborg API creates the accelerator_requests of a single
+        # device profile per call, so the calls are made in parallel.
+        if parsed_args.count < 1 or parsed_args.concurrency < 1:
+            raise exc.CommandError(
+                _('--count and --concurrency must be at least 1'))
+        formatter = getattr(self, 'formatter', None)
+        if formatter is not None and not hasattr(formatter, 'emit_list'):
+            raise exc.CommandError(
+                _('The %s format cannot show several accelerator_requests')
+                % parsed_args.formatter)
+
+        def _create(index):
+            try:
+                arq = acc_client.create_accelerator_request(**attrs)
+                if parsed_args.refresh or not utils.is_complete(
+                        arq, _REQUIRED_FIELDS):
+                    arq = acc_client.get_accelerator_request(arq.uuid)
+            except (exc.ClientException, sdk_exc.SDKException) as e:
+                self.log.error(_("Failed to create accelerator_request "
+                                 "%(index)d: %(error)s"),
+                               {'index': index, 'error': e})
+                return None
+            return _format_accelerator_request(arq)
+
+        columns = None
+        rows = []
+        for result in utils.concurrent_map(_create,
+                                           range(1, parsed_args.count + 1),
+                                           parsed_args.concurrency):
+            if result is not None:
+                columns, row = result
+                rows.append(row)
+
+        if not rows:
+            raise exc.CommandError(
+                _('Failed to create any accelerator_request'))
+        self.failed = len(rows) < parsed_args.count
+        return columns, rows
+
+
+class DeleteAcceleratorRequest(profiling.ProfilingMixin, command.Command):
     """Delete accelerator request(s)."""
 
     log = logging.getLogger(__name__ + ".DeleteAcceleratorRequest")
@@ -146,6 +268,14 @@ class DeleteAcceleratorRequest(command.Command):
             nargs="+",
             help=_("UUID(s) of the accelerator_request(s) to delete.")
         )
+        parser.add_argument(
+            '--concurrency',
+            metavar='<N>',
+            type=int,
+            default=1,
+            help=_("Number of accelerator_requests to delete in parallel "
+                   "(default: 1)")
+        )
 
         return parser
 
@@ -153,25 +283,46 @@ class DeleteAcceleratorRequest(command.Command):
         self.log.debug("take_action(%s)", parsed_args)
 
         acc_client = self.app.client_manager.accelerator
+        concurrency = parsed_args.concurrency
+        if concurrency < 1:
+            raise exc.CommandError(_('--concurrency must be at least 1'))
 
-        failures = []
-        for uuid in parsed_args.accelerator_requests:
+        def _delete(uuid):
             try:
                 acc_client.delete_accelerator_request(uuid, False)
-                print(_('Deleted accelerator_request %s') % uuid)
             except sdk_exc.ResourceNotFound:
-                failures.append(_("No accelerator_request with UUID %s "
-                                  "exists.") % uuid)
-            except exc.ClientException as e:
-                failures.append(_("Failed to delete accelerator_request\
-                                %(accelerator_request)s: %(error)s")
-                                % {'uuid': uuid, 'error': e})
+                return _("No accelerator_request with UUID %s "
+                         "exists.") % uuid
+            except (exc.ClientException, sdk_exc.SDKException) as e:
+                return (_("Failed to delete accelerator_request "
+                          "%(uuid)s: %(error)s")
+                        % {'uuid': uuid, 'error': e})
+
+        start = time.monotonic()
+        failures = []
+        uuids = parsed_args.accelerator_requests
+        for uuid, failure in zip(uuids, utils.concurrent_map(
+                _delete, uuids, concurrency)):
+            if failure:
+                failures.append(failure)
+            else:
+                print(_('Deleted accelerator_request %s') % uuid)
+
+        if concurrency > 1:
+            elapsed = time.monotonic() - start
+            deleted = len(uuids) - len(failures)
+            print(_('Deleted %(count)d of %(total)d accelerator_request(s) '
+                    'in %(elapsed).2fs (%(rate).1f/s)')
+                  % {'count': deleted, 'total': len(uuids),
+                     'elapsed': elapsed,
+                     'rate': deleted / elapsed if elapsed else 0.0})
 
         if failures:
             raise exc.ClientException("\n".join(failures))
 
 
-class ShowAcceleratorRequest(command.ShowOne):
+class ShowAcceleratorRequest(profiling.ProfilingMixin, raw.RawOutputMixin,
+                             command.ShowOne):
     """Show accelerator_request details."""
 
     log = logging.getLogger(__name__ + ".ShowAcceleratorRequest")
@@ -183,8 +334,19 @@ class ShowAcceleratorRequest(command.ShowOne):
             metavar="<uuid>",
             help=_("UUID of the accelerator_request.")
         )
+        raw.add_raw_argument(parser)
         return parser
 
+    def take_raw_action(self, parsed_args):
+        acc_client = self.app.client_manager.accelerator
+        try:
+            raw.write_one(self.app.stdout, acc_client,
+                          resources.AcceleratorRequest,
+                          parsed_args.accelerator_request)
+        except sdk_exc.ResourceNotFound:
+            raise exc.CommandError(_('accelerator_request not found: %s')
+                                   % parsed_args.accelerator_request)
+
     def take_action(self, parsed_args):
         self.log.debug("take_action(%s)", parsed_args)
 
@@ -194,9 +356,23 @@ class ShowAcceleratorRequest(command.ShowOne):
                                          parsed_args.accelerator_request)
 
 
+def _get_accelerator_request(acc_client, uuid):
+    try:
+        return acc_client.get_accelerator_request(uuid)
+    except sdk_exc.ResourceNotFound:
+        raise exc.CommandError(_('accelerator_request not found: %s') % uuid)
+
+
 def _show_accelerator_request(acc_client, uuid):
     """Show detailed info about accelerator_request."""
 
+    accelerator_request = _get_accelerator_request(acc_client, uuid)
+    return _format_accelerator_request(accelerator_request)
+
+
+def _format_accelerator_request(accelerator_request):
+    """Format an accelerator_request for a ShowOne command."""
+
     columns = (
         "uuid",
         "state",
@@ -208,11 +384,6 @@ def _show_accelerator_request(acc_client, uuid):
         "attach_handle_info",
     )
 
-    try:
-        accelerator_request = acc_client.get_accelerator_request(uuid)
-    except sdk_exc.ResourceNotFound:
-        raise exc.CommandError(_('accelerator_request not found: %s') % uuid)
-
     formatters = {
         'data': utils.json_formatter,
     }
@@ -221,70 +392,309 @@ def _show_accelerator_request(acc_client, uuid):
                                                  formatters=formatters)
 
 
-class BindAcceleratorRequest(command.ShowOne):
+def _show_accelerator_request_response(acc_client, uuid,
+                                       accelerator_request, refresh=False):
+    """Show the accelerator_request returned by a create or update call.
+
+    The accelerator_request is only fetched again when asked to, or when
+    the API response lacks some of its fields, e.g. as the Cyborg API may
+    answer a bind or unbind with an empty body.
+    """
+    if refresh or not utils.is_complete(accelerator_request,
+                                        _REQUIRED_FIELDS):
+        return _show_accelerator_request(acc_client, uuid)
+    return _format_accelerator_request(accelerator_request)
+
+
+def _bind_patch(hostname, instance_uuid, device_rp_uuid):
+    """Build the JSON patch binding an accelerator_request."""
+    return [{'op': 'add', 'path': '/' + field, 'value': value}
+            for field, value in (('hostname', hostname),
+                                 ('instance_uuid', instance_uuid),
+                                 ('device_rp_uuid', device_rp_uuid))
+            if value]
+
+
+_WHITESPACE = re.compile(r'\s*')
+
+# Characters of a JSON array manifest read at a time.
+_MANIFEST_CHUNK_SIZE = 64 * 1024
+
+
+def _iter_json_array(f, chunk_size=_MANIFEST_CHUNK_SIZE):
+    """Yield the items of the JSON array read from ``f``, one at a time.
+
+    Only the item being decoded is held in memory, not the whole array:
+    each item is decoded with :meth:`json.JSONDecoder.raw_decode`, and
+    decoded again once more of the file is read as long as it is cut by
+    the end of the buffer.
+    """
+    decoder = json.JSONDecoder()
+    buf = ''
+    pos = 0
+    eof = False
+
+    def _read():
+        nonlocal buf, pos, eof
+        chunk = f.read(chunk_size)
+        eof = not chunk
+        buf = buf[pos:] + chunk
+        pos = 0
+
+    def _next_char():
+        # The next character which is not whitespace, '' at the end.
+        nonlocal pos
+        while True:
+            pos = _WHITESPACE.match(buf, pos).end()
+            if pos < len(buf) or eof:
+                return buf[pos:pos + 1]
+            _read()
+
+    def _item():
+        nonlocal pos
+        if not _next_char():
+            raise ValueError(_('Unterminated JSON array'))
+        while True:
+            try:
+                item, end = decoder.raw_decode(buf, pos)
+            except ValueError:
+                if eof:
+                    raise
+                _read()
+                continue
+            if end == len(buf) and not eof:
+                # The item may go on in the next chunk, like a number.
+                _read()
+                continue
+            pos = end
+            return item
+
+    if _next_char() != '[':
+        raise ValueError(_('Expected a JSON array'))
+    pos += 1
+    if _next_char() == ']':
+        return
+    while True:
+        yield _item()
+        char = _next_char()
+        if char == ']':
+            return
+        if not char:
+            raise ValueError(_('Unterminated JSON array'))
+        if char != ',':
+            raise ValueError(_("Expected ',' or ']' after an item of the "
+                               "JSON array"))
+        pos += 1
+
+
+def _read_bind_manifest(path):
+    """Yield the rows of a bind manifest, one at a time.
+
+    The manifest is either a CSV file with a header line, a JSON list of
+    objects, or JSON Lines (one object per line). Each row has an
+    ``accelerator_request`` (or ``uuid``) key and ``hostname``,
+    ``instance_uuid`` and ``device_rp_uuid`` keys. All the formats are
+    streamed, so the manifest can be larger than the memory. Rows are not
+    validated here: a JSON row may be something else than an object.
+    """
+    with open(path, newline='') as f:
+        if path.lower().endswith('.csv'):
+            for row in csv.DictReader(f):
+                yield row
+            return
+
+        head = f.read(1)
+        while head.isspace():
+            head = f.read(1)
+        f.seek(0)
+        if head == '[':
+            for row in _iter_json_array(f):
+                yield row
+            return
+        for line in f:
+            if line.strip():
+                yield jsonutils.loads(line)
+
+
+class BindAcceleratorRequest(profiling.ProfilingMixin, command.ShowOne):
     """Bind accelerator to instance."""
 
     log = logging.getLogger(__name__ + ".BindAcceleratorRequest")
 
     def get_parser(self, prog_name):
         parser = super(BindAcceleratorRequest, self).get_parser(prog_name)
-
-        parser.add_argument(
+        # argparse cannot show a group mixing positional arguments and
+        # options, so spell out both forms.
+        parser.usage = _(
+            "%(prog)s [options] <accelerator_request> <hostname> "
+            "<instance_uuid> <device_rp_uuid> <project_id>\n"
+            "       %(prog)s [options] --from-file <manifest>")
+
+        # Either one accelerator_request with its binding as arguments, or
+        # a manifest of many.
+        target = parser.add_mutually_exclusive_group(required=True)
+        target.add_argument(
             'accelerator_request',
             metavar='<accelerator_request>',
+            nargs='?',
             help=_("UUID of the accelerator request")
         )
+        target.add_argument(
+            '--from-file',
+            metavar='<manifest>',
+            help=_("Bind the accelerator requests listed in a CSV, JSON or "
+                   "JSON Lines manifest with accelerator_request, "
+                   "hostname, instance_uuid and device_rp_uuid fields, "
+                   "instead of the one given as arguments")
+        )
         parser.add_argument(
             'hostname',
             metavar='<hostname>',
-            help=_("Bind hostname of the accelerator request")
+            nargs='?',
+            help=_("Bind hostname of the accelerator request (required "
+                   "with <accelerator_request>)")
         )
         parser.add_argument(
             "instance_uuid",
             metavar="<instance_uuid>",
-            help=_("Bind instance_uuid of the accelerator request")
+            nargs='?',
+            help=_("Bind instance_uuid of the accelerator request (required "
+                   "with <accelerator_request>)")
         )
         parser.add_argument(
             "device_rp_uuid",
             metavar="<device_rp_uuid>",
-            help=_("Bind device_rp_uuid of the accelerator request")
+            nargs='?',
+            help=_("Bind device_rp_uuid of the accelerator request "
+                   "(required with <accelerator_request>)")
         )
         parser.add_argument(
             "project_id",
             metavar="<project_id>",
+            nargs='?',
             help=_("Bind current user's project_id to the accelerator "
-                   "request. The field requires at least "
+                   "request (required with <accelerator_request>). The "
+                   "field requires at least "
                    "``--os-accelerator-api-version 2.1``.")
         )
+        parser.add_argument(
+            '--refresh',
+            action='store_true',
+            default=False,
+            help=_("Fetch the accelerator_request again instead of "
+                   "showing the API response")
+        )
+        parser.add_argument(
+            '--result-file',
+            metavar='<path>',
+            help=_("With --from-file, CSV file receiving the result of each "
+                   "row (default: the manifest path followed by "
+                   "'.results.csv')")
+        )
+        parser.add_argument(
+            '--concurrency',
+            metavar='<N>',
+            type=int,
+            default=10,
+            help=_("With --from-file, number of accelerator requests to "
+                   "bind in parallel (default: 10)")
+        )
+        parser.add_argument(
+            '--rate',
+            metavar='<requests/s>',
+            type=float,
+            help=_("With --from-file, maximum number of bind requests to "
+                   "send per second (default: no limit)")
+        )
 
         return parser
 
+    def run(self, parsed_args):
+        self.failed = False
+        result = super(BindAcceleratorRequest, self).run(parsed_args)
+        return 1 if self.failed else result
+
     def take_action(self, parsed_args):
         self.log.debug("take_action(%s)", parsed_args)
 
         acc_client = self.app.client_manager.accelerator
 
-        properties = []
-        if parsed_args.hostname:
-            hostname = ["hostname=%s" % parsed_args.hostname]
-            properties.extend(utils.args_array_to_patch('add', hostname))
-        if parsed_args.instance_uuid:
-            instance_uuid = ["instance_uuid=%s" % parsed_args.instance_uuid]
-            properties.extend(utils.args_array_to_patch('add', instance_uuid))
-        if parsed_args.device_rp_uuid:
-            device_rp_uuid = ["device_rp_uuid=%s" % parsed_args.device_rp_uuid]
-            properties.extend(utils.args_array_to_patch('add', device_rp_uuid))
+        if parsed_args.from_file:
+            return self._bind_from_file(acc_client, parsed_args)
+        if not (parsed_args.hostname and parsed_args.instance_uuid and
+                parsed_args.device_rp_uuid and parsed_args.project_id):
+            raise exc.CommandError(
+                _('<hostname>, <instance_uuid>, <device_rp_uuid> and '
+                  '<project_id> are required with <accelerator_request>'))
+
+        properties = _bind_patch(parsed_args.hostname,
+                                 parsed_args.instance_uuid,
+                                 parsed_args.device_rp_uuid)
 
         if properties:
-            acc_client.update_accelerator_request(
+            accelerator_request = acc_client.update_accelerator_request(
                 parsed_args.accelerator_request, properties)
-            return _show_accelerator_request(acc_client,
-                                             parsed_args.accelerator_request)
+            return _show_accelerator_request_response(
+                acc_client, parsed_args.accelerator_request,
+                accelerator_request, parsed_args.refresh)
         else:
             self.log.warning("Please specify what to set.")
 
-
-class UnbindAcceleratorRequest(command.ShowOne):
+    def _bind_from_file(self, acc_client, parsed_args):
+        if parsed_args.concurrency < 1:
+            raise exc.CommandError(_('--concurrency must be at least 1'))
+        result_file = (parsed_args.result_file or
+                       parsed_args.from_file + '.results.csv')
+        limiter = utils.RateLimiter(parsed_args.rate)
+
+        def _bind(item):
+            index, row = item
+            if not isinstance(row, dict):
+                return index, None, _('not an object: %s') % (row,)
+            uuid = row.get('accelerator_request') or row.get('uuid')
+            properties = _bind_patch(row.get('hostname'),
+                                     row.get('instance_uuid'),
+                                     row.get('device_rp_uuid'))
+            if not uuid:
+                return index, uuid, _('no accelerator_request')
+            if not properties:
+                return index, uuid, _('nothing to bind')
+            limiter.wait()
+            try:
+                acc_client.update_accelerator_request(uuid, properties)
+            except (exc.ClientException, sdk_exc.SDKException) as e:
+                return index, uuid, str(e)
+            return index, uuid, None
+
+        start = time.monotonic()
+        total = failed = 0
+        rows = enumerate(_read_bind_manifest(parsed_args.from_file), 1)
+        try:
+            with open(result_file, 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(('row', 'accelerator_request', 'result',
+                                 'error'))
+                for index, uuid, error in utils.concurrent_map(
+                        _bind, rows, parsed_args.concurrency):
+                    total += 1
+                    if error:
+                        failed += 1
+                    writer.writerow((index, uuid or '',
+                                     'failed' if error else 'ok',
+                                     error or ''))
+        except (OSError, ValueError) as e:
+            raise exc.CommandError(_('Failed to bind from %(file)s: '
+                                     '%(error)s')
+                                   % {'file': parsed_args.from_file,
+                                      'error': e})
+
+        self.failed = bool(failed)
+        columns = ('total', 'bound', 'failed', 'elapsed', 'result_file')
+        return columns, (total, total - failed, failed,
+                         round(time.monotonic() - start, 2), result_file)
+
+
+class UnbindAcceleratorRequest(profiling.ProfilingMixin, command.ShowOne):
     """Unbind accelerator from instance."""
 
     log = logging.getLogger(__name__ + ".UnbindAcceleratorRequest")
@@ -297,6 +707,13 @@ class UnbindAcceleratorRequest(command.ShowOne):
             metavar='<accelerator_request>',
             help=_("UUID of the accelerator request")
         )
+        parser.add_argument(
+            '--refresh',
+            action='store_true',
+            default=False,
+            help=_("Fetch the accelerator_request again instead of "
+                   "showing the API response")
+        )
 
         return parser
 
@@ -309,8 +726,131 @@ class UnbindAcceleratorRequest(command.ShowOne):
                       {'path': '/instance_uuid', 'op': 'remove'},
                       {'path': '/device_rp_uuid', 'op': 'remove'}]
 
-        acc_client.update_accelerator_request(parsed_args.accelerator_request,
-                                              properties)
+        accelerator_request = acc_client.update_accelerator_request(
+            parsed_args.accelerator_request, properties)
 
-        return _show_accelerator_request(acc_client,
-                                         parsed_args.accelerator_request)
+        return _show_accelerator_request_response(
+            acc_client, parsed_args.accelerator_request,
+            accelerator_request, parsed_args.refresh)
+
+
+class WaitAcceleratorRequest(profiling.ProfilingMixin, formatters.NDJSONMixin,
+                             command.Lister):
+    """Wait for accelerator request(s) to be bound."""
+
+    log = logging.getLogger(__name__ + ".WaitAcceleratorRequest")
+
+    def get_parser(self, prog_name):
+        parser = super(WaitAcceleratorRequest, self).get_parser(prog_name)
+        parser.add_argument(
+            "accelerator_requests",
+            metavar="<uuid>",
+            nargs="*",
+            help=_("UUID(s) of the accelerator_request(s) to wait for.")
+        )
+        parser.add_argument(
+            '--instance',
+            metavar='<instance_uuid>',
+            help=_("Wait for all the accelerator_requests of the given "
+                   "instance")
+        )
+        parser.add_argument(
+            '--timeout',
+            metavar='<seconds>',
+            type=utils.positive_float,
+            default=300,
+            help=_("Give up after this many seconds (default: 300)")
+        )
+        parser.add_argument(
+            '--poll-interval',
+            metavar='<seconds>',
+            type=utils.positive_float,
+            default=1,
+            help=_("Initial delay between two polls, doubled after each "
+                   "poll (default: 1)")
+        )
+        parser.add_argument(
+            '--max-poll-interval',
+            metavar='<seconds>',
+            type=utils.positive_float,
+            default=30,
+            help=_("Maximum delay between two polls (default: 30)")
+        )
+        return parser
+
+    def run(self, parsed_args):
+        self.failed = False
+        result = super(WaitAcceleratorRequest, self).run(parsed_args)
+        return 1 if self.failed else result
+
+    def take_action(self, parsed_args):
+        self.log.debug("take_action(%s)", parsed_args)
+
+        acc_client = self.app.client_manager.accelerator
+        uuids = parsed_args.accelerator_requests
+        instance = parsed_args.instance
+        if bool(uuids) == bool(instance):
+            raise exc.CommandError(_('Specify either accelerator_request '
+                                     'UUID(s) or --instance'))
+
+        start = time.monotonic()
+        # uuid -> (accelerator_request, seconds until seen in a final state)
+        done = {}
+        attempt = 0
+        while True:
+            # A single list call per poll, however many ARQs are awaited.
+            if instance:
+                polled = list(resources.AcceleratorRequest.list(
+                    acc_client, instance=instance))
+                if not polled:
+                    raise exc.CommandError(
+                        _('No accelerator_request found for instance %s')
+                        % instance)
+                wanted = sorted(arq.uuid for arq in polled)
+            else:
+                wanted = uuids
+                awaited = set(wanted)
+                polled = [arq for arq in
+                          resources.AcceleratorRequest.list(acc_client)
+                          if arq.uuid in awaited]
+                missing = awaited.difference(arq.uuid for arq in polled)
+                if missing:
+                    raise exc.CommandError(
+                        _('accelerator_request not found: %s')
+                        % ', '.join(uuid for uuid in wanted
+                                    if uuid in missing))
+            elapsed = time.monotonic() - start
+
+            for arq in polled:
+                if arq.uuid not in done and (arq.state in
+                                             WAIT_TERMINAL_STATES):
+                    done[arq.uuid] = (arq, elapsed)
+            pending = [uuid for uuid in wanted if uuid not in done]
+            if not pending:
+                break
+            if elapsed >= parsed_args.timeout:
+                raise exc.CommandError(
+                    _('Timed out waiting for accelerator_request(s): %s')
+                    % ', '.join(pending))
+
+            # Exponential backoff with jitter, so that many concurrent
+            # waiters do not poll the API in lockstep.
+            delay = min(parsed_args.max_poll_interval,
+                        parsed_args.poll_interval * 2 ** attempt)
+            delay = random.uniform(delay / 2, delay)
+            time.sleep(min(delay, parsed_args.timeout - elapsed))
+            attempt += 1
+
+        self.failed = any(arq.state != 'Bound' for arq, _t in done.values())
+        column_headers = (
+            "uuid",
+            "state",
+            "device_profile_name",
+            "instance_uuid",
+            "time_to_bind",
+        )
+        return (column_headers,
+                [(uuid, done[uuid][0].state,
+                  done[uuid][0].device_profile_name,
+                  done[uuid][0].instance_uuid,
+                  round(done[uuid][1], 1)) for uuid in wanted])
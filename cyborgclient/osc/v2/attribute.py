@@ -16,16 +16,27 @@
 
 import logging
 
+from openstack.accelerator.v2 import attribute as _attribute
 from openstack import exceptions as sdk_exc
 from osc_lib.command import command
 from osc_lib import utils as oscutils
 
+from cyborgclient.common import inventory
+from cyborgclient.common import profiling
+from cyborgclient.common import raw
 from cyborgclient.common import utils
 from cyborgclient import exceptions as exc
 from cyborgclient.i18n import _
+from cyborgclient.osc import formatters
 
 
-class ListAttribute(command.Lister):
+# Fields the server always returns for an attribute, used to tell a
+# complete API response from one that has to be fetched again.
+_REQUIRED_FIELDS = ('uuid', 'deployable_id', 'key', 'value')
+
+
+class ListAttribute(profiling.ProfilingMixin, raw.RawOutputMixin,
+                    formatters.NDJSONMixin, command.Lister):
     """List all attributes"""
 
     column_headers = (
@@ -51,24 +62,34 @@ class ListAttribute(command.Lister):
             default=False,
             help=_("List additional fields in output")
         )
+        inventory.add_cache_arguments(parser)
+        raw.add_raw_argument(parser)
         return parser
 
+    def take_raw_action(self, parsed_args):
+        acc_client = self.app.client_manager.accelerator
+        raw.write_list(self.app.stdout,
+                       raw.list_records(acc_client, _attribute.Attribute))
+
     def take_action(self, parsed_args):
         acc_client = self.app.client_manager.accelerator
         if parsed_args.detail:
             self.column_headers += self.detail_cols
             self.columns += self.detail_cols
 
-        data = acc_client.attributes()
+        inventory_cache = inventory.InventoryCache.from_args(acc_client,
+                                                             parsed_args)
+        if inventory_cache:
+            data = inventory_cache.list('attributes', acc_client.attributes)
+        else:
+            data = acc_client.attributes()
         if not data:
             return (), ()
-        formatters = {}
         return (self.column_headers,
-                (oscutils.get_item_properties(
-                    s, self.columns, formatters=formatters) for s in data))
+                map(utils.make_row_getter(self.columns), data))
 
 
-class CreateAttribute(command.ShowOne):
+class CreateAttribute(profiling.ProfilingMixin, command.ShowOne):
     """Register a new attribute with the accelerator service"""
     log = logging.getLogger(__name__ + ".CreateAttribute")
 
@@ -89,6 +110,13 @@ class CreateAttribute(command.ShowOne):
             'value',
             metavar='<value>',
             help=_("Value for the attribute."))
+        parser.add_argument(
+            '--refresh',
+            action='store_true',
+            default=False,
+            help=_("Fetch the attribute again instead of showing the API "
+                   "response")
+        )
         return parser
 
     def take_action(self, parsed_args):
@@ -101,10 +129,14 @@ class CreateAttribute(command.ShowOne):
             'value': parsed_args.value
         }
         attribute = acc_client.create_attribute(**attrs)
-        return _show_attribute(acc_client, attribute.uuid)
+        inventory.invalidate(acc_client, 'attributes')
+        if parsed_args.refresh or not utils.is_complete(attribute,
+                                                        _REQUIRED_FIELDS):
+            return _show_attribute(acc_client, attribute.uuid)
+        return _format_attribute(attribute)
 
 
-class DeleteAttribute(command.Command):
+class DeleteAttribute(profiling.ProfilingMixin, command.Command):
     """Delete attribute(s)."""
 
     log = logging.getLogger(__name__ + ".DeleteAttribute")
@@ -129,6 +161,7 @@ class DeleteAttribute(command.Command):
         for uuid in parsed_args.attributes:
             try:
                 acc_client.delete_attribute(uuid, False)
+                inventory.invalidate(acc_client, 'attributes')
                 print(_('Deleted attribute %s') % uuid)
             except sdk_exc.ResourceNotFound:
                 raise exc.CommandError(_('Attribute %s not found') % uuid)
@@ -140,7 +173,8 @@ class DeleteAttribute(command.Command):
             raise exc.ClientException("\n".join(failures))
 
 
-class ShowAttribute(command.ShowOne):
+class ShowAttribute(profiling.ProfilingMixin, raw.RawOutputMixin,
+                    command.ShowOne):
     """Show attribute details."""
     log = logging.getLogger(__name__ + ".ShowAttribute")
 
@@ -151,17 +185,47 @@ class ShowAttribute(command.ShowOne):
             metavar="<attribute>",
             help=_("UUID of the attribute.")
         )
+        inventory.add_cache_arguments(parser)
+        raw.add_raw_argument(parser)
         return parser
 
+    def take_raw_action(self, parsed_args):
+        acc_client = self.app.client_manager.accelerator
+        try:
+            raw.write_one(self.app.stdout, acc_client, _attribute.Attribute,
+                          parsed_args.attribute)
+        except sdk_exc.ResourceNotFound:
+            raise exc.CommandError(_('Attribute %s not found')
+                                   % parsed_args.attribute)
+        except sdk_exc.HttpException as e:
+            raise exc.NotAcceptable(message=e.details)
+
     def take_action(self, parsed_args):
         self.log.debug("take_action(%s)", parsed_args)
         acc_client = self.app.client_manager.accelerator
-        return _show_attribute(acc_client,
-                               parsed_args.attribute)
+        return _show_attribute(
+            acc_client, parsed_args.attribute,
+            inventory.InventoryCache.from_args(acc_client, parsed_args))
+
+
+def _show_attribute(acc_client, uuid, inventory_cache=None):
+    """Show detailed info about attribute."""
+
+    if inventory_cache:
+        attribute = inventory_cache.find('attributes', uuid, ('uuid',))
+        if attribute is not None:
+            return _format_attribute(attribute)
+    try:
+        attribute = acc_client.get_attribute(uuid)
+    except sdk_exc.ResourceNotFound:
+        raise exc.CommandError(_('Attribute %s not found') % uuid)
+    except sdk_exc.HttpException as e:
+        raise exc.NotAcceptable(message=e.details)
+    return _format_attribute(attribute)
 
 
-def _show_attribute(acc_client, uuid):
-    """Show detailed info about device_profile."""
+def _format_attribute(attribute):
+    """Format an attribute for a ShowOne command."""
 
     columns = (
         "created_at",
@@ -171,13 +235,6 @@ def _show_attribute(acc_client, uuid):
         "key",
         "value",
     )
-    try:
-        attribute = acc_client.get_attribute(uuid)
-    except sdk_exc.ResourceNotFound:
-        raise exc.CommandError(_('Attribute %s not found') % uuid)
-    except sdk_exc.HttpException as e:
-        raise exc.NotAcceptable(message=e.details)
-
     formatters = {'data': utils.json_formatter}
     data = attribute.to_dict()
     return columns, oscutils.get_dict_properties(data, columns,
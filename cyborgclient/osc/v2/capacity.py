@@ -0,0 +1,96 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Cyborg v2 Acceleration capacity action implementations"""
+import heapq
+import logging
+
+from osc_lib.command import command
+
+from cyborgclient.common import capacity
+from cyborgclient.common import profiling
+from cyborgclient import exceptions as exc
+from cyborgclient.i18n import _
+from cyborgclient.osc import formatters
+
+
+class ShowCapacity(profiling.ProfilingMixin, formatters.NDJSONMixin,
+                   command.Lister):
+    """Show the free and allocated accelerators of the cloud.
+
+    The accelerators of the deployables are counted on the host and model
+    of their device, and the bound accelerator_requests are counted on the
+    device of the deployable they are bound to. Rows are per host, per
+    model or per device profile, ordered by their name unless
+    --sort-column is given.
+    """
+
+    log = logging.getLogger(__name__ + ".ShowCapacity")
+
+    # Rows are sorted by take_action, before --top is applied.
+    need_sort_by_cliff = False
+
+    def get_parser(self, prog_name):
+        parser = super(ShowCapacity, self).get_parser(prog_name)
+        parser.add_argument(
+            '--group-by',
+            metavar='<group>',
+            choices=capacity.GROUPS,
+            default='host',
+            help=_("Count the accelerators per %s (default: host)")
+            % ', '.join(capacity.GROUPS)
+        )
+        parser.add_argument(
+            '--top',
+            metavar='<N>',
+            type=int,
+            help=_("Only show the first N rows, for instance the hosts "
+                   "with the most free accelerators with --sort-column "
+                   "free --sort-descending")
+        )
+        return parser
+
+    def take_action(self, parsed_args):
+        self.log.debug("take_action(%s)", parsed_args)
+
+        if parsed_args.top is not None and parsed_args.top < 1:
+            raise exc.CommandError(_('--top must be at least 1'))
+        columns = capacity.COLUMNS[parsed_args.group_by]
+        unknown = [column for column in parsed_args.sort_columns
+                   if column not in columns]
+        if unknown:
+            raise exc.CommandError(
+                _('Unknown sort column %(columns)s, the columns are '
+                  '%(known)s') % {'columns': ', '.join(unknown),
+                                  'known': ', '.join(columns)})
+
+        acc_client = self.app.client_manager.accelerator
+        rows = capacity.collect(acc_client).rows(parsed_args.group_by)
+        sort_columns = (parsed_args.sort_columns +
+                        list(capacity.KEY_COLUMNS[parsed_args.group_by]))
+        return columns, _sort(rows, [columns.index(column)
+                                     for column in sort_columns],
+                              parsed_args.sort_direction == 'desc',
+                              parsed_args.top)
+
+
+def _sort(rows, indexes, reverse, top):
+    # Like cliff, empty values sort after the others in ascending order.
+    def key(row):
+        return tuple((row[index] is None, row[index]) for index in indexes)
+
+    if top is None:
+        return sorted(rows, key=key, reverse=reverse)
+    if reverse:
+        return heapq.nlargest(top, rows, key=key)
+    return heapq.nsmallest(top, rows, key=key)
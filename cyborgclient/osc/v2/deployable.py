@@ -13,18 +13,49 @@
 
 
 """Cyborg v2 Acceleration accelerator action implementations"""
+import itertools
 import logging
 
 from openstack import exceptions as sdk_exc
 from osc_lib.command import command
 from osc_lib import utils as oscutils
 
+from cyborgclient.common import inventory
+from cyborgclient.common import profiling
+from cyborgclient.common import raw
+from cyborgclient.common import resources
 from cyborgclient.common import utils
 from cyborgclient import exceptions as exc
 from cyborgclient.i18n import _
+from cyborgclient.osc import formatters
 
 
-class ListDeployable(command.Lister):
+# Fields the server always returns for a deployable, used to tell a
+# complete API response from one that has to be fetched again.
+_REQUIRED_FIELDS = ('id', 'name')
+
+
+def _deployable_query(parsed_args):
+    for opt in ('limit', 'page_size'):
+        value = getattr(parsed_args, opt)
+        if value is not None and value < 1:
+            raise exc.CommandError(
+                _('--%s must be a positive integer')
+                % opt.replace('_', '-'))
+
+    query = {}
+    if parsed_args.marker:
+        query['marker'] = parsed_args.marker
+    page_size = parsed_args.page_size or parsed_args.limit
+    if page_size:
+        # The SDK keeps following the next page until the collection is
+        # exhausted, so this only bounds the size of each request.
+        query['limit'] = page_size
+    return query
+
+
+class ListDeployable(profiling.ProfilingMixin, raw.RawOutputMixin,
+                     formatters.NDJSONMixin, command.Lister):
     """List all deployables"""
 
     def get_parser(self, prog_name):
@@ -36,8 +67,38 @@ class ListDeployable(command.Lister):
             default=False,
             help=_("List additional fields in output")
         )
+        parser.add_argument(
+            '--limit',
+            metavar='<limit>',
+            type=int,
+            help=_("Maximum number of deployables to list")
+        )
+        parser.add_argument(
+            '--marker',
+            metavar='<uuid>',
+            help=_("List deployables after the deployable with the given "
+                   "UUID")
+        )
+        parser.add_argument(
+            '--page-size',
+            metavar='<size>',
+            type=int,
+            help=_("Number of deployables to request from the server at a "
+                   "time. Rows are printed as each page arrives. Defaults "
+                   "to --limit if set, otherwise the server decides")
+        )
+        inventory.add_cache_arguments(parser)
+        raw.add_raw_argument(parser)
         return parser
 
+    def take_raw_action(self, parsed_args):
+        acc_client = self.app.client_manager.accelerator
+        records = raw.list_records(acc_client, resources.Deployable,
+                                   **_deployable_query(parsed_args))
+        if parsed_args.limit:
+            records = itertools.islice(records, parsed_args.limit)
+        raw.write_list(self.app.stdout, records)
+
     def take_action(self, parsed_args):
         acc_client = self.app.client_manager.accelerator
 
@@ -74,16 +135,25 @@ class ListDeployable(command.Lister):
                 "name",
                 "device_id",
             )
-        data = acc_client.deployables()
+        query = _deployable_query(parsed_args)
+
+        inventory_cache = inventory.InventoryCache.from_args(acc_client,
+                                                             parsed_args)
+        if inventory_cache:
+            data = inventory_cache.list(
+                'deployables', lambda: acc_client.deployables(**query),
+                query)
+        else:
+            data = acc_client.deployables(**query)
+        if parsed_args.limit:
+            data = itertools.islice(data, parsed_args.limit)
         if not data:
             return (), ()
-        formatters = {}
-        return (column_headers,
-                (oscutils.get_item_properties(
-                    s, columns, formatters=formatters) for s in data))
+        return column_headers, map(utils.make_row_getter(columns), data)
 
 
-class ShowDeployable(command.ShowOne):
+class ShowDeployable(profiling.ProfilingMixin, raw.RawOutputMixin,
+                     command.ShowOne):
     """Show deployable details."""
     log = logging.getLogger(__name__ + ".ShowDeployable")
 
@@ -94,27 +164,48 @@ class ShowDeployable(command.ShowOne):
             metavar="<uuid>",
             help=_("UUID of the deployable.")
         )
+        inventory.add_cache_arguments(parser)
+        raw.add_raw_argument(parser)
         return parser
 
+    def take_raw_action(self, parsed_args):
+        acc_client = self.app.client_manager.accelerator
+        try:
+            raw.write_one(self.app.stdout, acc_client, resources.Deployable,
+                          parsed_args.deployable)
+        except sdk_exc.ResourceNotFound:
+            raise exc.CommandError(_('deployable not found: %s')
+                                   % parsed_args.deployable)
+
     def take_action(self, parsed_args):
         self.log.debug("take_action(%s)", parsed_args)
         acc_client = self.app.client_manager.accelerator
-        return _show_deployable(acc_client,
-                                parsed_args.deployable)
+        return _show_deployable(
+            acc_client, parsed_args.deployable,
+            inventory.InventoryCache.from_args(acc_client, parsed_args))
 
 
-def _show_deployable(acc_client, uuid):
+def _show_deployable(acc_client, uuid, inventory_cache=None):
     """Show detailed info about deployable."""
+    if inventory_cache:
+        deployable = inventory_cache.find('deployables', uuid)
+        if deployable is not None:
+            return _format_deployable(deployable, uuid)
+    try:
+        deployable = acc_client.get_deployable(uuid)
+    except sdk_exc.ResourceNotFound:
+        raise exc.CommandError(_('deployable not found: %s') % uuid)
+    return _format_deployable(deployable, uuid)
+
+
+def _format_deployable(deployable, uuid):
+    """Format a deployable for a ShowOne command."""
     columns = (
         "created_at",
         "updated_at",
         "uuid",
         "name",
     )
-    try:
-        deployable = acc_client.get_deployable(uuid)
-    except sdk_exc.ResourceNotFound:
-        raise exc.CommandError(_('deployable not found: %s') % uuid)
     formatters = {
         'data': utils.json_formatter,
     }
@@ -124,7 +215,7 @@ def _show_deployable(acc_client, uuid):
                                                  formatters=formatters)
 
 
-class ProgramDeployable(command.ShowOne):
+class ProgramDeployable(profiling.ProfilingMixin, command.ShowOne):
     """Reconfigure deployable."""
     log = logging.getLogger(__name__ + ".ProgramDeployable")
 
@@ -142,6 +233,13 @@ class ProgramDeployable(command.ShowOne):
             default=False,
             help=_("Image UUID for reconfigure.")
         )
+        parser.add_argument(
+            '--refresh',
+            action='store_true',
+            default=False,
+            help=_("Fetch the deployable again instead of showing the API "
+                   "response")
+        )
         return parser
 
     def take_action(self, parsed_args):
@@ -163,5 +261,9 @@ class ProgramDeployable(command.ShowOne):
         program_info = [{'path': '/program',
                          'value': [{'image_uuid': image_uuid}],
                          'op': 'replace'}]
-        acc_client.update_deployable(dep_uuid, program_info)
-        return _show_deployable(acc_client, dep_uuid)
+        deployable = acc_client.update_deployable(dep_uuid, program_info)
+        inventory.invalidate(acc_client, 'deployables')
+        if parsed_args.refresh or not utils.is_complete(deployable,
+                                                        _REQUIRED_FIELDS):
+            return _show_deployable(acc_client, dep_uuid)
+        return _format_deployable(deployable, dep_uuid)
@@ -19,12 +19,27 @@ from openstack import exceptions as sdk_exc
 from osc_lib.command import command
 from osc_lib import utils as oscutils
 
+from cyborgclient.common import inventory
+from cyborgclient.common import profiling
+from cyborgclient.common import raw
+from cyborgclient.common import resources
 from cyborgclient.common import utils
 from cyborgclient import exceptions as exc
 from cyborgclient.i18n import _
+from cyborgclient.osc import formatters
 
 
-class ListDevice(command.Lister):
+def _device_query(parsed_args):
+    query = {}
+    for attr in ('hostname', 'type', 'vendor', 'model', 'status'):
+        value = getattr(parsed_args, attr)
+        if value is not None:
+            query[attr] = value
+    return query
+
+
+class ListDevice(profiling.ProfilingMixin, raw.RawOutputMixin,
+                 formatters.NDJSONMixin, command.Lister):
     """List all devices"""
 
     def get_parser(self, prog_name):
@@ -36,8 +51,40 @@ class ListDevice(command.Lister):
             default=False,
             help=_("List additional fields in output")
         )
+        parser.add_argument(
+            '--hostname',
+            metavar='<hostname>',
+            help=_("Only list devices on the given host")
+        )
+        parser.add_argument(
+            '--type',
+            metavar='<type>',
+            help=_("Only list devices of the given type, e.g. FPGA or GPU")
+        )
+        parser.add_argument(
+            '--vendor',
+            metavar='<vendor>',
+            help=_("Only list devices of the given vendor ID, e.g. 0x8086")
+        )
+        parser.add_argument(
+            '--model',
+            metavar='<model>',
+            help=_("Only list devices of the given model")
+        )
+        parser.add_argument(
+            '--status',
+            metavar='<status>',
+            help=_("Only list devices with the given status")
+        )
+        inventory.add_cache_arguments(parser)
+        raw.add_raw_argument(parser)
         return parser
 
+    def take_raw_action(self, parsed_args):
+        acc_client = self.app.client_manager.accelerator
+        raw.write_list(self.app.stdout, raw.list_records(
+            acc_client, resources.Device, **_device_query(parsed_args)))
+
     def take_action(self, parsed_args):
         acc_client = self.app.client_manager.accelerator
 
@@ -83,16 +130,27 @@ class ListDevice(command.Lister):
                 "std_board_info",
             )
 
-        data = acc_client.devices()
+        query = _device_query(parsed_args)
+        if query:
+            # hostname, type and vendor are filtered by the server, the
+            # other filters are applied to each device as it is received.
+            def fetch():
+                return resources.Device.list(acc_client, **query)
+        else:
+            fetch = acc_client.devices
+        inventory_cache = inventory.InventoryCache.from_args(acc_client,
+                                                             parsed_args)
+        if inventory_cache:
+            data = inventory_cache.list('devices', fetch, query)
+        else:
+            data = fetch()
         if not data:
             return (), ()
-        formatters = {}
-        return (column_headers,
-                (oscutils.get_item_properties(
-                    s, columns, formatters=formatters) for s in data))
+        return column_headers, map(utils.make_row_getter(columns), data)
 
 
-class ShowDevice(command.ShowOne):
+class ShowDevice(profiling.ProfilingMixin, raw.RawOutputMixin,
+                 command.ShowOne):
     """Show device details."""
     log = logging.getLogger(__name__ + ".ShowDevice")
 
@@ -103,16 +161,29 @@ class ShowDevice(command.ShowOne):
             metavar="<uuid>",
             help=_("UUID of the device.")
         )
+        inventory.add_cache_arguments(parser)
+        raw.add_raw_argument(parser)
         return parser
 
+    def take_raw_action(self, parsed_args):
+        acc_client = self.app.client_manager.accelerator
+        try:
+            raw.write_one(self.app.stdout, acc_client, resources.Device,
+                          parsed_args.device)
+        except sdk_exc.ResourceNotFound:
+            raise exc.CommandError(_('device not found: %s')
+                                   % parsed_args.device)
+
     def take_action(self, parsed_args):
         self.log.debug("take_action(%s)", parsed_args)
         acc_client = self.app.client_manager.accelerator
         return _show_device(acc_client,
-                            parsed_args.device)
+                            parsed_args.device,
+                            inventory.InventoryCache.from_args(acc_client,
+                                                               parsed_args))
 
 
-def _show_device(acc_client, uuid):
+def _show_device(acc_client, uuid, inventory_cache=None):
     """Show detailed info about device."""
     columns = (
         "created_at",
@@ -126,10 +197,14 @@ def _show_device(acc_client, uuid):
         "vendor_board_info",
         "status"
     )
-    try:
-        device = acc_client.get_device(uuid)
-    except sdk_exc.ResourceNotFound:
-        raise exc.CommandError(_('device not found: %s') % uuid)
+    device = None
+    if inventory_cache:
+        device = inventory_cache.find('devices', uuid, ('uuid',))
+    if device is None:
+        try:
+            device = acc_client.get_device(uuid)
+        except sdk_exc.ResourceNotFound:
+            raise exc.CommandError(_('device not found: %s') % uuid)
     formatters = {
         'data': utils.json_formatter,
     }
@@ -138,7 +213,7 @@ def _show_device(acc_client, uuid):
                                                  formatters=formatters)
 
 
-class EnableDevice(command.Command):
+class EnableDevice(profiling.ProfilingMixin, command.Command):
     """Enable device ."""
     log = logging.getLogger(__name__ + ".EnableDevice")
 
@@ -159,9 +234,10 @@ class EnableDevice(command.Command):
             acc_client.enable_device(uuid)
         except sdk_exc.ResourceNotFound:
             raise exc.CommandError(_('device not found: %s') % uuid)
+        inventory.invalidate(acc_client, 'devices')
 
 
-class DisableDevice(command.Command):
+class DisableDevice(profiling.ProfilingMixin, command.Command):
     """Disable device ."""
     log = logging.getLogger(__name__ + ".DisableDevice")
 
@@ -182,3 +258,4 @@ class DisableDevice(command.Command):
             acc_client.disable_device(uuid)
         except sdk_exc.ResourceNotFound:
             raise exc.CommandError(_('device not found: %s') % uuid)
+        inventory.invalidate(acc_client, 'devices')
@@ -16,17 +16,28 @@
 
 import logging
 
+from openstack.accelerator.v2 import device_profile as _device_profile
 from openstack import exceptions as sdk_exc
 from osc_lib.command import command
 from osc_lib import utils as oscutils
 from oslo_serialization import jsonutils
 
+from cyborgclient.common import inventory
+from cyborgclient.common import profiling
+from cyborgclient.common import raw
 from cyborgclient.common import utils
 from cyborgclient import exceptions as exc
 from cyborgclient.i18n import _
+from cyborgclient.osc import formatters
 
 
-class ListDeviceProfile(command.Lister):
+# Fields the server always returns for a device_profile, used to tell a
+# complete API response from one that has to be fetched again.
+_REQUIRED_FIELDS = ('uuid', 'name', 'groups')
+
+
+class ListDeviceProfile(profiling.ProfilingMixin, raw.RawOutputMixin,
+                        formatters.NDJSONMixin, command.Lister):
     """List all device profiles"""
 
     column_headers = (
@@ -52,24 +63,35 @@ class ListDeviceProfile(command.Lister):
             default=False,
             help=_("List additional fields in output")
         )
+        inventory.add_cache_arguments(parser)
+        raw.add_raw_argument(parser)
         return parser
 
+    def take_raw_action(self, parsed_args):
+        acc_client = self.app.client_manager.accelerator
+        raw.write_list(self.app.stdout, raw.list_records(
+            acc_client, _device_profile.DeviceProfile))
+
     def take_action(self, parsed_args):
         acc_client = self.app.client_manager.accelerator
         if parsed_args.detail:
             self.column_headers += self.detail_cols
             self.columns += self.detail_cols
 
-        data = acc_client.device_profiles()
+        inventory_cache = inventory.InventoryCache.from_args(acc_client,
+                                                             parsed_args)
+        if inventory_cache:
+            data = inventory_cache.list('device_profiles',
+                                        acc_client.device_profiles)
+        else:
+            data = acc_client.device_profiles()
         if not data:
             return (), ()
-        formatters = {}
         return (self.column_headers,
-                (oscutils.get_item_properties(
-                    s, self.columns, formatters=formatters) for s in data))
+                map(utils.make_row_getter(self.columns), data))
 
 
-class CreateDeviceProfile(command.ShowOne):
+class CreateDeviceProfile(profiling.ProfilingMixin, command.ShowOne):
     """Register a new device_profile with the accelerator service"""
     log = logging.getLogger(__name__ + ".CreateDeviceProfile")
 
@@ -90,6 +112,13 @@ class CreateDeviceProfile(command.ShowOne):
             '--description',
             metavar='<description>',
             help=_("Description for the device_profile(optional)."))
+        parser.add_argument(
+            '--refresh',
+            action='store_true',
+            default=False,
+            help=_("Fetch the device_profile again instead of showing the API "
+                   "response")
+        )
         return parser
 
     def take_action(self, parsed_args):
@@ -102,10 +131,14 @@ class CreateDeviceProfile(command.ShowOne):
             'description': parsed_args.description
         }
         device_profile = acc_client.create_device_profile(**attrs)
-        return _show_device_profile(acc_client, device_profile.uuid)
+        inventory.invalidate(acc_client, 'device_profiles')
+        if parsed_args.refresh or not utils.is_complete(device_profile,
+                                                        _REQUIRED_FIELDS):
+            return _show_device_profile(acc_client, device_profile.uuid)
+        return _format_device_profile(device_profile)
 
 
-class DeleteDeviceProfile(command.Command):
+class DeleteDeviceProfile(profiling.ProfilingMixin, command.Command):
     """Delete deviceProfile(s)."""
 
     log = logging.getLogger(__name__ + ".DeleteDeviceProfile")
@@ -130,6 +163,7 @@ class DeleteDeviceProfile(command.Command):
         for uuid in parsed_args.device_profiles:
             try:
                 acc_client.delete_device_profile(uuid, False)
+                inventory.invalidate(acc_client, 'device_profiles')
                 print(_('Deleted device_profile %s') % uuid)
             except sdk_exc.ResourceNotFound:
                 raise exc.CommandError(_('device_profile %s not found') % uuid)
@@ -141,7 +175,8 @@ class DeleteDeviceProfile(command.Command):
             raise exc.ClientException("\n".join(failures))
 
 
-class ShowDeviceProfile(command.ShowOne):
+class ShowDeviceProfile(profiling.ProfilingMixin, raw.RawOutputMixin,
+                        command.ShowOne):
     """Show device_profile details."""
     log = logging.getLogger(__name__ + ".ShowDeviceProfile")
 
@@ -154,18 +189,50 @@ class ShowDeviceProfile(command.ShowOne):
                    " The name field requires at least"
                    " ``--os-accelerator-api-version 2.2``.")
         )
+        inventory.add_cache_arguments(parser)
+        raw.add_raw_argument(parser)
         return parser
 
+    def take_raw_action(self, parsed_args):
+        acc_client = self.app.client_manager.accelerator
+        try:
+            raw.write_one(self.app.stdout, acc_client,
+                          _device_profile.DeviceProfile,
+                          parsed_args.device_profile)
+        except sdk_exc.ResourceNotFound:
+            raise exc.CommandError(_('device_profile %s not found')
+                                   % parsed_args.device_profile)
+        except sdk_exc.HttpException as e:
+            raise exc.NotAcceptable(message=e.details)
+
     def take_action(self, parsed_args):
         self.log.debug("take_action(%s)", parsed_args)
         acc_client = self.app.client_manager.accelerator
-        return _show_device_profile(acc_client,
-                                    parsed_args.device_profile)
+        return _show_device_profile(
+            acc_client, parsed_args.device_profile,
+            inventory.InventoryCache.from_args(acc_client, parsed_args))
 
 
-def _show_device_profile(acc_client, name_or_uuid):
+def _show_device_profile(acc_client, name_or_uuid, inventory_cache=None):
     """Show detailed info about device_profile."""
 
+    if inventory_cache:
+        device_profile = inventory_cache.find(
+            'device_profiles', name_or_uuid, ('uuid', 'name'))
+        if device_profile is not None:
+            return _format_device_profile(device_profile)
+    try:
+        device_profile = acc_client.get_device_profile(name_or_uuid)
+    except sdk_exc.ResourceNotFound:
+        raise exc.CommandError(_('device_profile %s not found') % name_or_uuid)
+    except sdk_exc.HttpException as e:
+        raise exc.NotAcceptable(message=e.details)
+    return _format_device_profile(device_profile)
+
+
+def _format_device_profile(device_profile):
+    """Format a device_profile for a ShowOne command."""
+
     columns = (
         "created_at",
         "updated_at",
@@ -174,13 +241,6 @@ def _show_device_profile(acc_client, name_or_uuid):
         "groups",
         "description",
     )
-    try:
-        device_profile = acc_client.get_device_profile(name_or_uuid)
-    except sdk_exc.ResourceNotFound:
-        raise exc.CommandError(_('device_profile %s not found') % name_or_uuid)
-    except sdk_exc.HttpException as e:
-        raise exc.NotAcceptable(message=e.details)
-
     formatters = {'data': utils.json_formatter}
     data = device_profile.to_dict()
     return columns, oscutils.get_dict_properties(data, columns,
@@ -0,0 +1,125 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+
+"""Cyborg v2 Acceleration host action implementations"""
+import logging
+
+from osc_lib.cli import format_columns
+from osc_lib.command import command
+from osc_lib import utils as oscutils
+
+from cyborgclient.common import inventory
+from cyborgclient.common import profiling
+from cyborgclient import exceptions as exc
+from cyborgclient.i18n import _
+from cyborgclient.osc import formatters
+
+
+class ListHost(profiling.ProfilingMixin, formatters.NDJSONMixin,
+               command.Lister):
+    """List the accelerator inventory of the hosts"""
+
+    log = logging.getLogger(__name__ + ".ListHost")
+
+    columns = ('hostname', 'devices', 'deployables', 'num_accelerators',
+               'accelerator_requests', 'instances')
+
+    def get_parser(self, prog_name):
+        parser = super(ListHost, self).get_parser(prog_name)
+        parser.add_argument(
+            '--long',
+            dest='detail',
+            action='store_true',
+            default=False,
+            help=_("List one row per deployable, with its device, "
+                   "attributes and accelerator_requests")
+        )
+        parser.add_argument(
+            '--hostname',
+            metavar='<hostname>',
+            help=_("Only list the given host")
+        )
+        return parser
+
+    def take_action(self, parsed_args):
+        self.log.debug("take_action(%s)", parsed_args)
+
+        acc_client = self.app.client_manager.accelerator
+        hosts = inventory.join(
+            inventory.fetch(acc_client, hostname=parsed_args.hostname))
+        hosts = [hosts[name] for name in sorted(hosts)]
+
+        if parsed_args.detail:
+            formatters = {
+                'attributes': format_columns.DictColumn,
+                'accelerator_requests': format_columns.ListColumn,
+                'instances': format_columns.ListColumn,
+            }
+            return (inventory.FLAT_COLUMNS,
+                    (oscutils.get_dict_properties(row, inventory.FLAT_COLUMNS,
+                                                  formatters=formatters)
+                     for host in hosts for row in inventory.flatten(host)))
+
+        return self.columns, (_summarize(host) for host in hosts)
+
+
+def _summarize(host):
+    rows = list(inventory.flatten(host))
+    arqs = [arq for row in rows for arq in row['accelerator_requests']]
+    arqs.extend(arq['uuid'] for arq in host['accelerator_requests'])
+    instances = {instance for row in rows for instance in row['instances']}
+    instances.update(arq['instance_uuid']
+                     for arq in host['accelerator_requests']
+                     if arq['instance_uuid'])
+    return (host['hostname'],
+            len(host['devices']),
+            sum(1 for row in rows if row['deployable_uuid']),
+            sum(row['num_accelerators'] or 0 for row in rows),
+            len(arqs),
+            len(instances))
+
+
+class ShowHost(profiling.ProfilingMixin, command.ShowOne):
+    """Show the devices, deployables and accelerator_requests of a host"""
+
+    log = logging.getLogger(__name__ + ".ShowHost")
+
+    columns = ('hostname', 'devices', 'accelerator_requests')
+
+    def get_parser(self, prog_name):
+        parser = super(ShowHost, self).get_parser(prog_name)
+        parser.add_argument(
+            'hostname',
+            metavar='<hostname>',
+            help=_("Name of the host")
+        )
+        return parser
+
+    def take_action(self, parsed_args):
+        self.log.debug("take_action(%s)", parsed_args)
+
+        acc_client = self.app.client_manager.accelerator
+        hosts = inventory.join(
+            inventory.fetch(acc_client, hostname=parsed_args.hostname))
+        host = hosts.get(parsed_args.hostname)
+        if host is None:
+            raise exc.CommandError(_('Host %s not found')
+                                   % parsed_args.hostname)
+
+        formatters = {
+            'devices': format_columns.ListDictColumn,
+            'accelerator_requests': format_columns.ListDictColumn,
+        }
+        return self.columns, oscutils.get_dict_properties(
+            host, self.columns, formatters=formatters)
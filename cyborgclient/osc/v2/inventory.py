@@ -0,0 +1,160 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+
+"""Cyborg v2 Acceleration inventory action implementations"""
+import logging
+import os
+
+from openstack import exceptions as sdk_exc
+from osc_lib.command import command
+
+from cyborgclient.common import cache
+from cyborgclient.common import export
+from cyborgclient.common import inventory
+from cyborgclient.common import profiling
+from cyborgclient.common import utils
+from cyborgclient import exceptions as exc
+from cyborgclient.i18n import _
+from cyborgclient.osc import formatters
+
+
+class SyncInventory(profiling.ProfilingMixin, formatters.NDJSONMixin,
+                    command.Lister):
+    """Show the inventory changes since the previous sync.
+
+    The devices, deployables and attributes seen by a sync are kept on disk
+    per endpoint and project. The next sync lists the collections in full,
+    compares the resources to them and only reports the ones added,
+    updated or deleted in between.
+    """
+
+    log = logging.getLogger(__name__ + ".SyncInventory")
+
+    columns = ('change', 'collection', 'uuid', 'updated_at')
+
+    def get_parser(self, prog_name):
+        parser = super(SyncInventory, self).get_parser(prog_name)
+        parser.add_argument(
+            '--collection',
+            metavar='<collection>',
+            dest='collections',
+            action='append',
+            choices=inventory.SYNC_COLLECTIONS,
+            help=_("Only sync the given collection, one of %s. Repeat the "
+                   "option to sync several (default: all)")
+            % ', '.join(inventory.SYNC_COLLECTIONS)
+        )
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            default=False,
+            help=_("Forget the previous sync and report every resource as "
+                   "added")
+        )
+        return parser
+
+    def take_action(self, parsed_args):
+        self.log.debug("take_action(%s)", parsed_args)
+
+        acc_client = self.app.client_manager.accelerator
+        names = list(dict.fromkeys(parsed_args.collections or
+                                   inventory.SYNC_COLLECTIONS))
+        fetchers = inventory.collection_fetchers(acc_client)
+
+        def _list(name):
+            records = (resource.to_dict(computed=False, original_names=True)
+                       for resource in fetchers[name]())
+            return {record['uuid']: record for record in records}
+
+        state = cache.FileCache('inventory-sync')
+        scope = (acc_client.get_endpoint(), acc_client.get_project_id())
+        rows = []
+        for name, current in zip(names, utils.concurrent_map(
+                _list, names, len(names))):
+            key = cache.make_key(*(scope + (name,)))
+            previous = None if parsed_args.reset else state.get(key)
+            if previous is None:
+                previous = {'records': {}}
+            changes = inventory.diff(previous['records'], current)
+
+            if changes or not previous['records']:
+                state.set(key, {'records': current})
+            self.log.info('%(name)s: %(count)d changes',
+                          {'name': name, 'count': len(changes)})
+            rows.extend((change, name, uuid, record.get('updated_at') or
+                         record.get('created_at'))
+                        for change, uuid, record in changes)
+        return self.columns, rows
+
+
+class ExportInventory(profiling.ProfilingMixin, command.Command):
+    """Export the accelerator inventory to CSV, Parquet or Arrow files.
+
+    Each collection is written to <directory>/<collection>.<format> with
+    typed columns: integers, UTC timestamps, and strings, nested values
+    being JSON encoded. The records are written in batches as the pages
+    of the API arrive.
+    """
+
+    log = logging.getLogger(__name__ + ".ExportInventory")
+
+    def get_parser(self, prog_name):
+        parser = super(ExportInventory, self).get_parser(prog_name)
+        parser.add_argument(
+            'directory',
+            metavar='<directory>',
+            help=_("Directory to write the files to")
+        )
+        parser.add_argument(
+            '--format',
+            metavar='<format>',
+            dest='file_format',
+            choices=export.FORMATS,
+            default='csv',
+            help=_("File format, one of %s (default: csv). Parquet and "
+                   "Arrow need pyarrow") % ', '.join(export.FORMATS)
+        )
+        parser.add_argument(
+            '--collection',
+            metavar='<collection>',
+            dest='collections',
+            action='append',
+            choices=list(export.COLLECTIONS),
+            help=_("Only export the given collection, one of %s. Repeat "
+                   "the option to export several (default: all)")
+            % ', '.join(export.COLLECTIONS)
+        )
+        return parser
+
+    def take_action(self, parsed_args):
+        self.log.debug("take_action(%s)", parsed_args)
+
+        acc_client = self.app.client_manager.accelerator
+        names = list(dict.fromkeys(parsed_args.collections or
+                                   export.COLLECTIONS))
+        if not os.path.isdir(parsed_args.directory):
+            raise exc.CommandError(_('%s is not a directory')
+                                   % parsed_args.directory)
+
+        def _export(name):
+            return export.export(acc_client, name, parsed_args.directory,
+                                 parsed_args.file_format)
+
+        try:
+            for path, count in utils.concurrent_map(_export, names,
+                                                    len(names)):
+                self.log.info('Wrote %(count)d records to %(path)s',
+                              {'count': count, 'path': path})
+        except (OSError, ValueError, sdk_exc.HttpException) as e:
+            raise exc.CommandError(_('Export failed: %s') % e)
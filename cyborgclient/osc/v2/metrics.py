@@ -0,0 +1,66 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+"""Cyborg v2 Acceleration metrics action implementations"""
+import logging
+
+from osc_lib.command import command
+
+from cyborgclient.common import metrics
+from cyborgclient.common import profiling
+from cyborgclient import exceptions as exc
+from cyborgclient.i18n import _
+
+
+class ExportMetrics(profiling.ProfilingMixin, command.Command):
+    """Export accelerator inventory metrics in the OpenMetrics text format.
+
+    The devices are counted by host, status and vendor, the accelerators of
+    the deployables and the ones held by bound accelerator_requests by
+    host, and the accelerator_requests by state and device profile. Each
+    collection is listed once.
+    """
+
+    log = logging.getLogger(__name__ + ".ExportMetrics")
+
+    def get_parser(self, prog_name):
+        parser = super(ExportMetrics, self).get_parser(prog_name)
+        parser.add_argument(
+            '--textfile',
+            metavar='<path>',
+            help=_("Write the metrics to this file, replaced at once, for "
+                   "the textfile collector of the Prometheus node "
+                   "exporter. Its name has to end with .prom (default: "
+                   "write to the standard output)")
+        )
+        return parser
+
+    def take_action(self, parsed_args):
+        self.log.debug("take_action(%s)", parsed_args)
+
+        acc_client = self.app.client_manager.accelerator
+        families = metrics.collect(acc_client)
+        if not parsed_args.textfile:
+            self.app.stdout.writelines(metrics.render(families))
+            return
+
+        if not parsed_args.textfile.endswith('.prom'):
+            self.log.warning(_('The textfile collector only reads files '
+                               'ending with .prom, not %s'),
+                             parsed_args.textfile)
+        try:
+            metrics.write(parsed_args.textfile, families)
+        except OSError as e:
+            raise exc.CommandError(_('Failed to write %(file)s: %(error)s')
+                                   % {'file': parsed_args.textfile,
+                                      'error': e})
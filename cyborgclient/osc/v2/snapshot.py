@@ -0,0 +1,148 @@
+#   Licensed under the Apache License, Version 2.0 (the "License"); you may
+#   not use this file except in compliance with the License. You may obtain
+#   a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+#   WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+#   License for the specific language governing permissions and limitations
+#   under the License.
+#
+
+
+"""Cyborg v2 Acceleration snapshot action implementations"""
+import datetime
+import logging
+import os
+
+from osc_lib.command import command
+
+from cyborgclient.common import inventory
+from cyborgclient.common import profiling
+from cyborgclient.common import snapshot
+from cyborgclient import exceptions as exc
+from cyborgclient.i18n import _
+from cyborgclient.osc import formatters
+
+
+class SaveSnapshot(profiling.ProfilingMixin, command.ShowOne):
+    """Save the accelerator inventory to a snapshot file.
+
+    The file can be read with --os-accelerator-from-snapshot by the list and
+    show commands when the API is not available.
+    """
+
+    log = logging.getLogger(__name__ + ".SaveSnapshot")
+
+    def get_parser(self, prog_name):
+        parser = super(SaveSnapshot, self).get_parser(prog_name)
+        parser.add_argument(
+            'file',
+            metavar='<file>',
+            help=_("Path of the snapshot file to write")
+        )
+        return parser
+
+    def take_action(self, parsed_args):
+        self.log.debug("take_action(%s)", parsed_args)
+
+        acc_client = self.app.client_manager.accelerator
+        fetchers = inventory.collection_fetchers(acc_client)
+        names = list(snapshot.COLLECTIONS)
+
+        def _list(name):
+            for resource in fetchers[name]():
+                yield resource.to_dict(computed=False, original_names=True)
+
+        created_at = datetime.datetime.now(datetime.timezone.utc).isoformat()
+        # Each collection is listed as it is written, one chunk of records
+        # at a time, so the inventory is never held in memory at once.
+        collections = {name: _list(name) for name in names}
+        try:
+            counts = snapshot.write(parsed_args.file, collections, {
+                'created_at': created_at,
+                'endpoint': acc_client.get_endpoint(),
+                'microversion': acc_client.default_microversion,
+            })
+            size = os.path.getsize(parsed_args.file)
+        except OSError as e:
+            raise exc.CommandError(_('Failed to write %(file)s: %(error)s')
+                                   % {'file': parsed_args.file, 'error': e})
+
+        columns = ('file', 'created_at', 'size') + tuple(names)
+        return columns, ((parsed_args.file, created_at, size) +
+                         tuple(counts[name] for name in names))
+
+
+class DiffSnapshot(profiling.ProfilingMixin, formatters.NDJSONMixin,
+                   command.Lister):
+    """Show the inventory changes between two snapshot files.
+
+    Resources are matched by uuid. One row is shown per added or deleted
+    resource and per changed field of an updated one.
+    """
+
+    log = logging.getLogger(__name__ + ".DiffSnapshot")
+
+    columns = ('change', 'collection', 'uuid', 'field', 'old', 'new')
+
+    def get_parser(self, prog_name):
+        parser = super(DiffSnapshot, self).get_parser(prog_name)
+        parser.add_argument(
+            'old',
+            metavar='<old-file>',
+            help=_("Snapshot taken first")
+        )
+        parser.add_argument(
+            'new',
+            metavar='<new-file>',
+            help=_("Snapshot taken last")
+        )
+        parser.add_argument(
+            '--collection',
+            metavar='<collection>',
+            dest='collections',
+            action='append',
+            choices=list(snapshot.COLLECTIONS),
+            help=_("Only compare the given collection, one of %s. Repeat "
+                   "the option to compare several (default: all)")
+            % ', '.join(snapshot.COLLECTIONS)
+        )
+        return parser
+
+    @staticmethod
+    def _open(path):
+        try:
+            return snapshot.Snapshot(path)
+        except (OSError, ValueError) as e:
+            raise exc.CommandError(_('Cannot read the accelerator snapshot: '
+                                     '%s') % e)
+
+    def take_action(self, parsed_args):
+        self.log.debug("take_action(%s)", parsed_args)
+
+        names = list(dict.fromkeys(parsed_args.collections or
+                                   snapshot.COLLECTIONS))
+        old = self._open(parsed_args.old)
+        try:
+            new = self._open(parsed_args.new)
+        except exc.CommandError:
+            old.close()
+            raise
+        try:
+            if (old.metadata.get('endpoint') !=
+                    new.metadata.get('endpoint')):
+                self.log.warning('The snapshots were taken from different '
+                                 'endpoints: %s and %s',
+                                 old.metadata.get('endpoint'),
+                                 new.metadata.get('endpoint'))
+            rows = [(change, name, uuid, field, old_value, new_value)
+                    for name in names
+                    for change, uuid, field, old_value, new_value
+                    in snapshot.diff(old, new, name)]
+        finally:
+            old.close()
+            new.close()
+        return self.columns, rows
@@ -0,0 +1,444 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+
+"""A stand-in Cyborg API server for the benchmarks.
+
+:class:`FakeCyborg` serves the devices, deployables, attributes, device
+profiles and accelerator_requests collections of the v2 API over HTTP from
+a thread of the calling process. The records are generated from their
+position in the collection when they are requested, so a server of 100k
+records of each kind only keeps the accelerator_requests changed by the
+benchmarks in memory::
+
+    with fake_server.FakeCyborg(10000, latency=0.005) as server:
+        acc_client = server.connect()
+        list(acc_client.devices())
+        print(server.calls)
+
+Lists are paged: a request returns at most ``page_size`` records, or its
+``limit`` if lower, and a ``next`` link while more records remain.
+accelerator_requests can be created, bound, unbound and deleted.
+"""
+
+import collections
+import http
+from http import server as http_server
+import json
+import threading
+import time
+import urllib.parse
+
+from cyborgclient.common import snapshot
+
+# Collections served, with the key of their list in API responses.
+COLLECTIONS = {
+    'devices': 'devices',
+    'deployables': 'deployables',
+    'attributes': 'attributes',
+    'device_profiles': 'device_profiles',
+    'accelerator_requests': 'arqs',
+}
+
+# Query parameters which do not have the name of the field they filter on.
+_QUERY_FIELDS = {
+    'accelerator_requests': {'instance': 'instance_uuid'},
+}
+
+# The first group of the UUIDs of each kind of record, the last group is
+# the position of the record.
+_KINDS = {
+    'devices': 1,
+    'deployables': 2,
+    'attributes': 3,
+    'device_profiles': 4,
+    'accelerator_requests': 5,
+    'resource_providers': 6,
+    'instances': 7,
+}
+
+# (type, vendor, model) of the generated devices, in turn.
+MODELS = (('GPU', '10de', 'A100'), ('FPGA', '8086', 'N3000'),
+          ('GPU', '10de', 'T4'))
+
+DEVICES_PER_HOST = 4
+NUM_ACCELERATORS = 2
+CREATED_AT = '2024-01-01T00:00:00+00:00'
+
+
+def make_uuid(kind, index):
+    """Return the UUID of the record at ``index`` of a collection."""
+    return '%08x-0000-4000-8000-%012x' % (_KINDS[kind], index)
+
+
+def parse_uuid(kind, uuid):
+    """Return the position of the record of a collection with ``uuid``.
+
+    :returns: an int, or None if ``uuid`` is not one of the collection.
+    """
+    parts = uuid.split('-')
+    try:
+        if len(parts) == 5 and int(parts[0], 16) == _KINDS[kind]:
+            return int(parts[4], 16)
+    except ValueError:
+        pass
+    return None
+
+
+class FakeCyborg(object):
+    """An accelerator API server with ``count`` records of each kind.
+
+    :param count: number of records of every collection, or a dict mapping
+        collection names to their number of records.
+    :param latency: seconds each request is held before it is answered.
+    :param page_size: maximum number of records of a list response.
+    :param max_version: the highest microversion announced.
+    """
+
+    def __init__(self, count, latency=0.0, page_size=1000,
+                 max_version='2.0'):
+        if not isinstance(count, dict):
+            count = dict.fromkeys(COLLECTIONS, count)
+        self.counts = {name: count.get(name, 0) for name in COLLECTIONS}
+        self.latency = latency
+        self.page_size = page_size
+        self.max_version = max_version
+        # Number of requests answered per (method, collection).
+        self.calls = collections.Counter()
+        # accelerator_requests created or changed, and the deleted ones.
+        self._changed = {}
+        self._deleted = set()
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return 'http://%s:%d' % (host, port)
+
+    @property
+    def endpoint(self):
+        return self.url + '/v2'
+
+    @property
+    def total_calls(self):
+        return sum(self.calls.values())
+
+    def start(self):
+        handler = type('Handler', (_Handler,), {'cyborg': self})
+        self._server = http_server.ThreadingHTTPServer(('127.0.0.1', 0),
+                                                       handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def connect(self):
+        """Return an SDK accelerator client of the server."""
+        return connect(self.endpoint, self.max_version)
+
+    # Records
+
+    def record(self, name, index):
+        """Return the record at ``index`` of a collection, or None."""
+        if not 0 <= index < self.counts[name]:
+            return None
+        if name == 'accelerator_requests':
+            if index in self._deleted:
+                return None
+            if index in self._changed:
+                return self._changed[index]
+        return getattr(self, '_' + name)(index)
+
+    def _links(self, name, uuid):
+        return [{'href': '%s/%s/%s' % (self.endpoint, name, uuid),
+                 'rel': 'self'}]
+
+    def _devices(self, index):
+        uuid = make_uuid('devices', index)
+        device_type, vendor, model = MODELS[index % len(MODELS)]
+        return {
+            'id': index + 1, 'uuid': uuid, 'type': device_type,
+            'vendor': vendor, 'model': model,
+            'hostname': 'compute-%d' % (index // DEVICES_PER_HOST),
+            'std_board_info': '{"product_id": "%04x"}' % index,
+            'vendor_board_info': None, 'status': 'enabled',
+            'created_at': CREATED_AT, 'updated_at': None,
+            'links': self._links('devices', uuid),
+        }
+
+    def _deployables(self, index):
+        uuid = make_uuid('deployables', index)
+        return {
+            'id': index + 1, 'uuid': uuid, 'name': 'deployable-%d' % index,
+            'parent_id': None, 'root_id': index + 1,
+            'num_accelerators': NUM_ACCELERATORS,
+            'device_id': index % max(self.counts['devices'], 1) + 1,
+            'rp_uuid': make_uuid('resource_providers', index),
+            'driver_name': 'fake', 'bitstream_id': None,
+            'created_at': CREATED_AT, 'updated_at': None,
+            'links': self._links('deployables', uuid),
+        }
+
+    def _attributes(self, index):
+        uuid = make_uuid('attributes', index)
+        return {
+            'id': index + 1, 'uuid': uuid,
+            'deployable_id': index % max(self.counts['deployables'], 1) + 1,
+            'key': 'rc', 'value': MODELS[index % len(MODELS)][0],
+            'created_at': CREATED_AT, 'updated_at': None,
+            'links': self._links('attributes', uuid),
+        }
+
+    def _device_profiles(self, index):
+        uuid = make_uuid('device_profiles', index)
+        device_type = MODELS[index % len(MODELS)][0]
+        return {
+            'id': index + 1, 'uuid': uuid, 'name': 'dp-%d' % index,
+            'description': None,
+            'groups': [{'resources:%s' % device_type: '1'}],
+            'created_at': CREATED_AT, 'updated_at': None,
+            'links': self._links('device_profiles', uuid),
+        }
+
+    def _accelerator_requests(self, index):
+        # Every other accelerator_request is bound to a deployable.
+        uuid = make_uuid('accelerator_requests', index)
+        bound = index % 2 == 0 and self.counts['deployables']
+        deployable = index % max(self.counts['deployables'], 1)
+        device = deployable % max(self.counts['devices'], 1)
+        return {
+            'uuid': uuid, 'state': 'Bound' if bound else 'Initial',
+            'device_profile_name': 'dp-%d' % (
+                index % max(self.counts['device_profiles'], 1)),
+            'device_profile_group_id': 0,
+            'hostname': ('compute-%d' % (device // DEVICES_PER_HOST)
+                         if bound else None),
+            'device_rp_uuid': (make_uuid('resource_providers', deployable)
+                               if bound else None),
+            'instance_uuid': (make_uuid('instances', index)
+                              if bound else None),
+            'attach_handle_type': 'PCI' if bound else None,
+            'attach_handle_info': ({'bus': '%02x' % (deployable % 256),
+                                    'device': '00', 'domain': '0000',
+                                    'function': '0'} if bound else None),
+            'links': self._links('accelerator_requests', uuid),
+        }
+
+    def _index(self, name, key):
+        if name == 'device_profiles' and key.startswith('dp-'):
+            try:
+                return int(key[3:])
+            except ValueError:
+                return None
+        return parse_uuid(name, key)
+
+    def find(self, name, key):
+        """Return the record of a collection with the given key, or None."""
+        index = self._index(name, key)
+        return None if index is None else self.record(name, index)
+
+    def list(self, name, query):
+        """Return a page of a collection and the query of the next one."""
+        limit = min(int(query.pop('limit', self.page_size)), self.page_size)
+        marker = query.pop('marker', None)
+        start = 0
+        if marker is not None:
+            start = self._index(name, marker)
+            if start is None:
+                raise LookupError('Marker %s not found' % marker)
+            start += 1
+        fields = _QUERY_FIELDS.get(name, {})
+        filters = [(fields.get(key, key), value)
+                   for key, value in query.items()]
+
+        records = []
+        index = start
+        while index < self.counts[name] and len(records) < limit:
+            record = self.record(name, index)
+            index += 1
+            if record is not None and all(
+                    str(record.get(key)) == value for key, value in filters):
+                records.append(record)
+        more = index < self.counts[name]
+        return records, more
+
+    def create_accelerator_request(self, body):
+        with self._lock:
+            index = self.counts['accelerator_requests']
+            self.counts['accelerator_requests'] += 1
+            uuid = make_uuid('accelerator_requests', index)
+            record = self._changed[index] = {
+                'uuid': uuid, 'state': 'Initial',
+                'device_profile_name': body.get('device_profile_name'),
+                'device_profile_group_id':
+                    body.get('device_profile_group_id') or 0,
+                'hostname': None, 'device_rp_uuid': None,
+                'instance_uuid': None, 'attach_handle_type': None,
+                'attach_handle_info': None,
+                'links': self._links('accelerator_requests', uuid),
+            }
+        return record
+
+    def patch_accelerator_request(self, uuid, patch):
+        """Apply a JSON patch to an accelerator_request.
+
+        :returns: the record, or None if it does not exist.
+        """
+        index = parse_uuid('accelerator_requests', uuid)
+        with self._lock:
+            record = None if index is None else self.record(
+                'accelerator_requests', index)
+            if record is None:
+                return None
+            record = dict(record)
+            for op in patch:
+                field = op['path'].lstrip('/')
+                record[field] = (None if op['op'] == 'remove'
+                                 else op.get('value'))
+            if all(record.get(field) for field in
+                   ('hostname', 'instance_uuid', 'device_rp_uuid')):
+                record['state'] = 'Bound'
+            elif any(op['op'] == 'remove' for op in patch):
+                record['state'] = 'Unbound'
+            self._changed[index] = record
+        return record
+
+    def delete_accelerator_request(self, uuid):
+        index = parse_uuid('accelerator_requests', uuid)
+        with self._lock:
+            if index is None or self.record('accelerator_requests',
+                                            index) is None:
+                return False
+            self._changed.pop(index, None)
+            self._deleted.add(index)
+        return True
+
+
+class _Handler(http_server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written apart, do not let them wait for an ACK.
+    disable_nagle_algorithm = True
+    cyborg = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, body=None):
+        data = b'' if body is None else json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('OpenStack-API-Version',
+                         'accelerator %s' % self.cyborg.max_version)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _error(self, status, message):
+        self._reply(status, {'faultstring': message})
+
+    def _body(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        return json.loads(self.rfile.read(length)) if length else {}
+
+    def _route(self):
+        url = urllib.parse.urlsplit(self.path)
+        parts = [urllib.parse.unquote(part)
+                 for part in url.path.strip('/').split('/')]
+        if parts[0] == 'v2':
+            parts = parts[1:]
+        name = parts[0] if parts else ''
+        self.cyborg.calls[self.command, name] += 1
+        if self.cyborg.latency:
+            time.sleep(self.cyborg.latency)
+        return name, parts[1:], dict(urllib.parse.parse_qsl(url.query))
+
+    def do_GET(self):
+        name, parts, query = self._route()
+        if not name:
+            self._reply(200, {'version': {
+                'id': 'v2.0', 'status': 'CURRENT', 'min_version': '2.0',
+                'max_version': self.cyborg.max_version,
+                'links': [{'rel': 'self',
+                           'href': self.cyborg.endpoint + '/'}]}})
+        elif name not in COLLECTIONS or len(parts) > 1:
+            self._error(404, 'Not found: %s' % self.path)
+        elif parts:
+            record = self.cyborg.find(name, parts[0])
+            if record is None:
+                self._error(404, '%s %s not found' % (name, parts[0]))
+            else:
+                self._reply(200, record)
+        else:
+            try:
+                records, more = self.cyborg.list(name, dict(query))
+            except (LookupError, ValueError) as e:
+                self._error(400, str(e))
+                return
+            body = {COLLECTIONS[name]: records}
+            if more and records:
+                query.update(limit=str(len(records)),
+                             marker=records[-1]['uuid'])
+                body['next'] = '%s/%s?%s' % (self.cyborg.endpoint, name,
+                                             urllib.parse.urlencode(query))
+            self._reply(200, body)
+
+    def do_POST(self):
+        name, parts, query = self._route()
+        if name != 'accelerator_requests' or parts:
+            self._error(405, 'Only accelerator_requests can be created')
+            return
+        record = self.cyborg.create_accelerator_request(self._body())
+        self._reply(201, {'arqs': [record]})
+
+    def do_PATCH(self):
+        name, parts, query = self._route()
+        if name != 'accelerator_requests':
+            self._error(405, 'Only accelerator_requests can be patched')
+            return
+        for uuid, patch in self._body().items():
+            if self.cyborg.patch_accelerator_request(uuid, patch) is None:
+                self._error(404, 'accelerator_requests %s not found' % uuid)
+                return
+        self._reply(http.HTTPStatus.ACCEPTED)
+
+    def do_DELETE(self):
+        name, parts, query = self._route()
+        if name != 'accelerator_requests' or len(parts) != 1:
+            self._error(405, 'Only accelerator_requests can be deleted')
+        elif self.cyborg.delete_accelerator_request(parts[0]):
+            self._reply(http.HTTPStatus.NO_CONTENT)
+        else:
+            self._error(404, 'accelerator_requests %s not found' % parts[0])
+
+
+def connect(endpoint, microversion='2.0'):
+    """Return an SDK accelerator client of the API at ``endpoint``.
+
+    The client does not authenticate, like the one of a snapshot.
+    """
+    return snapshot.connect(endpoint, microversion).accelerator
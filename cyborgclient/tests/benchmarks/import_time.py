@@ -0,0 +1,94 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+
+"""Measure the startup cost of the accelerator OSC plugin.
+
+The openstack CLI imports every ``openstack.cli.extension`` entry point on
+startup, whatever the command, so anything imported at module level by
+:mod:`cyborgclient.osc.plugin` is paid for by every openstack command.
+
+Each run imports the plugin in a fresh interpreter, after the modules the
+CLI itself has already loaded by then (``BASELINE_MODULES``), and reports
+the time spent and the modules the plugin added. Usage::
+
+    python -m cyborgclient.tests.benchmarks.import_time --runs 20 \\
+        --max-ms 50
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+PLUGIN_MODULE = 'cyborgclient.osc.plugin'
+
+#: Modules loaded by the openstack CLI before it loads the plugins.
+BASELINE_MODULES = ('osc_lib.utils', 'cliff.command')
+
+_PROBE = """
+import importlib, json, sys, time
+for name in %(baseline)r:
+    importlib.import_module(name)
+before = set(sys.modules)
+start = time.perf_counter()
+importlib.import_module(%(module)r)
+elapsed = time.perf_counter() - start
+print(json.dumps({'ms': elapsed * 1000,
+                  'modules': sorted(set(sys.modules) - before)}))
+"""
+
+
+def measure(module=PLUGIN_MODULE, baseline=BASELINE_MODULES):
+    """Import ``module`` in a fresh interpreter.
+
+    :returns: A dict with the import time in milliseconds (``ms``) and the
+        names of the modules it loaded on top of ``baseline`` (``modules``).
+    """
+    probe = _PROBE % {'baseline': tuple(baseline), 'module': module}
+    output = subprocess.check_output([sys.executable, '-c', probe])
+    return json.loads(output)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--runs', type=int, default=10,
+                        help='Number of interpreters to start (default: 10)')
+    parser.add_argument('--cold', action='store_true',
+                        help='Do not preload the CLI baseline modules')
+    parser.add_argument('--max-ms', type=float,
+                        help='Fail if the median import time exceeds this')
+    args = parser.parse_args(argv)
+
+    baseline = () if args.cold else BASELINE_MODULES
+    results = [measure(baseline=baseline) for _ in range(args.runs)]
+    timings = [r['ms'] for r in results]
+    median = statistics.median(timings)
+    print(json.dumps({
+        'module': PLUGIN_MODULE,
+        'baseline': list(baseline),
+        'runs': args.runs,
+        'min_ms': round(min(timings), 3),
+        'median_ms': round(median, 3),
+        'max_ms': round(max(timings), 3),
+        'modules': results[-1]['modules'],
+    }, indent=2))
+    if args.max_ms is not None and median > args.max_ms:
+        print('median import time %.1fms exceeds %.1fms'
+              % (median, args.max_ms), file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
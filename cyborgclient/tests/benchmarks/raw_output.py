@@ -0,0 +1,125 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+
+"""Compare "device list --long -f json" with "device list --raw".
+
+The devices are served in-process from a snapshot file through the SDK, so
+no server is needed; answering the requests costs the same in both cases.
+Each way of listing is run once to measure its CPU time per device and
+once under tracemalloc to measure its peak memory. Usage::
+
+    python -m cyborgclient.tests.benchmarks.raw_output --devices 5000
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from cliff.formatters import json_format
+
+from cyborgclient.common import raw
+from cyborgclient.common import resources
+from cyborgclient.common import snapshot
+from cyborgclient.common import utils
+from cyborgclient.osc import plugin
+
+#: The columns of "openstack accelerator device list --long".
+COLUMNS = ('created_at', 'updated_at', 'uuid', 'type', 'vendor', 'model',
+           'hostname', 'std_board_info', 'vendor_board_info', 'status')
+
+
+def make_devices(count):
+    for i in range(count):
+        yield {
+            'uuid': '%032x' % i, 'type': 'GPU', 'vendor': '10de',
+            'model': 'A100', 'hostname': 'compute-%d' % (i // 8),
+            'std_board_info': '{"product_id": "20b5", "controller": '
+                              '"3D controller"}',
+            'vendor_board_info': None, 'status': 'enabled',
+            'created_at': '2024-01-01T00:00:00+00:00', 'updated_at': None,
+            'links': [{'href': 'http://cyborg/v2/devices/%032x' % i,
+                       'rel': 'self'}],
+        }
+
+
+def formatted(acc_client, stdout, page_size):
+    data = acc_client.devices(limit=page_size)
+    json_format.JSONFormatter().emit_list(
+        COLUMNS, map(utils.make_row_getter(COLUMNS), data), stdout,
+        argparse.Namespace(noindent=True))
+
+
+def passthrough(acc_client, stdout, page_size):
+    raw.write_list(stdout, raw.list_records(acc_client, resources.Device,
+                                            limit=page_size))
+
+
+def _run(func, acc_client, page_size):
+    with open(os.devnull, 'w') as stdout:
+        start = time.process_time()
+        func(acc_client, stdout, page_size)
+        cpu = time.process_time() - start
+
+        tracemalloc.start()
+        try:
+            func(acc_client, stdout, page_size)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return cpu, peak
+
+
+def measure(count, page_size=1000):
+    """List ``count`` devices both ways.
+
+    :returns: A dict mapping ``formatted`` and ``raw`` to a dict with the
+        CPU microseconds per device (``cpu_us``) and the peak of traced
+        memory in bytes (``peak_bytes``).
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'devices.snap')
+        snapshot.write(path, {'devices': make_devices(count)})
+        acc_client = plugin._create_snapshot_connection(path).accelerator
+        results = {}
+        for name, func in (('formatted', formatted), ('raw', passthrough)):
+            cpu, peak = _run(func, acc_client, page_size)
+            results[name] = {'cpu_us': cpu / count * 1e6,
+                             'peak_bytes': peak}
+        return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--devices', type=int, default=5000,
+                        help='Number of devices (default: 5000)')
+    parser.add_argument('--page-size', type=int, default=1000,
+                        help='Devices per request (default: 1000)')
+    args = parser.parse_args(argv)
+
+    results = measure(args.devices, args.page_size)
+    print(json.dumps({
+        'devices': args.devices,
+        'page_size': args.page_size,
+        'results': {name: {'cpu_us_per_device': round(r['cpu_us'], 2),
+                           'peak_mib': round(r['peak_bytes'] / 2 ** 20, 2)}
+                    for name, r in results.items()},
+    }, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,88 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+
+"""Measure how fast list commands turn resources into table rows.
+
+Builds deployables like the ones the API returns and times turning each of
+them into a row with :func:`osc_lib.utils.get_item_properties`, as the list
+commands used to, and with a getter compiled once by
+:func:`cyborgclient.common.utils.make_row_getter`. Usage::
+
+    python -m cyborgclient.tests.benchmarks.row_extraction --rows 50000
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from osc_lib import utils as oscutils
+
+from cyborgclient.common import resources
+from cyborgclient.common import utils
+
+#: The columns of "openstack accelerator deployable list --long".
+COLUMNS = ('id', 'parent_id', 'root_id', 'name', 'num_accelerators',
+           'device_id')
+
+
+def make_deployables(count):
+    return [resources.Deployable.existing(
+        uuid='%032x' % i, parent_id=None, root_id=i, name='dep-%d' % i,
+        num_accelerators=i % 4, device_id=i // 4) for i in range(count)]
+
+
+def _rate(count, func):
+    start = time.perf_counter()
+    func()
+    return count / (time.perf_counter() - start)
+
+
+def measure(count, columns=COLUMNS):
+    """Turn ``count`` deployables into rows both ways.
+
+    :returns: A dict with the rows per second of get_item_properties
+        (``before``) and of a compiled row getter (``after``).
+    """
+    deployables = make_deployables(count)
+
+    def before():
+        for item in deployables:
+            oscutils.get_item_properties(item, columns, formatters={})
+
+    def after():
+        for row in map(utils.make_row_getter(columns), deployables):
+            pass
+
+    return {'before': _rate(count, before), 'after': _rate(count, after)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--rows', type=int, default=50000,
+                        help='Number of deployables (default: 50000)')
+    args = parser.parse_args(argv)
+
+    result = measure(args.rows)
+    print(json.dumps({
+        'rows': args.rows,
+        'columns': list(COLUMNS),
+        'before_rows_per_s': round(result['before']),
+        'after_rows_per_s': round(result['after']),
+        'speedup': round(result['after'] / result['before'], 2),
+    }, indent=2))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,312 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+
+"""Run the accelerator commands against a stand-in Cyborg API server.
+
+For each scale a :class:`fake_server.FakeCyborg` is started with that many
+records of each kind, then every list, show and bulk command of
+:data:`SCENARIOS` is run against it in a process of its own, so the peak
+RSS of the process is the one of the command. The wall time, rows per
+second, API calls answered by the server and peak RSS of every run are
+written to a JSON results file which can be compared across releases::
+
+    python -m cyborgclient.tests.benchmarks.suite --scale 1000 \\
+        --scale 10000 --scale 100000 --latency 0.002 \\
+        --output results.json
+
+Show commands are run ``--shows`` times on records spread across the
+collection. Bulk commands create, bind and delete ``--bulk`` (by default
+the scale) accelerator_requests.
+"""
+
+import argparse
+import collections
+import contextlib
+import csv
+import datetime
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from cyborgclient.osc.v2 import accelerator_request
+from cyborgclient.osc.v2 import attribute
+from cyborgclient.osc.v2 import capacity
+from cyborgclient.osc.v2 import deployable
+from cyborgclient.osc.v2 import device
+from cyborgclient.osc.v2 import device_profile
+from cyborgclient.osc.v2 import host
+from cyborgclient.tests.benchmarks import fake_server
+
+SCALES = (1000, 10000, 100000)
+
+Scenario = collections.namedtuple('Scenario', 'kind command args')
+
+#: The commands run, in order. List scenarios are run once, show scenarios
+#: once per key and bulk scenarios once over all the records. The bulk
+#: scenarios change the accelerator_requests, so they come last.
+SCENARIOS = collections.OrderedDict((
+    ('device list', Scenario('list', device.ListDevice,
+                             ['--long', '-f', 'json'])),
+    ('deployable list', Scenario('list', deployable.ListDeployable,
+                                 ['--long', '-f', 'json'])),
+    ('device attribute list', Scenario('list', attribute.ListAttribute,
+                                       ['--long', '-f', 'json'])),
+    ('device profile list', Scenario('list', device_profile.ListDeviceProfile,
+                                     ['--long', '-f', 'json'])),
+    ('arq list', Scenario('list', accelerator_request.ListAcceleratorRequest,
+                          ['--long', '-f', 'json'])),
+    ('host list', Scenario('list', host.ListHost, ['-f', 'json'])),
+    ('capacity show', Scenario('list', capacity.ShowCapacity,
+                               ['-f', 'json'])),
+    ('device show', Scenario('show', device.ShowDevice, ['-f', 'json'])),
+    ('deployable show', Scenario('show', deployable.ShowDeployable,
+                                 ['-f', 'json'])),
+    ('device attribute show', Scenario('show', attribute.ShowAttribute,
+                                       ['-f', 'json'])),
+    ('device profile show', Scenario('show', device_profile.ShowDeviceProfile,
+                                     ['-f', 'json'])),
+    ('arq show', Scenario('show', accelerator_request.ShowAcceleratorRequest,
+                          ['-f', 'json'])),
+    ('arq create', Scenario('create',
+                            accelerator_request.CreateAcceleratorRequest,
+                            ['dp-0', '-f', 'json'])),
+    ('arq bind', Scenario('bind', accelerator_request.BindAcceleratorRequest,
+                          ['-f', 'json'])),
+    ('arq delete', Scenario('delete',
+                            accelerator_request.DeleteAcceleratorRequest,
+                            [])),
+))
+
+# The collection the key of each show scenario is taken from.
+_SHOWN = {
+    'device show': 'devices',
+    'deployable show': 'deployables',
+    'device attribute show': 'attributes',
+    'device profile show': 'device_profiles',
+    'arq show': 'accelerator_requests',
+}
+
+
+class _App(object):
+    def __init__(self, acc_client, stdout):
+        self.client_manager = argparse.Namespace(accelerator=acc_client)
+        self.stdin = sys.stdin
+        self.stdout = stdout
+        self.stderr = sys.stderr
+
+
+def _show_keys(name, scale, shows):
+    collection = _SHOWN[name]
+    for i in range(min(shows, scale)):
+        index = i * scale // min(shows, scale)
+        if collection == 'device_profiles':
+            yield 'dp-%d' % index
+        else:
+            yield fake_server.make_uuid(collection, index)
+
+
+def _write_manifest(path, count):
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(('accelerator_request', 'hostname', 'instance_uuid',
+                         'device_rp_uuid'))
+        for index in range(count):
+            writer.writerow((
+                fake_server.make_uuid('accelerator_requests', index),
+                'compute-%d' % index,
+                fake_server.make_uuid('instances', index),
+                fake_server.make_uuid('resource_providers', index)))
+
+
+def _argvs(name, scale, shows, bulk, concurrency, directory):
+    """Return the arguments of each run of a scenario and its rows."""
+    scenario = SCENARIOS[name]
+    if scenario.kind == 'list':
+        return [scenario.args], scale
+    if scenario.kind == 'show':
+        keys = list(_show_keys(name, scale, shows))
+        return [[key] + scenario.args for key in keys], len(keys)
+    if scenario.kind == 'create':
+        return [scenario.args + ['--count', str(bulk),
+                                 '--concurrency', str(concurrency)]], bulk
+    if scenario.kind == 'bind':
+        manifest = os.path.join(directory, 'bind.csv')
+        _write_manifest(manifest, bulk)
+        return [scenario.args + [
+            '--from-file', manifest,
+            '--result-file', os.path.join(directory, 'bind.results.csv'),
+            '--concurrency', str(concurrency)]], bulk
+    return [[fake_server.make_uuid('accelerator_requests', index)
+             for index in range(bulk)] +
+            ['--concurrency', str(concurrency)]], bulk
+
+
+def _peak_rss_kib():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def run_scenario(endpoint, name, scale, shows=100, bulk=None, concurrency=10):
+    """Run a scenario in this process against the API at ``endpoint``.
+
+    :returns: a dict with the number of ``rows`` handled, the ``wall_s``
+        seconds it took, the ``exit_code`` of the last failed run (0 if
+        none failed) and the peak RSS of the process before the scenario
+        (``baseline_rss_kib``) and after it (``peak_rss_kib``).
+    """
+    scenario = SCENARIOS[name]
+    acc_client = fake_server.connect(endpoint)
+    baseline = _peak_rss_kib()
+    exit_code = 0
+    with tempfile.TemporaryDirectory() as directory, \
+            open(os.devnull, 'w') as stdout, \
+            contextlib.redirect_stdout(stdout):
+        argvs, rows = _argvs(name, scale, shows,
+                             scale if bulk is None else bulk, concurrency,
+                             directory)
+        cmd = scenario.command(_App(acc_client, stdout), None)
+        parser = cmd.get_parser(name)
+        start = time.monotonic()
+        for argv in argvs:
+            try:
+                result = cmd.run(parser.parse_args(argv))
+            except Exception as e:
+                print('%s %s failed: %s' % (name, ' '.join(argv[:2]), e),
+                      file=sys.stderr)
+                result = 1
+            exit_code = result or exit_code
+        wall = time.monotonic() - start
+    return {'rows': rows, 'wall_s': wall, 'exit_code': exit_code,
+            'baseline_rss_kib': baseline, 'peak_rss_kib': _peak_rss_kib()}
+
+
+def _spawn(endpoint, name, scale, shows, bulk, concurrency):
+    argv = [sys.executable, '-m', __spec__.name, '--endpoint', endpoint,
+            '--scenario', name, '--scale', str(scale),
+            '--shows', str(shows), '--concurrency', str(concurrency)]
+    if bulk is not None:
+        argv += ['--bulk', str(bulk)]
+    process = subprocess.run(argv, stdout=subprocess.PIPE, check=True,
+                             universal_newlines=True)
+    return json.loads(process.stdout)
+
+
+def run(scales=SCALES, scenarios=None, latency=0.0, page_size=1000,
+        shows=100, bulk=None, concurrency=10):
+    """Run the scenarios at every scale, each in a process of its own.
+
+    :returns: a list of result dicts, one per scenario and scale.
+    """
+    results = []
+    for scale in scales:
+        with fake_server.FakeCyborg(scale, latency=latency,
+                                    page_size=page_size) as server:
+            for name in scenarios or SCENARIOS:
+                calls = server.total_calls
+                result = _spawn(server.endpoint, name, scale, shows, bulk,
+                                concurrency)
+                wall = result['wall_s']
+                results.append({
+                    'scenario': name,
+                    'scale': scale,
+                    'rows': result['rows'],
+                    'wall_s': round(wall, 3),
+                    'rows_per_s': round(result['rows'] / wall, 1)
+                    if wall else None,
+                    'api_calls': server.total_calls - calls,
+                    'baseline_rss_kib': result['baseline_rss_kib'],
+                    'peak_rss_kib': result['peak_rss_kib'],
+                    'exit_code': result['exit_code'],
+                })
+    return results
+
+
+def _version():
+    import cyborgclient
+
+    try:
+        return cyborgclient.__version__
+    except Exception:
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--scale', type=int, action='append',
+                        help='Number of records of each kind, can be '
+                             'repeated (default: %s)'
+                             % ', '.join(map(str, SCALES)))
+    parser.add_argument('--scenario', action='append',
+                        choices=list(SCENARIOS),
+                        help='Scenario to run, can be repeated (default: '
+                             'all of them)')
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='Seconds the server holds each request '
+                             '(default: 0)')
+    parser.add_argument('--page-size', type=int, default=1000,
+                        help='Records per list response (default: 1000)')
+    parser.add_argument('--shows', type=int, default=100,
+                        help='Runs of each show command (default: 100)')
+    parser.add_argument('--bulk', type=int,
+                        help='accelerator_requests created, bound and '
+                             'deleted (default: the scale)')
+    parser.add_argument('--concurrency', type=int, default=10,
+                        help='--concurrency of the bulk commands '
+                             '(default: 10)')
+    parser.add_argument('--output', default='cyborgclient-benchmark.json',
+                        help='Results file (default: '
+                             'cyborgclient-benchmark.json)')
+    # Used by run() to run a single scenario in a process of its own.
+    parser.add_argument('--endpoint', help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.endpoint:
+        if not args.scenario or not args.scale:
+            parser.error('--endpoint requires --scenario and --scale')
+        print(json.dumps(run_scenario(args.endpoint, args.scenario[0],
+                                      args.scale[0], args.shows, args.bulk,
+                                      args.concurrency)))
+        return 0
+
+    parameters = {'scales': args.scale or list(SCALES),
+                  'latency': args.latency, 'page_size': args.page_size,
+                  'shows': args.shows, 'bulk': args.bulk,
+                  'concurrency': args.concurrency}
+    results = run(parameters['scales'], args.scenario, args.latency,
+                  args.page_size, args.shows, args.bulk, args.concurrency)
+    with open(args.output, 'w') as f:
+        json.dump({
+            'cyborgclient': _version(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'date': datetime.datetime.now(
+                datetime.timezone.utc).isoformat(timespec='seconds'),
+            'parameters': parameters,
+            'results': results,
+        }, f, indent=2)
+        f.write('\n')
+
+    for result in results:
+        print('%(scenario)-22s %(scale)7d %(wall_s)9.3fs %(rows_per_s)10s '
+              'rows/s %(api_calls)7d calls %(peak_rss_kib)8d KiB' % result)
+    return 1 if any(result['exit_code'] for result in results) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,78 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+import os
+import stat
+import time
+
+import fixtures
+import testtools
+
+from cyborgclient.common import cache
+
+
+class TestFileCache(testtools.TestCase):
+
+    def setUp(self):
+        super(TestFileCache, self).setUp()
+        self.directory = self.useFixture(fixtures.TempDir()).path
+        self.cache = cache.FileCache('test', directory=self.directory)
+
+    def test_set_and_get(self):
+        key = cache.make_key('cloud', 'region')
+        self.assertIsNone(self.cache.get(key))
+
+        self.cache.set(key, {'value': 1}, expires_at=time.time() + 60)
+
+        self.assertEqual({'value': 1}, self.cache.get(key))
+        path = os.path.join(self.directory, 'test')
+        self.assertEqual(0o700, stat.S_IMODE(os.stat(path).st_mode))
+        self.assertEqual(
+            0o600,
+            stat.S_IMODE(os.stat(os.path.join(path, key + '.json')).st_mode))
+
+    def test_expired_entry_is_removed(self):
+        self.cache.set('key', 'value', expires_at=time.time() - 1)
+
+        self.assertIsNone(self.cache.get('key'))
+        self.assertEqual([], os.listdir(os.path.join(self.directory,
+                                                     'test')))
+
+    def test_corrupted_entry_is_ignored(self):
+        self.cache.set('key', 'value')
+        with open(os.path.join(self.directory, 'test', 'key.json'),
+                  'w') as f:
+            f.write('{not json')
+
+        self.assertIsNone(self.cache.get('key'))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        lru = cache.FileCache('lru', directory=self.directory, max_entries=2)
+        lru.set('a', 1)
+        lru.set('b', 2)
+        os.utime(os.path.join(lru.path, 'a.json'), (100, 100))
+        os.utime(os.path.join(lru.path, 'b.json'), (200, 200))
+        self.assertEqual(1, lru.get('a'))
+
+        lru.set('c', 3)
+
+        self.assertEqual(['a.json', 'c.json'], sorted(os.listdir(lru.path)))
+
+    def test_clear(self):
+        self.cache.set('a', 1)
+        self.cache.set('b', 2)
+
+        self.cache.clear()
+
+        self.assertIsNone(self.cache.get('a'))
+        self.assertEqual([], os.listdir(os.path.join(self.directory,
+                                                     'test')))
@@ -0,0 +1,86 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+
+import testtools
+
+from cyborgclient.common import capacity
+from cyborgclient.tests.unit.osc.v2 import fakes as acc_fakes
+
+DEVICES = [
+    {'id': 1, 'uuid': 'dev-1', 'hostname': 'host-1', 'vendor': '10de',
+     'model': 'A100'},
+    {'id': 2, 'uuid': 'dev-2', 'hostname': 'host-1', 'vendor': '8086',
+     'model': 'N3000'},
+    {'id': 3, 'uuid': 'dev-3', 'hostname': 'host-2', 'vendor': '10de',
+     'model': 'A100'},
+]
+
+DEPLOYABLES = [
+    {'uuid': 'dep-1', 'device_id': 1, 'num_accelerators': 4,
+     'rp_uuid': 'rp-1'},
+    {'uuid': 'dep-2', 'device_id': 2, 'num_accelerators': 1,
+     'rp_uuid': 'rp-2'},
+    {'uuid': 'dep-3', 'device_id': 3, 'num_accelerators': '2',
+     'rp_uuid': 'rp-3'},
+    # A deployable of a device which is not listed.
+    {'uuid': 'dep-4', 'device_id': 9, 'num_accelerators': 8,
+     'rp_uuid': 'rp-4'},
+]
+
+ACCELERATOR_REQUESTS = [
+    {'uuid': 'arq-1', 'state': 'Bound', 'hostname': 'host-1',
+     'device_rp_uuid': 'rp-1', 'device_profile_name': 'gpu'},
+    {'uuid': 'arq-2', 'state': 'Bound', 'hostname': 'host-1',
+     'device_rp_uuid': 'rp-1', 'device_profile_name': 'gpu'},
+    {'uuid': 'arq-3', 'state': 'Bound', 'hostname': 'host-2',
+     'device_rp_uuid': 'rp-3', 'device_profile_name': 'gpu'},
+    {'uuid': 'arq-4', 'state': 'Initial', 'hostname': None,
+     'device_rp_uuid': None, 'device_profile_name': 'fpga'},
+    # Bound to a deployable which is not listed.
+    {'uuid': 'arq-5', 'state': 'Bound', 'hostname': 'host-3',
+     'device_rp_uuid': 'rp-9', 'device_profile_name': 'fpga'},
+]
+
+
+class TestCapacity(testtools.TestCase):
+
+    def setUp(self):
+        super(TestCapacity, self).setUp()
+        self.capacity = capacity.count(DEVICES, DEPLOYABLES,
+                                       ACCELERATOR_REQUESTS)
+
+    def test_per_host(self):
+        self.assertEqual([('host-1', 2, 5, 2, 3),
+                          ('host-2', 1, 2, 1, 1),
+                          (None, 0, 8, 0, 8),
+                          ('host-3', 0, 0, 1, -1)],
+                         list(self.capacity.rows('host')))
+
+    def test_per_model(self):
+        self.assertEqual([('10de', 'A100', 2, 2, 6, 3, 3),
+                          ('8086', 'N3000', 1, 1, 1, 0, 1)],
+                         list(self.capacity.rows('model')))
+
+    def test_per_device_profile(self):
+        self.assertEqual([('gpu', 2, 3, 3), ('fpga', 1, 2, 1)],
+                         list(self.capacity.rows('device_profile')))
+
+    def test_collect(self):
+        acc_client = self.useFixture(acc_fakes.SnapshotAccelerator({
+            'devices': DEVICES, 'deployables': DEPLOYABLES,
+            'accelerator_requests': ACCELERATOR_REQUESTS})).acc_client
+
+        for group in capacity.GROUPS:
+            self.assertEqual(
+                list(self.capacity.rows(group)),
+                list(capacity.collect(acc_client).rows(group)))
@@ -0,0 +1,117 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+import csv
+import datetime
+import importlib.util
+import os
+import stat
+import sys
+from unittest import mock
+
+import fixtures
+import testtools
+
+from cyborgclient.common import export
+from cyborgclient import exceptions as exc
+from cyborgclient.tests.unit.osc.v2 import fakes as acc_fakes
+
+DEPLOYABLES = [
+    {'uuid': 'dep-%d' % i, 'name': 'fpga-%d' % i, 'parent_id': None,
+     'root_id': i, 'num_accelerators': '4', 'device_id': i,
+     'created_at': '2024-01-02T03:04:05+00:00', 'updated_at': None}
+    for i in range(5)
+]
+
+HAS_PYARROW = importlib.util.find_spec('pyarrow') is not None
+
+
+class TestExport(testtools.TestCase):
+
+    def setUp(self):
+        super(TestExport, self).setUp()
+        self.directory = self.useFixture(fixtures.TempDir()).path
+        self.acc_client = self.useFixture(acc_fakes.SnapshotAccelerator({
+            'deployables': DEPLOYABLES,
+            'device_profiles': [{'uuid': 'dp-1', 'name': 'profile',
+                                 'groups': [{'resources:FPGA': '1'}],
+                                 'created_at': '2024-01-01T00:00:00'}],
+        })).acc_client
+
+    def test_batches(self):
+        batches = list(export.batches(DEPLOYABLES,
+                                      export.FIELDS['deployables'], 2))
+
+        self.assertEqual([2, 2, 1], [len(batch) for batch in batches])
+        self.assertEqual(
+            ['dep-0', 'fpga-0', None, 0, 4, 0, None,
+             datetime.datetime(2024, 1, 2, 3, 4, 5,
+                               tzinfo=datetime.timezone.utc), None],
+            batches[0][0])
+
+    def test_batches_invalid_value(self):
+        records = [{'uuid': 'dep-1', 'num_accelerators': 'many'}]
+
+        self.assertRaisesRegex(
+            ValueError, 'num_accelerators of dep-1',
+            list, export.batches(records, export.FIELDS['deployables']))
+
+    def test_export_csv(self):
+        path, count = export.export(self.acc_client, 'device_profiles',
+                                    self.directory, 'csv')
+
+        self.assertEqual(os.path.join(self.directory,
+                                      'device_profiles.csv'), path)
+        self.assertEqual(1, count)
+        self.assertEqual(0o644, stat.S_IMODE(os.stat(path).st_mode))
+        with open(path, newline='') as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual([{
+            'uuid': 'dp-1', 'name': 'profile', 'description': '',
+            'groups': '[{"resources:FPGA": "1"}]',
+            'created_at': '2024-01-01T00:00:00+00:00', 'updated_at': '',
+        }], rows)
+
+    @testtools.skipUnless(HAS_PYARROW, 'pyarrow is not installed')
+    def test_export_parquet(self):
+        from pyarrow import parquet
+
+        path, count = export.export(self.acc_client, 'deployables',
+                                    self.directory, 'parquet', 2)
+
+        table = parquet.read_table(path)
+        self.assertEqual(5, count)
+        self.assertEqual('int64', str(table.schema.field(
+            'num_accelerators').type))
+        self.assertEqual('timestamp[us, tz=UTC]',
+                         str(table.schema.field('created_at').type))
+        self.assertEqual([4] * 5, table.column('num_accelerators').to_pylist())
+
+    @testtools.skipUnless(HAS_PYARROW, 'pyarrow is not installed')
+    def test_export_arrow(self):
+        from pyarrow import ipc
+
+        path, count = export.export(self.acc_client, 'deployables',
+                                    self.directory, 'arrow', 2)
+
+        with ipc.open_file(path) as reader:
+            self.assertEqual(3, reader.num_record_batches)
+            table = reader.read_all()
+        self.assertEqual([d['uuid'] for d in DEPLOYABLES],
+                         table.column('uuid').to_pylist())
+
+    def test_export_without_pyarrow(self):
+        with mock.patch.dict(sys.modules, {'pyarrow': None}):
+            self.assertRaises(exc.CommandError, export.export,
+                              self.acc_client, 'deployables',
+                              self.directory, 'parquet')
+        self.assertEqual([], os.listdir(self.directory))
@@ -0,0 +1,177 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+import hashlib
+from http import server
+import json
+import threading
+from unittest import mock
+
+import fixtures
+from keystoneauth1 import session as ks_session
+import testtools
+
+from cyborgclient.common import cache
+from cyborgclient.common import http_cache
+
+
+class _ValidatingHandler(server.BaseHTTPRequestHandler):
+    """Serve the ``documents`` of the server with ETag validators."""
+
+    def do_GET(self):
+        body = json.dumps(self.server.documents[self.path]).encode('utf-8')
+        etag = '"%s"' % hashlib.sha256(body).hexdigest()
+        self.server.received.append(dict(self.headers))
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('ETag', etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class _LastModifiedHandler(server.BaseHTTPRequestHandler):
+    """Serve the devices of the project of the token, with Last-Modified.
+
+    Like a server which does not take the user into account when it
+    revalidates, any If-Modified-Since request is answered 304.
+    """
+
+    def do_GET(self):
+        self.server.received.append(dict(self.headers))
+        if self.headers.get('If-Modified-Since'):
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = json.dumps({'devices': [
+            {'uuid': self.headers.get('X-Auth-Token')}]}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Last-Modified', 'Mon, 01 Jan 2024 00:00:00 GMT')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestConditionalGetAdapterScope(testtools.TestCase):
+
+    def setUp(self):
+        super(TestConditionalGetAdapterScope, self).setUp()
+        self.server = server.ThreadingHTTPServer(('127.0.0.1', 0),
+                                                 _LastModifiedHandler)
+        self.server.received = []
+        thread = threading.Thread(target=self.server.serve_forever,
+                                  kwargs={'poll_interval': 0.01},
+                                  daemon=True)
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.endpoint = 'http://127.0.0.1:%d/v2' % self.server.server_port
+        self.directory = self.useFixture(fixtures.TempDir()).path
+
+    def _get(self, token, scope=None):
+        session = ks_session.Session()
+        session.session.mount(self.endpoint, http_cache.ConditionalGetAdapter(
+            file_cache=cache.FileCache('http', directory=self.directory),
+            scope=scope))
+        return session.get(self.endpoint + '/devices', authenticated=False,
+                           headers={'X-Auth-Token': token}).json()
+
+    def test_projects_do_not_share_responses(self):
+        project_1 = self._get('token-1', lambda: ('project-1', 'user-1'))
+        project_2 = self._get('token-2', lambda: ('project-2', 'user-2'))
+
+        self.assertEqual('token-1', project_1['devices'][0]['uuid'])
+        self.assertEqual('token-2', project_2['devices'][0]['uuid'])
+        self.assertNotIn('If-Modified-Since', self.server.received[1])
+        self.assertEqual(project_1, self._get('token-3', lambda: (
+            'project-1', 'user-1')))
+        self.assertIn('If-Modified-Since', self.server.received[2])
+
+    def test_tokens_without_cache_id_do_not_share_responses(self):
+        self._get('token-1')
+
+        self.assertEqual('token-2',
+                         self._get('token-2')['devices'][0]['uuid'])
+        self.assertNotIn('If-Modified-Since', self.server.received[1])
+
+
+class TestConditionalGetAdapter(testtools.TestCase):
+
+    def setUp(self):
+        super(TestConditionalGetAdapter, self).setUp()
+        self.server = server.ThreadingHTTPServer(('127.0.0.1', 0),
+                                                 _ValidatingHandler)
+        self.server.documents = {'/v2/devices': {'devices': [{'uuid': '1'}]}}
+        self.server.received = []
+        thread = threading.Thread(target=self.server.serve_forever,
+                                  kwargs={'poll_interval': 0.01},
+                                  daemon=True)
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+
+        self.endpoint = 'http://127.0.0.1:%d/v2' % self.server.server_port
+        self.session = ks_session.Session()
+        self.adapter = http_cache.ConditionalGetAdapter(
+            file_cache=cache.FileCache(
+                'http', directory=self.useFixture(fixtures.TempDir()).path))
+        self.session.session.mount(self.endpoint, self.adapter)
+
+    def _get(self):
+        return self.session.get(self.endpoint + '/devices',
+                                authenticated=False).json()
+
+    def test_not_modified_reuses_body(self):
+        first = self._get()
+        second = self._get()
+
+        self.assertEqual(first, second)
+        self.assertNotIn('If-None-Match', self.server.received[0])
+        self.assertIn('If-None-Match', self.server.received[1])
+        self.assertEqual({'requests': 2, 'conditional': 1,
+                          'not_modified': 1}, dict(self.adapter.stats))
+        self.assertEqual(1.0, self.adapter.hit_rate)
+
+    def test_modified_body_is_replaced(self):
+        self._get()
+        self.server.documents['/v2/devices'] = {'devices': []}
+
+        self.assertEqual({'devices': []}, self._get())
+        self.assertEqual({'devices': []}, self._get())
+        self.assertEqual(0.5, self.adapter.hit_rate)
+
+    def test_install(self):
+        acc_client = mock.Mock(session=self.session)
+        acc_client.get_endpoint.return_value = self.endpoint + '/'
+        acc_client.get_project_id.return_value = 'project'
+        self.session.auth = mock.Mock()
+        self.session.auth.get_cache_id.return_value = 'user'
+
+        with mock.patch('atexit.register') as mock_register:
+            adapter = http_cache.install(acc_client)
+
+        self.assertIs(adapter,
+                      self.session.session.get_adapter(self.endpoint + '/x'))
+        mock_register.assert_called_once_with(adapter.log_stats)
+        self.assertEqual(('project', 'user'), adapter._get_scope())
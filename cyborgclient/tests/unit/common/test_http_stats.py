@@ -0,0 +1,126 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+import io
+
+import fixtures
+from keystoneauth1 import session as ks_session
+from requests_mock.contrib import fixture as rm_fixture
+import testtools
+
+from cyborgclient.common import http_stats
+
+ENDPOINT = 'http://cyborg.example.com/v2'
+UUID = '1f0c6a44-6b5e-4a16-9d7c-4a3bbd9b10a5'
+
+
+def _call(url, started, latency, method='GET'):
+    return http_stats.Call(method, url, http_stats.url_template(url), 200,
+                           started, latency, 0, 0, None)
+
+
+class TestHTTPStats(testtools.TestCase):
+
+    def test_url_template(self):
+        self.assertEqual(
+            ENDPOINT + '/devices/{id}',
+            http_stats.url_template(ENDPOINT + '/devices/' + UUID))
+        self.assertEqual(
+            ENDPOINT + '/deployables/{id}/program',
+            http_stats.url_template(ENDPOINT + '/deployables/' +
+                                    UUID.replace('-', '') + '/program'))
+        self.assertEqual(
+            ENDPOINT + '/devices',
+            http_stats.url_template(ENDPOINT + '/devices?hostname=h1'))
+
+    def test_percentile(self):
+        values = list(range(1, 21))
+
+        self.assertEqual(10, http_stats.percentile(values, 50))
+        self.assertEqual(19, http_stats.percentile(values, 95))
+        self.assertEqual(1, http_stats.percentile(values[:1], 95))
+        self.assertIsNone(http_stats.percentile([], 50))
+
+    def test_record(self):
+        requests_mock = self.useFixture(rm_fixture.Fixture())
+        requests_mock.get(ENDPOINT + '/devices/' + UUID,
+                          json={'uuid': UUID},
+                          headers={'x-openstack-request-id': 'req-1'})
+        requests_mock.get(ENDPOINT + '/devices', text='{"devices": []}')
+        session = ks_session.Session()
+        stats = http_stats.HTTPStats(ENDPOINT).install(session)
+
+        session.get(ENDPOINT + '/devices/' + UUID)
+        session.get(ENDPOINT + '/devices', params={'hostname': 'h1'})
+        session.get(ENDPOINT + '/devices')
+
+        first = stats.calls[0]
+        self.assertEqual(('GET', ENDPOINT + '/devices/{id}', 200, 'req-1'),
+                         (first.method, first.template, first.status,
+                          first.request_id))
+        self.assertEqual(len('{"uuid": "%s"}' % UUID), first.response_bytes)
+        self.assertEqual(
+            [('GET', ENDPOINT + '/devices/{id}', 1),
+             ('GET', ENDPOINT + '/devices', 2)],
+            [row[:3] for row in stats.summary()])
+
+    def test_phases(self):
+        stats = http_stats.HTTPStats(ENDPOINT, 'http://keystone/v3')
+        stats.started = 100.0
+        stats.calls = [
+            # The version discovery of a service counts for the service.
+            _call('http://keystone/', 100.0, 0.25),
+            _call('http://keystone/v3/auth/tokens', 100.25, 0.25, 'POST'),
+            _call('http://cyborg.example.com/', 100.5, 0.5),
+            # Concurrent calls are counted once.
+            _call(ENDPOINT + '/devices', 101.0, 1.0),
+            _call(ENDPOINT + '/deployables', 101.5, 1.0),
+            _call('http://glance/v2/images/' + UUID, 102.5, 0.5),
+        ]
+        # Rows are still fetched while the output is formatted.
+        stats.spans = [('output', 102.0, 103.5)]
+
+        self.assertEqual({'auth': 0.5, 'fetch': 2.0, 'other': 0.5,
+                          'output': 0.5, 'client': 0.5},
+                         stats.phases(now=104.0))
+
+    def test_phases_without_auth_url(self):
+        stats = http_stats.HTTPStats(ENDPOINT)
+        stats.started = 100.0
+        stats.calls = [
+            _call('http://keystone/v3/auth/tokens', 100.0, 0.5, 'POST')]
+
+        self.assertEqual({'auth': 0.0, 'fetch': 0.0, 'other': 0.5,
+                          'output': 0.0, 'client': 0.5},
+                         stats.phases(now=101.0))
+
+    def test_span(self):
+        stats = http_stats.HTTPStats(ENDPOINT)
+        self.useFixture(fixtures.MockPatch(
+            'cyborgclient.common.http_stats._INSTALLED', [stats]))
+
+        with http_stats.span('output'):
+            pass
+
+        self.assertEqual(['output'], [name for name, _s, _e in stats.spans])
+
+    def test_print_summary(self):
+        stats = http_stats.HTTPStats(ENDPOINT)
+        stats.calls = [_call(ENDPOINT + '/devices', stats.started, 0.25)]
+        stream = io.StringIO()
+        stats.print_summary(stream)
+
+        output = stream.getvalue()
+        self.assertIn('| GET    | %s/devices | 1     | 250.0  |' % ENDPOINT,
+                      output)
+        self.assertIn('| fetch  | 0.250   |', output)
+        self.assertIn('| output |', output)
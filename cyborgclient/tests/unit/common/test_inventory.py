@@ -0,0 +1,112 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+import argparse
+from unittest import mock
+
+import fixtures
+import testtools
+
+from cyborgclient.common import inventory
+from cyborgclient.common import resources
+
+
+class TestInventoryCache(testtools.TestCase):
+
+    def setUp(self):
+        super(TestInventoryCache, self).setUp()
+        self.directory = self.useFixture(fixtures.TempDir()).path
+        self.acc_client = mock.Mock()
+        self.acc_client.get_endpoint.return_value = 'http://cyborg/v2'
+        self.acc_client.get_project_id.return_value = 'project'
+        self.acc_client.default_microversion = '2.0'
+        self.cache = inventory.InventoryCache(self.acc_client, 60,
+                                              directory=self.directory)
+        self.fetch = mock.Mock(return_value=[
+            resources.Deployable(uuid='dep-1', name='name-1',
+                                 rp_uuid='rp-1')])
+
+    def test_list(self):
+        first = self.cache.list('deployables', self.fetch)
+        second = self.cache.list('deployables', self.fetch)
+
+        self.fetch.assert_called_once_with()
+        self.assertEqual([r.to_dict() for r in first],
+                         [r.to_dict() for r in second])
+        self.assertEqual('dep-1', second[0].id)
+        self.assertEqual('rp-1', second[0].rp_uuid)
+
+    def test_list_keyed_by_query_and_scope(self):
+        self.cache.list('deployables', self.fetch)
+        self.cache.list('deployables', self.fetch, {'limit': 1})
+        self.acc_client.default_microversion = '2.1'
+        inventory.InventoryCache(self.acc_client, 60,
+                                 directory=self.directory).list(
+            'deployables', self.fetch)
+
+        self.assertEqual(3, self.fetch.call_count)
+
+    @mock.patch('time.time')
+    def test_list_expired(self, mock_time):
+        mock_time.return_value = 1000
+        self.cache.list('deployables', self.fetch)
+        mock_time.return_value = 1030
+        # A shorter TTL makes the same entry stale.
+        inventory.InventoryCache(self.acc_client, 30,
+                                 directory=self.directory).list(
+            'deployables', self.fetch)
+
+        self.assertEqual(2, self.fetch.call_count)
+
+    def test_find(self):
+        self.assertIsNone(self.cache.find('deployables', 'dep-1'))
+
+        self.cache.list('deployables', self.fetch)
+
+        self.assertEqual('name-1',
+                         self.cache.find('deployables', 'dep-1').name)
+        self.assertIsNone(self.cache.find('deployables', 'dep-2'))
+
+    def test_invalidate(self):
+        self.cache.list('deployables', self.fetch)
+        inventory.invalidate(self.acc_client, 'deployables',
+                             directory=self.directory)
+
+        self.assertIsNone(self.cache.find('deployables', 'dep-1'))
+
+    def test_invalidate_keeps_other_scopes(self):
+        other_client = mock.Mock()
+        other_client.get_endpoint.return_value = 'http://cyborg/v2'
+        other_client.get_project_id.return_value = 'other-project'
+        other_client.default_microversion = '2.0'
+        other = inventory.InventoryCache(other_client, 60,
+                                         directory=self.directory)
+        self.cache.list('deployables', self.fetch, {'limit': 1})
+        other.list('deployables', self.fetch)
+
+        inventory.invalidate(self.acc_client, 'deployables',
+                             directory=self.directory)
+
+        self.assertIsNone(self.cache._fresh_items('deployables',
+                                                  {'limit': 1}))
+        self.assertEqual('name-1', other.find('deployables', 'dep-1').name)
+
+    def test_from_args(self):
+        parser = argparse.ArgumentParser()
+        inventory.add_cache_arguments(parser)
+
+        for args, enabled in (([], False),
+                              (['--cache-ttl', '10'], True),
+                              (['--cache-ttl', '10', '--no-cache'], False)):
+            parsed_args = parser.parse_args(args)
+            self.assertEqual(enabled, inventory.InventoryCache.from_args(
+                self.acc_client, parsed_args) is not None)
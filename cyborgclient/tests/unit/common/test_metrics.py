@@ -0,0 +1,108 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+import os
+import stat
+
+import fixtures
+import testtools
+
+from cyborgclient.common import metrics
+from cyborgclient.tests.unit.osc.v2 import fakes as acc_fakes
+
+INVENTORY = {
+    'devices': [
+        {'id': 1, 'uuid': 'dev-1', 'hostname': 'host-1', 'vendor': '10de',
+         'status': 'enabled'},
+        {'id': 2, 'uuid': 'dev-2', 'hostname': 'host-1', 'vendor': '10de',
+         'status': 'enabled'},
+        {'id': 3, 'uuid': 'dev-3', 'hostname': 'host-2', 'vendor': '8086',
+         'status': 'maintaining'},
+    ],
+    'deployables': [
+        {'uuid': 'dep-1', 'device_id': 1, 'num_accelerators': 2,
+         'rp_uuid': 'rp-1'},
+        {'uuid': 'dep-2', 'device_id': 2, 'num_accelerators': 2,
+         'rp_uuid': 'rp-2'},
+        {'uuid': 'dep-3', 'device_id': 3, 'num_accelerators': '4'},
+    ],
+    'accelerator_requests': [
+        # Attributed to the host of the device of its deployable.
+        {'uuid': 'arq-1', 'state': 'Bound', 'hostname': None,
+         'device_rp_uuid': 'rp-1', 'device_profile_name': 'gpu'},
+        {'uuid': 'arq-4', 'state': 'Bound', 'hostname': 'host-1',
+         'device_rp_uuid': 'rp-2', 'device_profile_name': 'gpu'},
+        # Its deployable is unknown, so attributed to its hostname.
+        {'uuid': 'arq-2', 'state': 'Bound', 'hostname': 'host-2',
+         'device_profile_name': 'fpga'},
+        {'uuid': 'arq-3', 'state': 'Initial', 'hostname': None,
+         'device_profile_name': 'gpu'},
+    ],
+}
+
+EXPECTED = """\
+# HELP cyborg_devices Accelerator devices.
+# TYPE cyborg_devices gauge
+cyborg_devices{hostname="host-1",status="enabled",vendor="10de"} 2
+cyborg_devices{hostname="host-2",status="maintaining",vendor="8086"} 1
+# HELP cyborg_accelerators Accelerators of the deployables.
+# TYPE cyborg_accelerators gauge
+cyborg_accelerators{hostname="host-1"} 4
+cyborg_accelerators{hostname="host-2"} 4
+# HELP cyborg_accelerators_in_use Accelerators held by bound \
+accelerator_requests.
+# TYPE cyborg_accelerators_in_use gauge
+cyborg_accelerators_in_use{hostname="host-1"} 2
+cyborg_accelerators_in_use{hostname="host-2"} 1
+# HELP cyborg_accelerator_requests Accelerator requests.
+# TYPE cyborg_accelerator_requests gauge
+cyborg_accelerator_requests{state="Bound",device_profile_name="fpga"} 1
+cyborg_accelerator_requests{state="Bound",device_profile_name="gpu"} 2
+cyborg_accelerator_requests{state="Initial",device_profile_name="gpu"} 1
+# HELP cyborg_metrics_timestamp_seconds Time the accelerator metrics were \
+collected.
+# TYPE cyborg_metrics_timestamp_seconds gauge
+cyborg_metrics_timestamp_seconds 1700000000.0
+# EOF
+"""
+
+
+class TestMetrics(testtools.TestCase):
+
+    def setUp(self):
+        super(TestMetrics, self).setUp()
+        self.directory = self.useFixture(fixtures.TempDir()).path
+        self.acc_client = self.useFixture(
+            acc_fakes.SnapshotAccelerator(INVENTORY)).acc_client
+
+    def test_collect_and_render(self):
+        families = metrics.collect(self.acc_client)
+
+        self.assertEqual(EXPECTED,
+                         ''.join(metrics.render(families, 1700000000.0)))
+
+    def test_render_escapes_label_values(self):
+        families = [metrics.Family('m', 'gauge', 'M', ('name',),
+                                   {('a"b\\c\nd',): 1, (None,): 2})]
+
+        self.assertEqual(['m{name=""} 2\n',
+                          'm{name="a\\"b\\\\c\\nd"} 1\n'],
+                         list(metrics.render(families, 0))[2:4])
+
+    def test_write(self):
+        path = os.path.join(self.directory, 'cyborg.prom')
+        metrics.write(path, metrics.collect(self.acc_client), 1700000000.0)
+
+        with open(path) as f:
+            self.assertEqual(EXPECTED, f.read())
+        self.assertEqual(0o644, stat.S_IMODE(os.stat(path).st_mode))
+        self.assertEqual(['cyborg.prom'], os.listdir(self.directory))
@@ -0,0 +1,59 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+import io
+import os
+import pstats
+import tracemalloc
+
+import fixtures
+import testtools
+
+from cyborgclient.common import profiling
+
+
+def _allocate():
+    return [bytearray(1024) for _ in range(256)]
+
+
+class TestProfiling(testtools.TestCase):
+
+    def test_profile(self):
+        path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                            'profile.out')
+        with profiling.profile(path):
+            _allocate()
+
+        functions = [function for _, _, function in
+                     pstats.Stats(path).stats]
+        self.assertIn('_allocate', functions)
+
+    def test_profile_unwritable(self):
+        path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                            'missing', 'profile.out')
+        with profiling.profile(path):
+            pass
+
+        self.assertFalse(os.path.exists(path))
+
+    def test_trace_memory(self):
+        stream = io.StringIO()
+        with profiling.trace_memory(stream, limit=3):
+            data = _allocate()
+
+        report = stream.getvalue().splitlines()
+        self.assertTrue(report[0].startswith('Traced memory: peak '))
+        self.assertEqual('Top 3 lines by memory allocated:', report[1])
+        self.assertIn(__file__, report[2])
+        self.assertIn('bytearray(1024)', report[3])
+        self.assertFalse(tracemalloc.is_tracing())
+        del data
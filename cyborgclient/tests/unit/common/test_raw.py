@@ -0,0 +1,92 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+import io
+import json
+from unittest import mock
+
+from openstack import exceptions as sdk_exc
+import testtools
+
+from cyborgclient.common import raw
+from cyborgclient.common import resources
+from cyborgclient.tests.benchmarks import raw_output
+from cyborgclient.tests.unit.osc.v2 import fakes as acc_fakes
+
+DEVICES = [
+    {'uuid': 'dev-%d' % i, 'hostname': 'host-%d' % (i % 2),
+     'status': 'enabled' if i % 3 else 'maintaining'}
+    for i in range(7)
+]
+
+
+class TestRaw(testtools.TestCase):
+
+    def setUp(self):
+        super(TestRaw, self).setUp()
+        self.acc_client = self.useFixture(acc_fakes.SnapshotAccelerator(
+            {'devices': DEVICES}, {'microversion': '2.2'})).acc_client
+
+    def test_list_records(self):
+        self.assertEqual(DEVICES, list(raw.list_records(self.acc_client,
+                                                        resources.Device)))
+
+    def test_list_records_filters(self):
+        # hostname is sent to the server, status applied on the client.
+        self.assertEqual(
+            ['dev-1', 'dev-5'],
+            [record['uuid'] for record in raw.list_records(
+                self.acc_client, resources.Device, hostname='host-1',
+                status='enabled')])
+
+    def test_list_records_pages(self):
+        self.assertEqual(
+            [record['uuid'] for record in DEVICES[3:]],
+            [record['uuid'] for record in raw.list_records(
+                self.acc_client, resources.Device, limit=2,
+                marker='dev-2')])
+
+    def test_write_list(self):
+        stdout = io.StringIO()
+        raw.write_list(stdout, iter(DEVICES[:2]))
+
+        self.assertEqual(DEVICES[:2], [json.loads(line) for line in
+                                       stdout.getvalue().splitlines()])
+
+    def test_write_list_flushes_each_record(self):
+        stdout = mock.Mock(wraps=io.StringIO())
+        flushed = []
+
+        def records():
+            for record in DEVICES[:2]:
+                yield record
+                flushed.append(stdout.flush.call_count)
+
+        raw.write_list(stdout, records())
+
+        # Each record is flushed before the next one is asked for.
+        self.assertEqual([1, 2], flushed)
+        self.assertEqual(2, stdout.flush.call_count)
+
+    def test_write_one(self):
+        stdout = io.StringIO()
+        raw.write_one(stdout, self.acc_client, resources.Device, 'dev-3')
+
+        self.assertEqual(DEVICES[3], json.loads(stdout.getvalue()))
+        self.assertRaises(sdk_exc.ResourceNotFound, raw.write_one, stdout,
+                          self.acc_client, resources.Device, 'dev-9')
+
+    def test_benchmark(self):
+        results = raw_output.measure(20, page_size=8)
+
+        self.assertEqual({'formatted', 'raw'}, set(results))
+        self.assertGreater(results['raw']['peak_bytes'], 0)
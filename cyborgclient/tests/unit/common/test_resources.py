@@ -0,0 +1,71 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+from unittest import mock
+
+from openstack import proxy
+import testtools
+
+from cyborgclient.common import resources
+
+
+class TestResources(testtools.TestCase):
+
+    def setUp(self):
+        super(TestResources, self).setUp()
+        self.session = mock.Mock(spec=proxy.Proxy)
+        self.session.default_microversion = None
+        self.response = mock.Mock(status_code=200, links={}, headers={})
+        self.session.get.return_value = self.response
+
+    def test_device_list_filters(self):
+        self.response.json.return_value = {'devices': [
+            {'uuid': 'dev-1', 'hostname': 'host-1', 'model': 'model-1'},
+            {'uuid': 'dev-2', 'hostname': 'host-1', 'model': 'model-2'},
+        ]}
+
+        devices = list(resources.Device.list(
+            self.session, hostname='host-1', vendor='0x8086',
+            model='model-1'))
+
+        self.assertEqual(['dev-1'], [d.uuid for d in devices])
+        self.session.get.assert_called_once_with(
+            '/devices', headers=mock.ANY, microversion=None,
+            params={'hostname': 'host-1', 'vendor': '0x8086'})
+
+    def test_deployable_alternate_id(self):
+        self.assertEqual('dep-1', resources.Deployable(uuid='dep-1').id)
+
+    def test_device_list_filters_keep_uuid(self):
+        self.response.json.return_value = {'devices': [
+            {'uuid': 'dev-1', 'hostname': 'host-1'}]}
+
+        device = next(resources.Device.list(self.session,
+                                            hostname='host-1'))
+
+        # Like openstack.accelerator.v2.device.Device, the uuid is the id.
+        self.assertEqual('dev-1', device.id)
+        self.assertEqual('dev-1', resources.Device.existing(uuid='dev-1').id)
+
+    def test_accelerator_request_list_instance_keeps_uuid(self):
+        self.response.json.return_value = {'arqs': [
+            {'uuid': 'arq-1', 'instance_uuid': 'instance-1'}]}
+        self.session.delete.return_value = mock.Mock(
+            status_code=204, links={}, headers={})
+
+        arq = next(resources.AcceleratorRequest.list(
+            self.session, instance='instance-1'))
+        arq.delete(self.session)
+
+        self.assertEqual('arq-1', arq.id)
+        self.session.delete.assert_called_once_with(
+            'accelerator_requests/arq-1', headers={}, microversion=None)
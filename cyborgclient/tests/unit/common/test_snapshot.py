@@ -0,0 +1,99 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+import os
+
+import fixtures
+import testtools
+
+from cyborgclient.common import snapshot
+
+
+class TestSnapshot(testtools.TestCase):
+
+    def setUp(self):
+        super(TestSnapshot, self).setUp()
+        self.useFixture(fixtures.MockPatchObject(snapshot, 'CHUNK_SIZE', 3))
+        self.path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                                 'inventory.snap')
+        self.devices = [{'uuid': 'dev-%d' % i, 'hostname': 'host-%d' % (i % 2)}
+                        for i in range(10)]
+        self.counts = snapshot.write(self.path, {
+            'devices': iter(self.devices),
+            'device_profiles': [{'uuid': 'dp-1', 'name': 'profile'}],
+        }, {'microversion': '2.2'})
+        self.snapshot = snapshot.Snapshot(self.path)
+        self.addCleanup(self.snapshot.close)
+
+    def test_read(self):
+        self.assertEqual({'devices': 10, 'device_profiles': 1}, self.counts)
+        self.assertEqual({'microversion': '2.2'}, self.snapshot.metadata)
+        self.assertEqual(self.devices, list(self.snapshot.records('devices')))
+        self.assertEqual([], list(self.snapshot.records('attributes')))
+        self.assertEqual(10, self.snapshot.count('devices'))
+
+    def test_get(self):
+        self.assertEqual(self.devices[7], self.snapshot.get('devices',
+                                                            'dev-7'))
+        self.assertIsNone(self.snapshot.get('devices', 'dev-10'))
+        self.assertEqual('dp-1',
+                         self.snapshot.get('device_profiles',
+                                           'profile')['uuid'])
+
+    def test_not_a_snapshot(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'{"devices": []}')
+
+        self.assertRaises(ValueError, snapshot.Snapshot, self.path)
+
+
+class TestSnapshotDiff(testtools.TestCase):
+
+    def setUp(self):
+        super(TestSnapshotDiff, self).setUp()
+        self.useFixture(fixtures.MockPatchObject(snapshot, 'CHUNK_SIZE', 2))
+        self.directory = self.useFixture(fixtures.TempDir()).path
+
+    def _snapshot(self, name, devices):
+        path = os.path.join(self.directory, name)
+        snapshot.write(path, {'devices': devices})
+        snap = snapshot.Snapshot(path)
+        self.addCleanup(snap.close)
+        return snap
+
+    def test_diff(self):
+        old = self._snapshot('old', [
+            {'uuid': 'dev-1', 'status': 'enabled', 'updated_at': None},
+            {'uuid': 'dev-2', 'status': 'enabled', 'model': 'A'},
+            {'uuid': 'dev-3', 'status': 'enabled'},
+        ])
+        new = self._snapshot('new', [
+            {'uuid': 'dev-4', 'status': 'enabled'},
+            {'uuid': 'dev-3', 'status': 'enabled'},
+            {'uuid': 'dev-2', 'status': 'disabled', 'vendor': 'V'},
+            {'uuid': 'dev-1', 'status': 'enabled', 'updated_at': 'now'},
+        ])
+
+        self.assertEqual([
+            ('add', 'dev-4', None, None, None),
+            ('update', 'dev-2', 'model', 'A', None),
+            ('update', 'dev-2', 'status', 'enabled', 'disabled'),
+            ('update', 'dev-2', 'vendor', None, 'V'),
+        ], list(snapshot.diff(old, new, 'devices')))
+        self.assertEqual([
+            ('update', 'dev-1', 'updated_at', 'now', None),
+            ('update', 'dev-2', 'model', None, 'A'),
+            ('update', 'dev-2', 'status', 'disabled', 'enabled'),
+            ('update', 'dev-2', 'vendor', 'V', None),
+            ('delete', 'dev-4', None, None, None),
+        ], list(snapshot.diff(new, old, 'devices', ignored_fields=())))
+        self.assertEqual([], list(snapshot.diff(old, new, 'attributes')))
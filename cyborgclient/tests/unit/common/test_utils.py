@@ -0,0 +1,115 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+import argparse
+import functools
+from unittest import mock
+
+from osc_lib.cli import format_columns
+from osc_lib import utils as oscutils
+import testtools
+
+from cyborgclient.common import resources
+from cyborgclient.common import utils
+from cyborgclient import exceptions as exc
+from cyborgclient.tests.benchmarks import row_extraction
+
+
+class TestRateLimiter(testtools.TestCase):
+
+    @mock.patch('time.sleep')
+    @mock.patch('time.monotonic', return_value=100.0)
+    def test_wait_spaces_calls(self, mock_monotonic, mock_sleep):
+        limiter = utils.RateLimiter(4)
+        for _ in range(3):
+            limiter.wait()
+
+        self.assertEqual([mock.call(0.25), mock.call(0.5)],
+                         mock_sleep.call_args_list)
+
+    @mock.patch('time.sleep')
+    def test_wait_unlimited(self, mock_sleep):
+        limiter = utils.RateLimiter()
+        for _ in range(3):
+            limiter.wait()
+
+        mock_sleep.assert_not_called()
+
+
+class TestPositiveFloat(testtools.TestCase):
+
+    def test_positive(self):
+        self.assertEqual(0.5, utils.positive_float('0.5'))
+
+    def test_not_positive(self):
+        for value in ('0', '-1', 'nan', 'soon'):
+            self.assertRaises(argparse.ArgumentTypeError,
+                              utils.positive_float, value)
+
+
+class TestConcurrentMap(testtools.TestCase):
+
+    def test_keeps_order(self):
+        self.assertEqual([1, 4, 9, 16],
+                         list(utils.concurrent_map(lambda x: x * x,
+                                                   [1, 2, 3, 4], 3)))
+
+
+class TestMakeRowGetter(testtools.TestCase):
+
+    def setUp(self):
+        super(TestMakeRowGetter, self).setUp()
+        self.deployables = row_extraction.make_deployables(3)
+
+    def test_same_rows_as_get_item_properties(self):
+        for columns in (row_extraction.COLUMNS, ('name',), ()):
+            get_row = utils.make_row_getter(columns)
+            self.assertEqual(
+                [oscutils.get_item_properties(item, columns)
+                 for item in self.deployables],
+                list(map(get_row, self.deployables)))
+
+    def test_missing_attribute(self):
+        get_row = utils.make_row_getter(('Name', 'missing'))
+
+        self.assertEqual(('dep-0', ''), get_row(self.deployables[0]))
+
+    def test_mixed_case_fields(self):
+        item = mock.Mock(spec=['deviceId'], deviceId=1)
+        get_row = utils.make_row_getter(('deviceId',),
+                                        mixed_case_fields=('deviceId',))
+
+        self.assertEqual((1,), get_row(item))
+
+    def test_formatters(self):
+        item = resources.Device(uuid='dev-1', std_board_info={'a': 1})
+        formatters = {
+            'std_board_info': format_columns.DictColumn,
+            'uuid': functools.partial(format_columns.ListColumn),
+        }
+        get_row = utils.make_row_getter(('uuid', 'std_board_info'),
+                                        formatters)
+
+        self.assertEqual(
+            oscutils.get_item_properties(item, ('uuid', 'std_board_info'),
+                                         formatters=formatters),
+            get_row(item))
+
+    def test_invalid_formatter(self):
+        self.assertRaises(exc.CommandError, utils.make_row_getter,
+                          ('uuid',), {'uuid': str})
+
+    def test_benchmark(self):
+        result = row_extraction.measure(10)
+
+        self.assertGreater(result['before'], 0)
+        self.assertGreater(result['after'], 0)
@@ -0,0 +1,92 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+from openstack import exceptions as sdk_exc
+import testtools
+
+from cyborgclient.common import resources
+from cyborgclient.tests.benchmarks import fake_server
+from cyborgclient.tests.benchmarks import suite
+
+
+class TestFakeCyborg(testtools.TestCase):
+
+    def setUp(self):
+        super(TestFakeCyborg, self).setUp()
+        self.server = fake_server.FakeCyborg(25, page_size=10).start()
+        self.addCleanup(self.server.stop)
+        self.acc_client = self.server.connect()
+
+    def test_list_pages(self):
+        devices = list(self.acc_client.devices())
+
+        self.assertEqual([fake_server.make_uuid('devices', i)
+                          for i in range(25)],
+                         [device.uuid for device in devices])
+        self.assertEqual(3, self.server.calls['GET', 'devices'])
+
+    def test_list_filters(self):
+        devices = list(resources.Device.list(self.acc_client,
+                                             hostname='compute-2'))
+
+        self.assertEqual(['compute-2'] * fake_server.DEVICES_PER_HOST,
+                         [device.hostname for device in devices])
+
+    def test_show(self):
+        self.assertEqual('dp-4',
+                         self.acc_client.get_device_profile('dp-4').name)
+        self.assertRaises(sdk_exc.ResourceNotFound,
+                          self.acc_client.get_device,
+                          fake_server.make_uuid('devices', 25))
+
+    def test_accelerator_request_lifecycle(self):
+        arq = self.acc_client.create_accelerator_request(
+            device_profile_name='dp-1')
+        self.assertEqual('Initial', arq.state)
+
+        self.acc_client.update_accelerator_request(arq.uuid, [
+            {'op': 'add', 'path': '/' + field, 'value': field}
+            for field in ('hostname', 'instance_uuid', 'device_rp_uuid')])
+        self.assertEqual('Bound',
+                         self.acc_client.get_accelerator_request(
+                             arq.uuid).state)
+
+        self.acc_client.delete_accelerator_request(arq.uuid, False)
+        self.assertRaises(sdk_exc.ResourceNotFound,
+                          self.acc_client.get_accelerator_request, arq.uuid)
+        self.assertEqual(25, len(list(
+            self.acc_client.accelerator_requests())))
+
+
+class TestSuite(testtools.TestCase):
+
+    def setUp(self):
+        super(TestSuite, self).setUp()
+        self.server = fake_server.FakeCyborg(12, page_size=5).start()
+        self.addCleanup(self.server.stop)
+
+    def test_run_scenarios(self):
+        for name in suite.SCENARIOS:
+            result = suite.run_scenario(self.server.endpoint, name, 12,
+                                        shows=3, bulk=4, concurrency=2)
+
+            self.assertEqual(0, result['exit_code'], name)
+            self.assertGreater(result['peak_rss_kib'], 0)
+
+        self.assertEqual(4, self.server.calls['POST',
+                                              'accelerator_requests'])
+        self.assertEqual(4, self.server.calls['PATCH',
+                                              'accelerator_requests'])
+        self.assertEqual(4, self.server.calls['DELETE',
+                                              'accelerator_requests'])
+        self.assertEqual(12, len(list(
+            self.server.connect().accelerator_requests())))
@@ -0,0 +1,65 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+import argparse
+import datetime
+import io
+import json
+from unittest import mock
+
+from osc_lib.cli import format_columns
+import testtools
+
+from cyborgclient.osc import formatters
+from cyborgclient.osc.v2 import device
+
+
+class TestNDJSONFormatter(testtools.TestCase):
+
+    def test_emit_list(self):
+        stdout = io.StringIO()
+        written = []
+
+        def rows():
+            yield ('dev-1', format_columns.DictColumn({'a': 1}))
+            # Rows are written as they are produced.
+            written.append(stdout.getvalue())
+            yield ('dev-2', datetime.date(2024, 1, 1))
+
+        formatters.NDJSONFormatter().emit_list(
+            ('uuid', 'info'), rows(), stdout, argparse.Namespace())
+
+        self.assertEqual(['{"uuid": "dev-1", "info": {"a": 1}}\n'], written)
+        self.assertEqual(
+            [{'uuid': 'dev-1', 'info': {'a': 1}},
+             {'uuid': 'dev-2', 'info': '2024-01-01'}],
+            [json.loads(line) for line in stdout.getvalue().splitlines()])
+
+    def test_emit_empty_list(self):
+        stdout = io.StringIO()
+        formatters.NDJSONFormatter().emit_list(
+            ('uuid',), iter(()), stdout, argparse.Namespace())
+
+        self.assertEqual('', stdout.getvalue())
+
+
+class TestNDJSONMixin(testtools.TestCase):
+
+    def test_list_command_formats(self):
+        cmd = device.ListDevice(mock.Mock(), None)
+        parser = cmd.get_parser('accelerator device list')
+
+        self.assertIn('ndjson', cmd._formatter_plugins.names())
+        self.assertEqual('ndjson',
+                         parser.parse_args(['-f', 'ndjson']).formatter)
+        self.assertIsInstance(cmd._formatter_plugins['ndjson'].obj,
+                              formatters.NDJSONFormatter)
@@ -10,11 +10,25 @@
 # License for the specific language governing permissions and limitations
 # under the License.
 
+import argparse
+import datetime
+import os
+import stat
+from unittest import mock
+
+import fixtures
+from keystoneauth1 import fixture as ksa_fixture
+from openstack.config import loader as config_loader
 from openstack import connection as sdk_connection
+from openstack import exceptions as sdk_exc
+from requests_mock.contrib import fixture as rm_fixture
 import testtools
-from unittest import mock
 
+from cyborgclient.common import resources
+from cyborgclient.common import snapshot
+from cyborgclient import exceptions as exc
 from cyborgclient.osc import plugin
+from cyborgclient.tests.benchmarks import import_time
 
 
 class TestPlugin(testtools.TestCase):
@@ -70,3 +84,267 @@ class TestPlugin(testtools.TestCase):
             user_id='123'
         )
         self.assertEqual(mock_conn, res)
+
+
+class TestPluginImport(testtools.TestCase):
+
+    def test_import_only_loads_cyborgclient_modules(self):
+        # The openstack CLI imports the plugin for every command, anything
+        # else must be imported lazily.
+        result = import_time.measure()
+        self.assertEqual(
+            [],
+            [m for m in result['modules']
+             if m.split('.')[0] != 'cyborgclient'])
+        self.assertNotIn('cyborgclient.osc.v2', result['modules'])
+
+
+class TestTokenCache(testtools.TestCase):
+
+    AUTH_URL = 'http://keystone.example.com/v3'
+    ENDPOINT = 'http://cyborg.example.com/v2'
+
+    def setUp(self):
+        super(TestTokenCache, self).setUp()
+        self.cache_dir = self.useFixture(fixtures.TempDir()).path
+        self.useFixture(fixtures.EnvironmentVariable(
+            'OS_ACCELERATOR_CACHE_DIR', self.cache_dir))
+        self.requests = self.useFixture(rm_fixture.Fixture())
+        self.requests.get(self.AUTH_URL,
+                          json=ksa_fixture.V3Discovery(self.AUTH_URL))
+
+        token = ksa_fixture.V3Token(
+            expires=datetime.datetime.now(datetime.timezone.utc) +
+            datetime.timedelta(hours=1))
+        token.set_project_scope()
+        service = token.add_service('accelerator')
+        service.add_endpoint('public', self.ENDPOINT, region='RegionOne')
+        self.auth_request = self.requests.post(
+            self.AUTH_URL + '/auth/tokens', json=token,
+            headers={'X-Subject-Token': 'cached-token'})
+
+    def _cloud_region(self):
+        options = argparse.Namespace(
+            os_auth_type='password', os_auth_url=self.AUTH_URL,
+            os_username='user', os_password='secret',
+            os_project_name='project', os_user_domain_id='default',
+            os_project_domain_id='default', os_region_name='RegionOne',
+            os_accelerator_token_cache=True)
+        return config_loader.OpenStackConfig(
+            load_yaml_config=False, load_envvars=False).get_one(
+                argparse=options)
+
+    @mock.patch.object(sdk_connection, 'Connection')
+    def test_token_is_reused(self, mock_connection):
+        first = self._cloud_region()
+        plugin.create_connection(cloud_region=first, api_version='2.3')
+        self.assertEqual(1, self.auth_request.call_count)
+        requests_made = self.requests.call_count
+
+        second = self._cloud_region()
+        plugin.create_connection(cloud_region=second, api_version='2.3')
+        self.assertEqual(requests_made, self.requests.call_count)
+        self.assertEqual('cached-token', second.get_auth().get_token(None))
+        self.assertEqual(self.ENDPOINT,
+                         second.config['accelerator_endpoint_override'])
+
+        files = os.listdir(os.path.join(self.cache_dir, 'tokens'))
+        self.assertEqual(1, len(files))
+        mode = os.stat(os.path.join(self.cache_dir, 'tokens', files[0]))
+        self.assertEqual(0o600, stat.S_IMODE(mode.st_mode))
+
+    @mock.patch.object(sdk_connection, 'Connection')
+    def test_token_cache_disabled(self, mock_connection):
+        cloud_region = self._cloud_region()
+        cloud_region.config['accelerator_token_cache'] = False
+        plugin.create_connection(cloud_region=cloud_region,
+                                 api_version='2.3')
+        self.assertEqual(0, self.requests.call_count)
+        self.assertFalse(os.path.exists(
+            os.path.join(self.cache_dir, 'tokens')))
+
+
+class TestNegotiateApiVersion(testtools.TestCase):
+
+    ENDPOINT = 'http://cyborg.example.com/v2'
+
+    def setUp(self):
+        super(TestNegotiateApiVersion, self).setUp()
+        self.useFixture(fixtures.EnvironmentVariable(
+            'OS_ACCELERATOR_CACHE_DIR',
+            self.useFixture(fixtures.TempDir()).path))
+        self.requests = self.useFixture(rm_fixture.Fixture())
+        self.addCleanup(setattr, plugin, 'OS_ACCELERATOR_API_AUTO', False)
+
+    def _cloud_region(self):
+        options = argparse.Namespace(
+            os_auth_type='none',
+            os_accelerator_endpoint_override=self.ENDPOINT)
+        return config_loader.OpenStackConfig(
+            load_yaml_config=False, load_envvars=False).get_one(
+                argparse=options)
+
+    def _mock_version(self, max_version):
+        return self.requests.get(self.ENDPOINT, json={'version': {
+            'id': 'v2.0', 'status': 'CURRENT', 'min_version': '2.0',
+            'max_version': max_version,
+            'links': [{'rel': 'self', 'href': self.ENDPOINT}]}})
+
+    def test_auto_option(self):
+        parser = plugin.build_option_parser(argparse.ArgumentParser())
+        options = parser.parse_args(['--os-accelerator-api-version', 'auto'])
+        self.assertEqual(plugin.MAX_ACCELERATOR_API_VERSION,
+                         options.os_accelerator_api_version)
+        self.assertTrue(plugin.OS_ACCELERATOR_API_AUTO)
+
+        options = parser.parse_args(['--os-accelerator-api-version', '2.1'])
+        self.assertEqual('2.1', options.os_accelerator_api_version)
+        self.assertFalse(plugin.OS_ACCELERATOR_API_AUTO)
+
+    def test_negotiate_is_cached(self):
+        version_request = self._mock_version('2.1')
+
+        self.assertEqual(
+            '2.1', plugin._negotiate_api_version(self._cloud_region()))
+        self.assertEqual(
+            '2.1', plugin._negotiate_api_version(self._cloud_region()))
+        self.assertEqual(1, version_request.call_count)
+
+    def test_negotiate_newer_server(self):
+        self._mock_version('2.99')
+        self.assertEqual(
+            plugin.MAX_ACCELERATOR_API_VERSION,
+            plugin._negotiate_api_version(self._cloud_region()))
+
+    def test_negotiate_discovery_failure(self):
+        self.requests.get(self.ENDPOINT, status_code=500)
+        self.assertEqual(
+            plugin.DEFAULT_ACCELERATOR_API_VERSION,
+            plugin._negotiate_api_version(self._cloud_region()))
+
+    @mock.patch.object(sdk_connection, 'Connection')
+    def test_make_client_auto(self, mock_connection):
+        self._mock_version('2.2')
+        plugin.OS_ACCELERATOR_API_AUTO = True
+        instance = mock.Mock(_cli_options=self._cloud_region(),
+                             _api_version={'accelerator': '2.3'})
+
+        plugin.make_client(instance)
+
+        self.assertEqual(
+            '2.2',
+            instance._cli_options.config['accelerator_default_microversion'])
+        mock_connection.assert_called_once_with(
+            config=instance._cli_options, app_name=None, app_version=None,
+            api_version='2.2', accelerator_api_version='2')
+
+    def test_negotiate_unexpected_error(self):
+        self.requests.get(self.ENDPOINT, exc=RuntimeError('boom'))
+        self.assertRaises(RuntimeError, plugin._negotiate_api_version,
+                          self._cloud_region())
+
+    @mock.patch.object(sdk_connection, 'Connection')
+    def test_make_client_auto_overrides_config(self, mock_connection):
+        self._mock_version('2.2')
+        plugin.OS_ACCELERATOR_API_AUTO = True
+        cloud_region = self._cloud_region()
+        cloud_region.config['accelerator_default_microversion'] = '2.0'
+        instance = mock.Mock(_cli_options=cloud_region,
+                             _api_version={'accelerator': '2.3'})
+
+        plugin.make_client(instance)
+
+        self.assertEqual(
+            '2.2', cloud_region.config['accelerator_default_microversion'])
+
+    @mock.patch('cyborgclient.common.http_cache.install')
+    @mock.patch.object(sdk_connection, 'Connection')
+    def test_make_client_http_cache(self, mock_connection, mock_install):
+        cloud_region = self._cloud_region()
+        instance = mock.Mock(_cli_options=cloud_region,
+                             _api_version={'accelerator': '2.3'})
+
+        plugin.make_client(instance)
+        mock_install.assert_not_called()
+
+        cloud_region.config[plugin.HTTP_CACHE_OPTION] = True
+        client = plugin.make_client(instance)
+        mock_install.assert_called_once_with(client)
+
+    @mock.patch('cyborgclient.common.http_stats.install')
+    @mock.patch.object(sdk_connection, 'Connection')
+    def test_make_client_stats(self, mock_connection, mock_install):
+        cloud_region = self._cloud_region()
+        instance = mock.Mock(_cli_options=cloud_region,
+                             _api_version={'accelerator': '2.3'})
+
+        plugin.make_client(instance)
+        mock_install.assert_not_called()
+
+        cloud_region.config[plugin.STATS_OPTION] = True
+        client = plugin.make_client(instance)
+        mock_install.assert_called_once_with(cloud_region.get_session(),
+                                             auth_url=None)
+        self.assertEqual(client.get_endpoint.return_value,
+                         mock_install.return_value.endpoint)
+
+
+class TestSnapshotConnection(testtools.TestCase):
+
+    def setUp(self):
+        super(TestSnapshotConnection, self).setUp()
+        self.path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                                 'inventory.snap')
+        snapshot.write(self.path, {
+            'devices': [{'uuid': 'dev-1', 'hostname': 'host-1'},
+                        {'uuid': 'dev-2', 'hostname': 'host-2'}],
+            'device_profiles': [{'uuid': 'dp-1', 'name': 'profile'}],
+            'accelerator_requests': [{'uuid': 'arq-1', 'state': 'Bound',
+                                      'instance_uuid': 'instance-1'},
+                                     {'uuid': 'arq-2', 'state': 'Initial'}],
+        }, {'microversion': '2.2'})
+        self.instance = mock.Mock(
+            _cli_options=mock.Mock(
+                config={plugin.SNAPSHOT_OPTION: self.path}),
+            _api_version={'accelerator': '2.3'})
+
+    def test_make_client_from_snapshot(self):
+        acc_client = plugin.make_client(self.instance)
+
+        self.assertEqual('2.2', acc_client.default_microversion)
+        self.assertEqual(['dev-1', 'dev-2'],
+                         [device.uuid for device in acc_client.devices()])
+        self.assertEqual(['dev-2'], [device.uuid for device in
+                                     resources.Device.list(
+                                         acc_client, hostname='host-2')])
+        # arq-2 has no instance_uuid, so it does not match the filter.
+        self.assertEqual(['arq-1'], [arq.uuid for arq in
+                                     resources.AcceleratorRequest.list(
+                                         acc_client, instance='instance-1')])
+        self.assertEqual(['arq-1'], [arq.uuid for arq in
+                                     resources.AcceleratorRequest.list(
+                                         acc_client, bind_state='resolved')])
+        self.assertEqual('dp-1',
+                         acc_client.get_device_profile('profile').uuid)
+        self.assertRaises(sdk_exc.ResourceNotFound,
+                          acc_client.get_device, 'dev-3')
+        self.assertRaisesRegex(sdk_exc.HttpException, 'read only',
+                               acc_client.delete_device_profile, 'dp-1')
+
+    @mock.patch('atexit.register')
+    def test_make_client_from_snapshot_stats(self, mock_register):
+        self.instance._cli_options.config[plugin.STATS_OPTION] = True
+        acc_client = plugin.make_client(self.instance)
+        list(acc_client.devices())
+
+        stats = mock_register.call_args[0][0].__self__
+        self.assertEqual(
+            [('GET', plugin.SNAPSHOT_ENDPOINT + '/devices', 1)],
+            [row[:3] for row in stats.summary()])
+
+    def test_make_client_invalid_snapshot(self):
+        with open(self.path, 'w') as f:
+            f.write('not a snapshot')
+
+        self.assertRaises(exc.CommandError,
+                          plugin.make_client, self.instance)
@@ -11,11 +11,16 @@
 # under the License.
 #
 
-from cyborgclient.tests.unit.osc import fakes
-from osc_lib.tests import utils
+import os
 from unittest import mock
 import uuid
 
+import fixtures
+from osc_lib.tests import utils
+
+from cyborgclient.common import snapshot
+from cyborgclient.tests.unit.osc import fakes
+
 image_uuid = uuid.uuid4().hex
 deployable_created_at = '2019-06-24T00:00:00.000000+00:00'
 deployable_updated_at = '2019-06-24T11:11:11.111111+11:11'
@@ -133,6 +138,11 @@ class TestAccelerator(utils.TestCommand):
     def setUp(self):
         super(TestAccelerator, self).setUp()
 
+        self.useFixture(fixtures.EnvironmentVariable(
+            'OS_ACCELERATOR_CACHE_DIR',
+            self.useFixture(fixtures.TempDir()).path))
+        self.useFixture(fixtures.EnvironmentVariable(
+            'OS_ACCELERATOR_CACHE_TTL'))
         self.app.client_manager.auth_ref = mock.MagicMock(auth_token="TOKEN")
         self.app.client_manager.accelerator = mock.MagicMock()
         self.app.client_manager.image = mock.MagicMock()
@@ -142,3 +152,30 @@ class FakeAcceleratorResource(fakes.FakeResource):
 
     def get_keys(self):
         return {'property': 'value'}
+
+
+class SnapshotAccelerator(fixtures.Fixture):
+    """An accelerator proxy answering from a snapshot of ``collections``.
+
+    The snapshot is written to a temporary directory and served by a
+    :class:`cyborgclient.common.snapshot.SnapshotAdapter`, so the records
+    go through the SDK and the HTTP layer without any server. The proxy is
+    ``acc_client`` and the snapshot file ``path``.
+    """
+
+    endpoint = 'http://accelerator-snapshot.invalid/v2'
+
+    def __init__(self, collections, metadata=None):
+        super(SnapshotAccelerator, self).__init__()
+        self.collections = collections
+        self.metadata = metadata
+
+    def _setUp(self):
+        self.path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                                 'inventory.snap')
+        snapshot.write(self.path, self.collections, self.metadata)
+        snap = snapshot.Snapshot(self.path)
+        conn = snapshot.connect(
+            self.endpoint, snap.metadata.get('microversion') or '2.0',
+            snapshot.SnapshotAdapter(snap, self.endpoint))
+        self.acc_client = conn.accelerator
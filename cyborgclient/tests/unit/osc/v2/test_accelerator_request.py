@@ -11,10 +11,20 @@
 # under the License.
 #
 import copy
+import csv
+import io
+import json
+import os
+from unittest import mock
 
+import fixtures
 from openstack import exceptions as sdk_exc
+from osc_lib.tests import utils as tests_utils
 
+from cyborgclient.common import http_stats
+from cyborgclient.common import resources
 from cyborgclient import exceptions as exc
+from cyborgclient.osc import formatters
 from cyborgclient.osc.v2 import accelerator_request as osc_accelerator_request
 from cyborgclient.tests.unit.osc.v2 import fakes as acc_fakes
 
@@ -106,6 +116,26 @@ class TestAcceleratorRequestList(TestAcceleratorRequest):
         ), ]
         self.assertEqual(datalist, list(data))
 
+    def test_accelerator_request_list_streams_ndjson(self):
+        fetched = []
+
+        def accelerator_requests():
+            for uuid in ('arq-1', 'arq-2'):
+                fetched.append(uuid)
+                yield resources.AcceleratorRequest(uuid=uuid)
+        self.mock_acc_client.accelerator_requests.side_effect = (
+            accelerator_requests)
+        parsed_args = self.check_parser(self.cmd, [], [])
+        columns, data = self.cmd.take_action(parsed_args)
+        self.assertEqual([], fetched)
+
+        stdout = io.StringIO()
+        formatters.NDJSONFormatter().emit_list(columns, data, stdout,
+                                               parsed_args)
+        self.assertEqual(['arq-1', 'arq-2'],
+                         [json.loads(line)['uuid']
+                          for line in stdout.getvalue().splitlines()])
+
 
 class TestAcceleratorRequestDelete(TestAcceleratorRequest):
 
@@ -149,6 +179,40 @@ class TestAcceleratorRequestDelete(TestAcceleratorRequest):
         self.mock_acc_client.delete_accelerator_request.assert_called_with(
             accelerator_request_instance_uuid, False)
 
+    def test_accelerator_request_delete_concurrently(self):
+        uuids = ['arq-%d' % i for i in range(8)]
+
+        def fake_delete(uuid, ignore_missing):
+            if uuid == 'arq-3':
+                raise sdk_exc.ResourceNotFound
+
+        self.mock_acc_client.delete_accelerator_request.side_effect = \
+            fake_delete
+        arglist = ['--concurrency', '4'] + uuids
+        verifylist = [('concurrency', 4),
+                      ('accelerator_requests', uuids)]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+        result = self.assertRaises(exc.ClientException,
+                                   self.cmd.take_action,
+                                   parsed_args)
+
+        self.assertEqual(
+            "No accelerator_request with UUID arq-3 exists.", str(result))
+        self.mock_acc_client.delete_accelerator_request.assert_has_calls(
+            [mock.call(uuid, False) for uuid in uuids], any_order=True)
+        self.assertEqual(
+            len(uuids),
+            self.mock_acc_client.delete_accelerator_request.call_count)
+
+    def test_accelerator_request_delete_invalid_concurrency(self):
+        arglist = ['--concurrency', '0', acc_fakes.accelerator_request_uuid]
+        verifylist = []
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+        self.assertRaises(exc.CommandError,
+                          self.cmd.take_action,
+                          parsed_args)
+        self.mock_acc_client.delete_accelerator_request.assert_not_called()
+
 
 class TestAcceleratorRequestCreate(TestAcceleratorRequest):
 
@@ -177,6 +241,7 @@ class TestAcceleratorRequestCreate(TestAcceleratorRequest):
 
         self.mock_acc_client.create_accelerator_request.assert_called_with(
             **kwargs)
+        self.mock_acc_client.get_accelerator_request.assert_not_called()
 
         collist = (
             'uuid',
@@ -202,6 +267,69 @@ class TestAcceleratorRequestCreate(TestAcceleratorRequest):
         ]
         self.assertEqual(datalist, list(data))
 
+    def test_accelerator_request_create_refresh(self):
+        arglist = ["dp_name", "--refresh"]
+        verifylist = [('refresh', True)]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+        self.cmd.take_action(parsed_args)
+
+        self.mock_acc_client.get_accelerator_request.assert_called_once_with(
+            acc_fakes.accelerator_request_uuid)
+
+    def test_accelerator_request_create_count(self):
+        arqs = [acc_fakes.FakeAcceleratorResource(
+            None,
+            dict(acc_fakes.ACCELERATOR_REQUEST, uuid='arq-%d' % i),
+            loaded=True) for i in range(5)]
+        self.mock_acc_client.create_accelerator_request.side_effect = arqs
+        arglist = ["dp_name", "--count", "5", "--concurrency", "2"]
+        verifylist = [('count', 5), ('concurrency', 2)]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual(
+            5, self.mock_acc_client.create_accelerator_request.call_count)
+        self.mock_acc_client.get_accelerator_request.assert_not_called()
+        self.assertEqual(['arq-%d' % i for i in range(5)],
+                         sorted(row[0] for row in data))
+        self.assertFalse(self.cmd.failed)
+
+    def test_accelerator_request_create_count_output(self):
+        arqs = [acc_fakes.FakeAcceleratorResource(
+            None,
+            dict(acc_fakes.ACCELERATOR_REQUEST, uuid='arq-%d' % i),
+            loaded=True) for i in range(3)]
+        self.mock_acc_client.create_accelerator_request.side_effect = (
+            arqs[:2] + [sdk_exc.HttpException('boom')] + arqs[2:])
+        self.app.stdout = io.StringIO()
+        arglist = ["dp_name", "--count", "4", "-f", "value", "-c", "uuid"]
+        parsed_args = self.check_parser(self.cmd, arglist, [])
+
+        stats = http_stats.HTTPStats()
+        self.useFixture(fixtures.MockPatch(
+            'cyborgclient.common.http_stats._INSTALLED', [stats]))
+
+        self.assertEqual(1, self.cmd.run(parsed_args))
+        self.assertEqual(['arq-0', 'arq-1', 'arq-2'],
+                         sorted(self.app.stdout.getvalue().split()))
+        # The output is timed like the one of the other commands.
+        self.assertEqual(['output'], [name for name, _s, _e in stats.spans])
+
+    def test_accelerator_request_create_count_unknown_column(self):
+        self.mock_acc_client.create_accelerator_request.return_value = (
+            acc_fakes.FakeAcceleratorResource(
+                None, copy.deepcopy(acc_fakes.ACCELERATOR_REQUEST),
+                loaded=True))
+        arglist = ["dp_name", "--count", "2", "-c", "nonexistent"]
+        parsed_args = self.check_parser(self.cmd, arglist, [])
+        self.assertRaises(exc.CommandError, self.cmd.run, parsed_args)
+
+    def test_accelerator_request_create_count_shell_format(self):
+        arglist = ["dp_name", "--count", "2", "-f", "shell"]
+        parsed_args = self.check_parser(self.cmd, arglist, [])
+        self.assertRaises(exc.CommandError, self.cmd.run, parsed_args)
+        self.mock_acc_client.create_accelerator_request.assert_not_called()
+
 
 class TestAcceleratorRequestShow(TestAcceleratorRequest):
 
@@ -261,3 +389,299 @@ class TestAcceleratorRequestShow(TestAcceleratorRequest):
             'accelerator_request not found: ' +
             acc_fakes.accelerator_request_uuid,
             self.cmd.take_action, parsed_args)
+
+
+class TestAcceleratorRequestBind(TestAcceleratorRequest):
+
+    def setUp(self):
+        super(TestAcceleratorRequestBind, self).setUp()
+
+        self.fake_arq = acc_fakes.FakeAcceleratorResource(
+            None,
+            copy.deepcopy(acc_fakes.ACCELERATOR_REQUEST),
+            loaded=True)
+        self.mock_acc_client.get_accelerator_request.return_value = \
+            self.fake_arq
+        self.cmd = osc_accelerator_request.BindAcceleratorRequest(
+            self.app, None
+        )
+        self.arglist = [acc_fakes.accelerator_request_uuid,
+                        acc_fakes.accelerator_request_hostname,
+                        'instance-uuid', 'rp-uuid', 'project-id']
+
+    def test_accelerator_request_bind(self):
+        self.mock_acc_client.update_accelerator_request.return_value = \
+            self.fake_arq
+        parsed_args = self.check_parser(self.cmd, self.arglist, [])
+        columns, data = self.cmd.take_action(parsed_args)
+
+        update = self.mock_acc_client.update_accelerator_request
+        update.assert_called_once_with(
+            acc_fakes.accelerator_request_uuid,
+            [{'op': 'add', 'path': '/hostname',
+              'value': acc_fakes.accelerator_request_hostname},
+             {'op': 'add', 'path': '/instance_uuid',
+              'value': 'instance-uuid'},
+             {'op': 'add', 'path': '/device_rp_uuid', 'value': 'rp-uuid'}])
+        self.mock_acc_client.get_accelerator_request.assert_not_called()
+        self.assertIn(acc_fakes.accelerator_request_state, data)
+
+    def test_accelerator_request_bind_empty_response(self):
+        # The API answered with an empty body, only the id is known.
+        self.mock_acc_client.update_accelerator_request.return_value = \
+            acc_fakes.FakeAcceleratorResource(
+                None, {'uuid': acc_fakes.accelerator_request_uuid},
+                loaded=True)
+        parsed_args = self.check_parser(self.cmd, self.arglist, [])
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.mock_acc_client.get_accelerator_request.assert_called_once_with(
+            acc_fakes.accelerator_request_uuid)
+        self.assertIn(acc_fakes.accelerator_request_state, data)
+
+    def test_accelerator_request_bind_missing_arguments(self):
+        parsed_args = self.check_parser(
+            self.cmd, [acc_fakes.accelerator_request_uuid], [])
+        self.assertRaises(exc.CommandError,
+                          self.cmd.take_action, parsed_args)
+
+    def test_accelerator_request_bind_from_file_and_arguments(self):
+        self.assertRaises(tests_utils.ParserException, self.check_parser,
+                          self.cmd, ['--from-file', 'manifest.csv',
+                                     acc_fakes.accelerator_request_uuid],
+                          [])
+        self.assertRaises(tests_utils.ParserException, self.check_parser,
+                          self.cmd, [], [])
+
+    def test_accelerator_request_bind_usage(self):
+        usage = self.cmd.get_parser('bind').format_usage()
+
+        self.assertIn('<accelerator_request> <hostname> <instance_uuid> '
+                      '<device_rp_uuid> <project_id>\n', usage)
+        self.assertIn('--from-file <manifest>', usage)
+
+    def _write(self, name, content):
+        path = os.path.join(self.useFixture(fixtures.TempDir()).path, name)
+        with open(path, 'w') as f:
+            f.write(content)
+        return path
+
+    def _read_results(self, path):
+        with open(path) as f:
+            return list(csv.DictReader(f))
+
+    def test_accelerator_request_bind_from_csv(self):
+        manifest = self._write(
+            'manifest.csv',
+            'accelerator_request,hostname,instance_uuid,device_rp_uuid\n'
+            'arq-1,host-1,inst-1,rp-1\n'
+            'arq-2,host-2,inst-2,\n')
+        update = self.mock_acc_client.update_accelerator_request
+        update.side_effect = [self.fake_arq, sdk_exc.ConflictException('no')]
+        parsed_args = self.check_parser(
+            self.cmd, ['--from-file', manifest, '--concurrency', '1'],
+            [('from_file', manifest)])
+        columns, data = self.cmd.take_action(parsed_args)
+
+        update.assert_has_calls([
+            mock.call('arq-1', [
+                {'op': 'add', 'path': '/hostname', 'value': 'host-1'},
+                {'op': 'add', 'path': '/instance_uuid', 'value': 'inst-1'},
+                {'op': 'add', 'path': '/device_rp_uuid', 'value': 'rp-1'}]),
+            mock.call('arq-2', [
+                {'op': 'add', 'path': '/hostname', 'value': 'host-2'},
+                {'op': 'add', 'path': '/instance_uuid',
+                 'value': 'inst-2'}])])
+        summary = dict(zip(columns, data))
+        self.assertEqual((2, 1, 1), (summary['total'], summary['bound'],
+                                     summary['failed']))
+        self.assertEqual(manifest + '.results.csv', summary['result_file'])
+        results = self._read_results(summary['result_file'])
+        self.assertEqual([('1', 'arq-1', 'ok'), ('2', 'arq-2', 'failed')],
+                         [(r['row'], r['accelerator_request'], r['result'])
+                          for r in results])
+        self.assertTrue(self.cmd.failed)
+
+    def test_accelerator_request_bind_from_json_lines(self):
+        manifest = self._write(
+            'manifest.json',
+            '{"uuid": "arq-1", "hostname": "host-1"}\n'
+            '\n'
+            '{"uuid": "arq-2"}\n')
+        result_file = manifest + '.out'
+        parsed_args = self.check_parser(
+            self.cmd, ['--from-file', manifest, '--result-file', result_file,
+                       '--rate', '100'],
+            [('result_file', result_file), ('rate', 100)])
+        columns, data = self.cmd.take_action(parsed_args)
+
+        update = self.mock_acc_client.update_accelerator_request
+        update.assert_called_once_with(
+            'arq-1', [{'op': 'add', 'path': '/hostname', 'value': 'host-1'}])
+        results = self._read_results(result_file)
+        self.assertEqual(['ok', 'failed'], [r['result'] for r in results])
+        self.assertEqual('nothing to bind', results[1]['error'])
+
+    def test_accelerator_request_bind_from_json_array(self):
+        manifest = self._write(
+            'manifest.json',
+            ' [{"accelerator_request": "arq-1", "hostname": "host-1"}]')
+        parsed_args = self.check_parser(
+            self.cmd, ['--from-file', manifest], [])
+        columns, data = self.cmd.take_action(parsed_args)
+
+        update = self.mock_acc_client.update_accelerator_request
+        update.assert_called_once_with(
+            'arq-1', [{'op': 'add', 'path': '/hostname', 'value': 'host-1'}])
+        self.assertFalse(self.cmd.failed)
+
+    def test_accelerator_request_bind_from_json_array_not_objects(self):
+        manifest = self._write(
+            'manifest.json',
+            '["arq-1", {"uuid": "arq-2", "hostname": "host-2"}, null]')
+        parsed_args = self.check_parser(
+            self.cmd, ['--from-file', manifest], [])
+        columns, data = self.cmd.take_action(parsed_args)
+
+        update = self.mock_acc_client.update_accelerator_request
+        update.assert_called_once_with(
+            'arq-2', [{'op': 'add', 'path': '/hostname', 'value': 'host-2'}])
+        summary = dict(zip(columns, data))
+        self.assertEqual((3, 1, 2), (summary['total'], summary['bound'],
+                                     summary['failed']))
+        results = self._read_results(summary['result_file'])
+        self.assertEqual(['failed', 'ok', 'failed'],
+                         [r['result'] for r in results])
+        self.assertEqual('not an object: arq-1', results[0]['error'])
+        self.assertTrue(self.cmd.failed)
+
+    def test_accelerator_request_bind_from_json_array_streamed(self):
+        rows = [{'uuid': 'arq-%d' % i, 'hostname': 'host-%d' % i}
+                for i in range(20)]
+        manifest = io.StringIO(' [%s]' % ',\n '.join(
+            json.dumps(row) for row in rows))
+        items = osc_accelerator_request._iter_json_array(manifest, 16)
+
+        self.assertEqual(rows[0], next(items))
+        # Only the first item and the chunk after it were read.
+        self.assertLess(manifest.tell(), 2 * len(json.dumps(rows[0])))
+        self.assertEqual(rows[1:], list(items))
+
+    def test_accelerator_request_bind_from_json_array_chunk_boundaries(self):
+        text = (' [ {"uuid": "arq-\\"1\\"", "hostname": "h\\u00e9\\\\"},'
+                '[[1, [2.5e3, -0]], [], "],[,"], 12345 ,true,false,null,'
+                '{"nested": [{"x": "]"}], "n": -1.5E-2}\n]\n')
+        expected = json.loads(text)
+
+        for chunk_size in range(1, len(text) + 1):
+            self.assertEqual(
+                expected,
+                list(osc_accelerator_request._iter_json_array(
+                    io.StringIO(text), chunk_size)),
+                'chunk size %d' % chunk_size)
+
+    def test_accelerator_request_bind_from_json_array_errors(self):
+        for text in ('{}', '[1, 2', '[1 2]', '[1,]', '[', '[{"a": 1]',
+                     '["unterminated'):
+            for chunk_size in (1, 2, 3, 1024):
+                self.assertRaises(
+                    ValueError, list,
+                    osc_accelerator_request._iter_json_array(
+                        io.StringIO(text), chunk_size))
+
+    def test_accelerator_request_bind_from_invalid_json_array(self):
+        manifest = self._write('manifest.json', '[{"uuid": "arq-1"} {}]')
+        parsed_args = self.check_parser(
+            self.cmd, ['--from-file', manifest], [])
+        self.assertRaises(exc.CommandError,
+                          self.cmd.take_action, parsed_args)
+
+    def test_accelerator_request_bind_from_missing_file(self):
+        parsed_args = self.check_parser(
+            self.cmd, ['--from-file', '/nonexistent/manifest.csv'], [])
+        self.assertRaises(exc.CommandError,
+                          self.cmd.take_action, parsed_args)
+
+
+class TestAcceleratorRequestWait(TestAcceleratorRequest):
+
+    def setUp(self):
+        super(TestAcceleratorRequestWait, self).setUp()
+        self.cmd = osc_accelerator_request.WaitAcceleratorRequest(
+            self.app, None
+        )
+        self.sleep = self.useFixture(
+            fixtures.MockPatch('time.sleep')).mock
+
+    @staticmethod
+    def _arqs(*states):
+        return [acc_fakes.FakeAcceleratorResource(
+            None,
+            dict(acc_fakes.ACCELERATOR_REQUEST, uuid='arq-%d' % i,
+                 state=state),
+            loaded=True) for i, state in enumerate(states)]
+
+    @mock.patch.object(resources.AcceleratorRequest, 'list')
+    def test_accelerator_request_wait(self, mock_list):
+        mock_list.side_effect = [
+            self._arqs('Initial', 'Initial', 'Initial'),
+            self._arqs('Bound', 'Initial', 'Initial'),
+            self._arqs('Bound', 'Bound', 'Initial'),
+        ]
+        arglist = ['arq-0', 'arq-1']
+        parsed_args = self.check_parser(self.cmd, arglist, [])
+        columns, data = self.cmd.take_action(parsed_args)
+
+        # A single list call per poll, no GET per accelerator_request.
+        self.assertEqual([mock.call(self.mock_acc_client)] * 3,
+                         mock_list.call_args_list)
+        self.mock_acc_client.get_accelerator_request.assert_not_called()
+        self.assertEqual(2, self.sleep.call_count)
+        # Exponential backoff with jitter.
+        first, second = [c[0][0] for c in self.sleep.call_args_list]
+        self.assertTrue(0.5 <= first <= 1)
+        self.assertTrue(1 <= second <= 2)
+        self.assertEqual(['arq-0', 'arq-1'], [row[0] for row in data])
+        self.assertEqual(['Bound', 'Bound'], [row[1] for row in data])
+        self.assertFalse(self.cmd.failed)
+
+    @mock.patch.object(resources.AcceleratorRequest, 'list')
+    def test_accelerator_request_wait_instance(self, mock_list):
+        mock_list.return_value = self._arqs('Bound', 'BindFailed')
+        arglist = ['--instance', 'instance-uuid']
+        parsed_args = self.check_parser(self.cmd, arglist, [])
+        columns, data = self.cmd.take_action(parsed_args)
+
+        mock_list.assert_called_once_with(self.mock_acc_client,
+                                          instance='instance-uuid')
+        self.mock_acc_client.accelerator_requests.assert_not_called()
+        self.sleep.assert_not_called()
+        self.assertEqual(['Bound', 'BindFailed'], [row[1] for row in data])
+        self.assertTrue(self.cmd.failed)
+
+    @mock.patch.object(resources.AcceleratorRequest, 'list')
+    def test_accelerator_request_wait_timeout(self, mock_list):
+        mock_list.return_value = self._arqs('Initial')
+        self.useFixture(fixtures.MockPatch(
+            'time.monotonic', side_effect=[0, 301]))
+        parsed_args = self.check_parser(self.cmd, ['arq-0'], [])
+        self.assertRaisesRegex(
+            exc.CommandError,
+            'Timed out waiting for accelerator_request.*arq-0',
+            self.cmd.take_action, parsed_args)
+
+    @mock.patch.object(resources.AcceleratorRequest, 'list')
+    def test_accelerator_request_wait_not_found(self, mock_list):
+        mock_list.return_value = self._arqs('Initial')
+        parsed_args = self.check_parser(self.cmd, ['arq-2', 'arq-0', 'arq-3'],
+                                        [])
+        self.assertRaisesRegex(
+            exc.CommandError, 'accelerator_request not found: arq-2, arq-3',
+            self.cmd.take_action, parsed_args)
+
+    def test_accelerator_request_wait_not_positive(self):
+        for option in ('--timeout', '--poll-interval',
+                       '--max-poll-interval'):
+            self.assertRaises(tests_utils.ParserException,
+                              self.check_parser, self.cmd,
+                              ['arq-0', option, '0'], [])
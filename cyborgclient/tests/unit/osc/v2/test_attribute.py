@@ -113,6 +113,7 @@ class TestAttributeCreate(TestAttribute):
                   'key': 'traits1', 'value': 'CUSTOM_FAKE_DEVICE'}
 
         self.mock_acc_client.create_attribute.assert_called_with(**kwargs)
+        self.mock_acc_client.get_attribute.assert_not_called()
 
         collist = (
             "created_at",
@@ -135,6 +136,15 @@ class TestAttributeCreate(TestAttribute):
         ]
         self.assertEqual(datalist, list(data))
 
+    def test_attribute_create_refresh(self):
+        arglist = ['1', 'traits1', 'CUSTOM_FAKE_DEVICE', '--refresh']
+        verifylist = [('refresh', True)]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+        self.cmd.take_action(parsed_args)
+
+        self.mock_acc_client.get_attribute.assert_called_once_with(
+            acc_fakes.attribute_uuid)
+
 
 class TestAttributeShow(TestAttribute):
 
@@ -0,0 +1,85 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+
+from cyborgclient import exceptions as exc
+from cyborgclient.osc.v2 import capacity as osc_capacity
+from cyborgclient.tests.unit.osc.v2 import fakes as acc_fakes
+
+
+class TestCapacityShow(acc_fakes.TestAccelerator):
+
+    def setUp(self):
+        super(TestCapacityShow, self).setUp()
+
+        self.app.client_manager.accelerator = self.useFixture(
+            acc_fakes.SnapshotAccelerator({
+                'devices': [
+                    {'id': i, 'uuid': 'dev-%d' % i, 'hostname': 'host-%d' % i,
+                     'vendor': '10de', 'model': ('A100', 'T4')[i % 2]}
+                    for i in range(1, 5)],
+                'deployables': [
+                    {'uuid': 'dep-%d' % i, 'device_id': i,
+                     'num_accelerators': 4, 'rp_uuid': 'rp-%d' % i}
+                    for i in range(1, 5)],
+                'accelerator_requests': [
+                    {'uuid': 'arq-%d' % i, 'state': 'Bound',
+                     'hostname': 'host-%d' % (i % 3 + 1),
+                     'device_rp_uuid': 'rp-%d' % (i % 3 + 1),
+                     'device_profile_name': 'gpu'}
+                    for i in range(5)],
+            })).acc_client
+        self.cmd = osc_capacity.ShowCapacity(self.app, None)
+
+    def test_capacity_show(self):
+        parsed_args = self.check_parser(self.cmd, [],
+                                        [('group_by', 'host')])
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual(('hostname', 'devices', 'total', 'allocated',
+                          'free'), columns)
+        self.assertEqual([('host-1', 1, 4, 2, 2), ('host-2', 1, 4, 2, 2),
+                          ('host-3', 1, 4, 1, 3), ('host-4', 1, 4, 0, 4)],
+                         list(data))
+
+    def test_capacity_show_top(self):
+        parsed_args = self.check_parser(
+            self.cmd, ['--sort-column', 'free', '--sort-descending',
+                       '--top', '2'],
+            [('sort_columns', ['free']), ('top', 2)])
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual([('host-4', 1, 4, 0, 4), ('host-3', 1, 4, 1, 3)],
+                         list(data))
+
+    def test_capacity_show_per_model(self):
+        parsed_args = self.check_parser(
+            self.cmd, ['--group-by', 'model', '--sort-column', 'allocated'],
+            [('group_by', 'model')])
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual([('10de', 'A100', 2, 2, 8, 2, 6),
+                          ('10de', 'T4', 2, 2, 8, 3, 5)], list(data))
+
+    def test_capacity_show_unknown_sort_column(self):
+        parsed_args = self.check_parser(
+            self.cmd, ['--group-by', 'device_profile', '--sort-column',
+                       'free'], [])
+
+        self.assertRaises(exc.CommandError, self.cmd.take_action,
+                          parsed_args)
+
+    def test_capacity_show_invalid_top(self):
+        parsed_args = self.check_parser(self.cmd, ['--top', '0'], [])
+
+        self.assertRaises(exc.CommandError, self.cmd.take_action,
+                          parsed_args)
@@ -13,6 +13,7 @@
 
 
 import copy
+from unittest import mock
 
 from cyborgclient import exceptions as exc
 from cyborgclient.osc.v2 import deployable as osc_deployable
@@ -100,6 +101,41 @@ class TestDeployableList(TestDeployable):
         ), ]
         self.assertEqual(datalist, list(data))
 
+    def test_deployable_list_paginated(self):
+        self.mock_acc_client.deployables.return_value = iter([
+            acc_fakes.FakeAcceleratorResource(
+                None,
+                dict(acc_fakes.DEPLOYABLE, id='dep-%d' % i),
+                loaded=True)
+            for i in range(5)
+        ])
+        arglist = ['--limit', '3', '--page-size', '2', '--marker', 'dep-x']
+        verifylist = [('limit', 3), ('page_size', 2), ('marker', 'dep-x')]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.mock_acc_client.deployables.assert_called_with(
+            limit=2, marker='dep-x')
+        self.assertEqual(['dep-0', 'dep-1', 'dep-2'],
+                         [row[0] for row in data])
+
+    def test_deployable_list_limit_is_default_page_size(self):
+        arglist = ['--limit', '10']
+        verifylist = [('limit', 10)]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.mock_acc_client.deployables.assert_called_with(limit=10)
+        self.assertEqual(1, len(list(data)))
+
+    def test_deployable_list_invalid_page_size(self):
+        arglist = ['--page-size', '0']
+        verifylist = [('page_size', 0)]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+        self.assertRaises(exc.CommandError,
+                          self.cmd.take_action,
+                          parsed_args)
+
 
 class TestDeployableShow(TestDeployable):
 
@@ -175,6 +211,9 @@ class TestDeployableProgram(TestDeployable):
                          'op': 'replace'}]
         self.mock_acc_client.update_deployable.assert_called_with(
             acc_fakes.deployable_uuid, program_info)
+        # Only the existence check, the output is built from the response.
+        self.mock_acc_client.get_deployable.assert_called_once_with(
+            acc_fakes.deployable_uuid)
 
         collist = (
             'created_at',
@@ -193,6 +232,27 @@ class TestDeployableProgram(TestDeployable):
         ]
         self.assertEqual(datalist, list(data))
 
+    @mock.patch('cyborgclient.common.inventory.invalidate')
+    def test_deployable_program_invalidates_inventory(self, mock_invalidate):
+        arglist = [acc_fakes.deployable_uuid, acc_fakes.image_uuid]
+        parsed_args = self.check_parser(self.cmd, arglist, [])
+        self.cmd.take_action(parsed_args)
+
+        mock_invalidate.assert_called_once_with(self.mock_acc_client,
+                                                'deployables')
+
+    @mock.patch('cyborgclient.common.inventory.invalidate')
+    def test_deployable_program_failed_keeps_inventory(self,
+                                                       mock_invalidate):
+        self.mock_acc_client.update_deployable.side_effect = (
+            sdk_exc.HttpException)
+        arglist = [acc_fakes.deployable_uuid, acc_fakes.image_uuid]
+        parsed_args = self.check_parser(self.cmd, arglist, [])
+        self.assertRaises(sdk_exc.HttpException,
+                          self.cmd.take_action, parsed_args)
+
+        mock_invalidate.assert_not_called()
+
     def test_deployable_program_with_image_uuid_not_exist(self):
         get_arq_req = self.mock_image_client.get
         get_arq_req.side_effect = sdk_exc.ResourceNotFound
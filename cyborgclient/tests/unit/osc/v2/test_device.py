@@ -11,8 +11,17 @@
 # under the License.
 #
 import copy
+import io
+import json
+import os
+import pstats
+from unittest import mock
 
+import fixtures
 
+from cyborgclient.common import http_stats
+from cyborgclient.common import inventory
+from cyborgclient.common import resources
 from cyborgclient import exceptions as exc
 from cyborgclient.osc.v2 import device as osc_device
 from cyborgclient.tests.unit.osc.v2 import fakes as acc_fakes
@@ -106,6 +115,54 @@ class TestDeviceList(TestDevice):
         ), ]
         self.assertEqual(datalist, list(data))
 
+    @mock.patch.object(resources.Device, 'list')
+    def test_device_list_with_filters(self, mock_list):
+        mock_list.return_value = [
+            acc_fakes.FakeAcceleratorResource(
+                None,
+                copy.deepcopy(acc_fakes.DEVICE),
+                loaded=True)
+        ]
+        arglist = ['--hostname', acc_fakes.device_hostname,
+                   '--vendor', acc_fakes.device_vendor,
+                   '--status', 'enabled']
+        verifylist = [('hostname', acc_fakes.device_hostname),
+                      ('vendor', acc_fakes.device_vendor),
+                      ('status', 'enabled')]
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+        columns, data = self.cmd.take_action(parsed_args)
+
+        mock_list.assert_called_once_with(
+            self.mock_acc_client,
+            hostname=acc_fakes.device_hostname,
+            vendor=acc_fakes.device_vendor,
+            status='enabled')
+        self.mock_acc_client.devices.assert_not_called()
+        self.assertEqual(1, len(list(data)))
+
+    def test_device_list_cache(self):
+        self.mock_acc_client.devices.return_value = [
+            resources.Device(**acc_fakes.DEVICE)]
+        arglist = ['--cache-ttl', '60']
+        verifylist = [('cache_ttl', 60), ('no_cache', False)]
+        for _ in range(2):
+            parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+            columns, data = self.cmd.take_action(parsed_args)
+            data = list(data)
+
+        self.mock_acc_client.devices.assert_called_once_with()
+        self.assertEqual([acc_fakes.device_uuid], [row[0] for row in data])
+
+    def test_device_list_no_cache(self):
+        self.mock_acc_client.devices.return_value = [
+            resources.Device(**acc_fakes.DEVICE)]
+        arglist = ['--cache-ttl', '60', '--no-cache']
+        for _ in range(2):
+            parsed_args = self.check_parser(self.cmd, arglist, [])
+            self.cmd.take_action(parsed_args)
+
+        self.assertEqual(2, self.mock_acc_client.devices.call_count)
+
 
 class TestDeviceShow(TestDevice):
 
@@ -157,6 +214,27 @@ class TestDeviceShow(TestDevice):
         ]
         self.assertEqual(datalist, list(data))
 
+    def test_device_show_cache(self):
+        inventory_cache = inventory.InventoryCache(self.mock_acc_client, 60)
+        inventory_cache.list('devices',
+                             lambda: [resources.Device(**acc_fakes.DEVICE)])
+        arglist = [acc_fakes.device_uuid, '--cache-ttl', '60']
+        parsed_args = self.check_parser(self.cmd, arglist, [])
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.mock_acc_client.get_device.assert_not_called()
+        self.assertIn(acc_fakes.device_hostname, data)
+
+    def test_device_show_cache_miss(self):
+        inventory_cache = inventory.InventoryCache(self.mock_acc_client, 60)
+        inventory_cache.list('devices', lambda: [])
+        arglist = [acc_fakes.device_uuid, '--cache-ttl', '60']
+        parsed_args = self.check_parser(self.cmd, arglist, [])
+        self.cmd.take_action(parsed_args)
+
+        self.mock_acc_client.get_device.assert_called_once_with(
+            acc_fakes.device_uuid)
+
     def test_device_show_not_exist(self):
         get_arq_req = self.mock_acc_client.get_device
         get_arq_req.side_effect = sdk_exc.ResourceNotFound
@@ -167,3 +245,86 @@ class TestDeviceShow(TestDevice):
             exc.CommandError,
             'device not found: %s' % acc_fakes.device_uuid,
             self.cmd.take_action, parsed_args)
+
+
+class TestDeviceRaw(TestDevice):
+
+    def setUp(self):
+        super(TestDeviceRaw, self).setUp()
+
+        self.devices = [
+            {'uuid': 'dev-1', 'hostname': 'host-1', 'model': 'A'},
+            {'uuid': 'dev-2', 'hostname': 'host-1', 'model': 'B'},
+        ]
+        self.app.client_manager.accelerator = self.useFixture(
+            acc_fakes.SnapshotAccelerator(
+                {'devices': self.devices})).acc_client
+        self.app.stdout = io.StringIO()
+
+    def test_device_list_raw(self):
+        cmd = osc_device.ListDevice(self.app, None)
+        parsed_args = self.check_parser(
+            cmd, ['--raw', '--hostname', 'host-1', '--model', 'B'],
+            [('raw', True)])
+
+        self.assertEqual(0, cmd.run(parsed_args))
+        self.assertEqual('{"uuid":"dev-2","hostname":"host-1","model":"B"}\n',
+                         self.app.stdout.getvalue())
+
+    def test_device_show_raw(self):
+        cmd = osc_device.ShowDevice(self.app, None)
+        parsed_args = self.check_parser(cmd, ['--raw', 'dev-1'],
+                                        [('raw', True)])
+
+        self.assertEqual(0, cmd.run(parsed_args))
+        self.assertEqual(self.devices[0],
+                         json.loads(self.app.stdout.getvalue()))
+
+    def test_device_show_raw_not_exist(self):
+        cmd = osc_device.ShowDevice(self.app, None)
+        parsed_args = self.check_parser(cmd, ['--raw', 'dev-3'], [])
+
+        self.assertRaises(exc.CommandError, cmd.run, parsed_args)
+
+
+class TestDeviceProfiling(TestDevice):
+
+    def setUp(self):
+        super(TestDeviceProfiling, self).setUp()
+
+        self.mock_acc_client.devices.return_value = [
+            resources.Device(uuid='dev-1', hostname='host-1')]
+        self.app.stdout = io.StringIO()
+        self.app.stderr = io.StringIO()
+        self.cmd = osc_device.ListDevice(self.app, None)
+
+    def test_device_list_profile_out(self):
+        path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                            'profile.out')
+        parsed_args = self.check_parser(self.cmd, ['--profile-out', path],
+                                        [('profile_out', path)])
+        self.assertEqual(0, self.cmd.run(parsed_args))
+
+        self.assertIn('dev-1', self.app.stdout.getvalue())
+        # The output formatting is profiled along with take_action.
+        functions = {function for _, _, function in
+                     pstats.Stats(path).stats}
+        self.assertIn('take_action', functions)
+        self.assertIn('produce_output', functions)
+
+    def test_device_list_trace_memory(self):
+        parsed_args = self.check_parser(self.cmd, ['--trace-memory'],
+                                        [('trace_memory', True)])
+        self.assertEqual(0, self.cmd.run(parsed_args))
+
+        self.assertIn('dev-1', self.app.stdout.getvalue())
+        self.assertIn('Traced memory: peak', self.app.stderr.getvalue())
+
+    def test_device_list_output_span(self):
+        stats = http_stats.HTTPStats()
+        self.useFixture(fixtures.MockPatch(
+            'cyborgclient.common.http_stats._INSTALLED', [stats]))
+        parsed_args = self.check_parser(self.cmd, [], [])
+        self.assertEqual(0, self.cmd.run(parsed_args))
+
+        self.assertEqual(['output'], [name for name, _s, _e in stats.spans])
@@ -206,6 +206,7 @@ class TestDeviceProfileCreate(TestDeviceProfile):
         kwargs = {'name': 'test', 'groups': [], 'description': None}
 
         self.mock_acc_client.create_device_profile.assert_called_with(**kwargs)
+        self.mock_acc_client.get_device_profile.assert_not_called()
 
         collist = (
             'created_at',
@@ -227,6 +228,19 @@ class TestDeviceProfileCreate(TestDeviceProfile):
         ]
         self.assertEqual(datalist, list(data))
 
+    def test_device_profile_create_incomplete_response(self):
+        self.mock_acc_client.create_device_profile.return_value = \
+            acc_fakes.FakeAcceleratorResource(
+                None, {'uuid': acc_fakes.device_profile_uuid}, loaded=True)
+        arglist = ['test', '[]']
+        verifylist = []
+        parsed_args = self.check_parser(self.cmd, arglist, verifylist)
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.mock_acc_client.get_device_profile.assert_called_once_with(
+            acc_fakes.device_profile_uuid)
+        self.assertIn(acc_fakes.device_profile_name, data)
+
 
 class TestDeviceProfileDelete(TestDeviceProfile):
 
@@ -0,0 +1,155 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+import copy
+from unittest import mock
+
+import fixtures
+
+from cyborgclient.common import resources
+from cyborgclient import exceptions as exc
+from cyborgclient.osc.v2 import host as osc_host
+from cyborgclient.tests.unit.osc.v2 import fakes as acc_fakes
+
+
+def _resource(info, **kwargs):
+    info = copy.deepcopy(info)
+    info.update(kwargs)
+    return acc_fakes.FakeAcceleratorResource(None, info, loaded=True)
+
+
+class TestHost(acc_fakes.TestAccelerator):
+
+    def setUp(self):
+        super(TestHost, self).setUp()
+
+        self.mock_acc_client = self.app.client_manager.accelerator
+        self.mock_acc_client.reset_mock()
+
+        self.device = _resource(acc_fakes.DEVICE, status='enabled')
+        self.other_device = _resource(acc_fakes.DEVICE, id=2, uuid='dev-2',
+                                      hostname='other_host', status=None)
+        self.deployable = _resource(acc_fakes.DEPLOYABLE,
+                                    device_id=acc_fakes.device_id,
+                                    rp_uuid='rp-1')
+        self.arq = _resource(acc_fakes.ACCELERATOR_REQUEST,
+                             hostname=acc_fakes.device_hostname,
+                             device_rp_uuid='rp-1', instance_uuid='inst-1')
+        self.unbound_arq = _resource(acc_fakes.ACCELERATOR_REQUEST,
+                                     uuid='arq-2', hostname=None,
+                                     device_rp_uuid=None, instance_uuid=None)
+        self.attribute = _resource(acc_fakes.ATTRIBUTE,
+                                   deployable_id=acc_fakes.deployable_uuid)
+
+        self.mock_acc_client.devices.return_value = [self.device,
+                                                     self.other_device]
+        self.mock_acc_client.attributes.return_value = [self.attribute]
+        self.mock_acc_client.accelerator_requests.return_value = [
+            self.arq, self.unbound_arq]
+        self.mock_deployables = self.useFixture(fixtures.MockPatchObject(
+            resources.Deployable, 'list', return_value=[self.deployable]))
+
+
+class TestHostList(TestHost):
+
+    def setUp(self):
+        super(TestHostList, self).setUp()
+        self.cmd = osc_host.ListHost(self.app, None)
+
+    def test_host_list(self):
+        parsed_args = self.check_parser(self.cmd, [], [])
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.mock_acc_client.devices.assert_called_once_with()
+        self.mock_deployables.mock.assert_called_once_with(
+            self.mock_acc_client)
+        self.assertEqual(osc_host.ListHost.columns, columns)
+        self.assertEqual([
+            (acc_fakes.device_hostname, 1, 1,
+             acc_fakes.deployable_num_accelerators, 1, 1),
+            ('other_host', 1, 0, 0, 0, 0),
+        ], list(data))
+
+    def test_host_list_long(self):
+        parsed_args = self.check_parser(self.cmd, ['--long'],
+                                        [('detail', True)])
+        columns, data = self.cmd.take_action(parsed_args)
+
+        rows = [dict(zip(columns, row)) for row in data]
+        self.assertEqual(2, len(rows))
+        row = rows[0]
+        self.assertEqual(acc_fakes.device_hostname, row['hostname'])
+        self.assertEqual(acc_fakes.deployable_uuid, row['deployable_uuid'])
+        self.assertEqual({acc_fakes.attribute_key: acc_fakes.attribute_value},
+                         row['attributes'].machine_readable())
+        self.assertEqual([acc_fakes.accelerator_request_uuid],
+                         row['accelerator_requests'].machine_readable())
+        self.assertEqual(['inst-1'], row['instances'].machine_readable())
+        self.assertIsNone(rows[1]['deployable_uuid'])
+
+    @mock.patch.object(resources.Device, 'list')
+    def test_host_list_hostname(self, mock_list):
+        mock_list.return_value = [self.device]
+        parsed_args = self.check_parser(
+            self.cmd, ['--hostname', acc_fakes.device_hostname], [])
+        columns, data = self.cmd.take_action(parsed_args)
+
+        mock_list.assert_called_once_with(
+            self.mock_acc_client, hostname=acc_fakes.device_hostname)
+        self.mock_acc_client.devices.assert_not_called()
+        self.assertEqual([acc_fakes.device_hostname],
+                         [row[0] for row in data])
+
+
+class TestHostShow(TestHost):
+
+    def setUp(self):
+        super(TestHostShow, self).setUp()
+        self.cmd = osc_host.ShowHost(self.app, None)
+        self.mock_devices = self.useFixture(fixtures.MockPatchObject(
+            resources.Device, 'list', return_value=[self.device])).mock
+
+    def test_host_show(self):
+        parsed_args = self.check_parser(
+            self.cmd, [acc_fakes.device_hostname], [])
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual(osc_host.ShowHost.columns, columns)
+        host = dict(zip(columns, data))
+        self.assertEqual(acc_fakes.device_hostname, host['hostname'])
+        devices = host['devices'].machine_readable()
+        self.assertEqual([acc_fakes.device_uuid],
+                         [device['uuid'] for device in devices])
+        deployable = devices[0]['deployables'][0]
+        self.assertEqual('rp-1', deployable['rp_uuid'])
+        self.assertEqual(
+            [acc_fakes.accelerator_request_uuid],
+            [arq['uuid'] for arq in deployable['accelerator_requests']])
+        self.assertEqual([], host['accelerator_requests'].machine_readable())
+
+    def test_host_show_arq_on_unknown_rp(self):
+        self.arq.device_rp_uuid = 'rp-unknown'
+        parsed_args = self.check_parser(
+            self.cmd, [acc_fakes.device_hostname], [])
+        columns, data = self.cmd.take_action(parsed_args)
+
+        host = dict(zip(columns, data))
+        self.assertEqual(
+            [acc_fakes.accelerator_request_uuid],
+            [arq['uuid']
+             for arq in host['accelerator_requests'].machine_readable()])
+
+    def test_host_show_not_found(self):
+        self.mock_devices.return_value = []
+        parsed_args = self.check_parser(self.cmd, ['unknown'], [])
+        self.assertRaisesRegex(exc.CommandError, 'Host unknown not found',
+                               self.cmd.take_action, parsed_args)
@@ -0,0 +1,146 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+import os
+
+import fixtures
+from openstack.accelerator.v2 import attribute as _attribute
+from openstack import exceptions as sdk_exc
+
+from cyborgclient.common import export
+from cyborgclient.common import resources
+from cyborgclient import exceptions as exc
+from cyborgclient.osc.v2 import inventory as osc_inventory
+from cyborgclient.tests.unit.osc.v2 import fakes as acc_fakes
+
+
+class TestInventory(acc_fakes.TestAccelerator):
+
+    def setUp(self):
+        super(TestInventory, self).setUp()
+
+        self.mock_acc_client = self.app.client_manager.accelerator
+        self.mock_acc_client.reset_mock()
+        self.mock_acc_client.get_endpoint.return_value = 'http://cyborg/v2'
+        self.mock_acc_client.get_project_id.return_value = 'project'
+
+
+class TestInventorySync(TestInventory):
+
+    def setUp(self):
+        super(TestInventorySync, self).setUp()
+
+        self.devices = [
+            resources.Device(uuid='dev-1', updated_at='2024-01-01T00:00:00'),
+            resources.Device(uuid='dev-2', created_at='2024-01-02T00:00:00'),
+        ]
+        self.mock_acc_client.devices.side_effect = lambda: self.devices
+        self.mock_acc_client.attributes.return_value = [
+            _attribute.Attribute(uuid='attr-1', key='traits', value='A')]
+        self.useFixture(fixtures.MockPatchObject(
+            resources.Deployable, 'list', return_value=[]))
+        self.cmd = osc_inventory.SyncInventory(self.app, None)
+
+    def _sync(self, *arglist):
+        parsed_args = self.check_parser(self.cmd, list(arglist), [])
+        columns, rows = self.cmd.take_action(parsed_args)
+        self.assertEqual(osc_inventory.SyncInventory.columns, columns)
+        return sorted(rows)
+
+    def test_inventory_sync(self):
+        self.assertEqual([
+            ('add', 'attributes', 'attr-1', None),
+            ('add', 'devices', 'dev-1', '2024-01-01T00:00:00'),
+            ('add', 'devices', 'dev-2', '2024-01-02T00:00:00'),
+        ], self._sync())
+        self.assertEqual([], self._sync())
+
+        self.devices = [
+            resources.Device(uuid='dev-1', updated_at='2024-02-01T00:00:00'),
+            resources.Device(uuid='dev-3', created_at='2024-02-02T00:00:00'),
+        ]
+        self.assertEqual([
+            ('add', 'devices', 'dev-3', '2024-02-02T00:00:00'),
+            ('delete', 'devices', 'dev-2', '2024-01-02T00:00:00'),
+            ('update', 'devices', 'dev-1', '2024-02-01T00:00:00'),
+        ], self._sync())
+        self.assertEqual([], self._sync())
+
+    def test_inventory_sync_without_timestamps(self):
+        self._sync('--collection', 'attributes')
+        self.mock_acc_client.attributes.return_value = [
+            _attribute.Attribute(uuid='attr-1', key='traits', value='B')]
+
+        self.assertEqual([('update', 'attributes', 'attr-1', None)],
+                         self._sync('--collection', 'attributes'))
+        self.mock_acc_client.devices.assert_not_called()
+
+    def test_inventory_sync_reset(self):
+        self._sync('--collection', 'devices')
+
+        self.assertEqual(['add', 'add'],
+                         [row[0] for row in self._sync('--collection',
+                                                       'devices', '--reset')])
+
+
+class TestInventoryExport(TestInventory):
+
+    def setUp(self):
+        super(TestInventoryExport, self).setUp()
+
+        self.directory = self.useFixture(fixtures.TempDir()).path
+        self.app.client_manager.accelerator = self.useFixture(
+            acc_fakes.SnapshotAccelerator({
+                'devices': [{'uuid': 'dev-1', 'hostname': 'host-1'}],
+                'attributes': [{'uuid': 'attr-1', 'deployable_id': 1}],
+            })).acc_client
+        self.cmd = osc_inventory.ExportInventory(self.app, None)
+
+    def test_inventory_export(self):
+        parsed_args = self.check_parser(
+            self.cmd, [self.directory],
+            [('directory', self.directory), ('file_format', 'csv')])
+        self.cmd.take_action(parsed_args)
+
+        self.assertEqual(
+            sorted('%s.csv' % name for name in (
+                'devices', 'deployables', 'attributes', 'device_profiles',
+                'accelerator_requests')),
+            sorted(os.listdir(self.directory)))
+        with open(os.path.join(self.directory, 'attributes.csv')) as f:
+            self.assertEqual(['uuid,deployable_id,key,value,created_at,'
+                              'updated_at', 'attr-1,1,,,,'],
+                             f.read().splitlines())
+
+    def test_inventory_export_collection(self):
+        parsed_args = self.check_parser(
+            self.cmd, [self.directory, '--collection', 'devices'],
+            [('collections', ['devices'])])
+        self.cmd.take_action(parsed_args)
+
+        self.assertEqual(['devices.csv'], os.listdir(self.directory))
+
+    def test_inventory_export_not_a_directory(self):
+        path = os.path.join(self.directory, 'missing')
+        parsed_args = self.check_parser(self.cmd, [path], [])
+
+        self.assertRaises(exc.CommandError, self.cmd.take_action,
+                          parsed_args)
+
+    def test_inventory_export_http_error(self):
+        self.useFixture(fixtures.MockPatchObject(
+            export, 'export',
+            side_effect=sdk_exc.HttpException('Service Unavailable')))
+        parsed_args = self.check_parser(self.cmd, [self.directory], [])
+
+        self.assertRaisesRegex(exc.CommandError, 'Service Unavailable',
+                               self.cmd.take_action, parsed_args)
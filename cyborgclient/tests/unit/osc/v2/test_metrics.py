@@ -0,0 +1,68 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+import io
+import os
+
+import fixtures
+
+from cyborgclient import exceptions as exc
+from cyborgclient.osc.v2 import metrics as osc_metrics
+from cyborgclient.tests.unit.osc.v2 import fakes as acc_fakes
+
+
+class TestMetricsExport(acc_fakes.TestAccelerator):
+
+    def setUp(self):
+        super(TestMetricsExport, self).setUp()
+
+        self.directory = self.useFixture(fixtures.TempDir()).path
+        self.app.client_manager.accelerator = self.useFixture(
+            acc_fakes.SnapshotAccelerator({
+                'devices': [{'id': 1, 'uuid': 'dev-1', 'hostname': 'host-1',
+                             'vendor': '10de', 'status': 'enabled'}],
+                'deployables': [{'uuid': 'dep-1', 'device_id': 1,
+                                 'num_accelerators': 2}],
+                'accelerator_requests': [{'uuid': 'arq-1', 'state': 'Bound',
+                                          'hostname': 'host-1',
+                                          'device_profile_name': 'gpu'}],
+            })).acc_client
+        self.app.stdout = io.StringIO()
+        self.cmd = osc_metrics.ExportMetrics(self.app, None)
+
+    def test_metrics_export_textfile(self):
+        path = os.path.join(self.directory, 'cyborg.prom')
+        parsed_args = self.check_parser(self.cmd, ['--textfile', path],
+                                        [('textfile', path)])
+        self.cmd.take_action(parsed_args)
+
+        with open(path) as f:
+            lines = f.read().splitlines()
+        self.assertIn('cyborg_accelerators{hostname="host-1"} 2', lines)
+        self.assertIn('cyborg_accelerators_in_use{hostname="host-1"} 1',
+                      lines)
+        self.assertEqual('# EOF', lines[-1])
+        self.assertEqual('', self.app.stdout.getvalue())
+
+    def test_metrics_export_stdout(self):
+        parsed_args = self.check_parser(self.cmd, [], [('textfile', None)])
+        self.cmd.take_action(parsed_args)
+
+        self.assertIn('cyborg_devices{hostname="host-1",status="enabled",'
+                      'vendor="10de"} 1\n', self.app.stdout.getvalue())
+
+    def test_metrics_export_write_error(self):
+        path = os.path.join(self.directory, 'missing', 'cyborg.prom')
+        parsed_args = self.check_parser(self.cmd, ['--textfile', path], [])
+
+        self.assertRaises(exc.CommandError, self.cmd.take_action,
+                          parsed_args)
@@ -0,0 +1,138 @@
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+import os
+import zlib
+
+import fixtures
+from openstack.accelerator.v2 import device_profile as _device_profile
+
+from cyborgclient.common import resources
+from cyborgclient.common import snapshot
+from cyborgclient import exceptions as exc
+from cyborgclient.osc.v2 import snapshot as osc_snapshot
+from cyborgclient.tests.unit.osc.v2 import fakes as acc_fakes
+
+
+class TestSnapshotSave(acc_fakes.TestAccelerator):
+
+    def setUp(self):
+        super(TestSnapshotSave, self).setUp()
+
+        self.mock_acc_client = self.app.client_manager.accelerator
+        self.mock_acc_client.reset_mock()
+        self.mock_acc_client.get_endpoint.return_value = 'http://cyborg/v2'
+        self.mock_acc_client.default_microversion = '2.2'
+        self.mock_acc_client.devices.return_value = [
+            resources.Device(uuid='dev-1', hostname='host-1')]
+        self.mock_acc_client.attributes.return_value = []
+        self.mock_acc_client.device_profiles.return_value = [
+            _device_profile.DeviceProfile(uuid='dp-1', name='profile')]
+        self.mock_acc_client.accelerator_requests.return_value = [
+            resources.AcceleratorRequest(uuid='arq-1')]
+        self.useFixture(fixtures.MockPatchObject(
+            resources.Deployable, 'list', return_value=[
+                resources.Deployable(uuid='dep-1', device_id=1)]))
+        self.path = os.path.join(self.useFixture(fixtures.TempDir()).path,
+                                 'inventory.snap')
+        self.cmd = osc_snapshot.SaveSnapshot(self.app, None)
+
+    def test_snapshot_save(self):
+        parsed_args = self.check_parser(self.cmd, [self.path],
+                                        [('file', self.path)])
+        columns, data = self.cmd.take_action(parsed_args)
+
+        result = dict(zip(columns, data))
+        self.assertEqual(os.path.getsize(self.path), result['size'])
+        self.assertEqual([1, 1, 0, 1, 1],
+                         [result[name] for name in snapshot.COLLECTIONS])
+
+        snap = snapshot.Snapshot(self.path)
+        self.addCleanup(snap.close)
+        self.assertEqual('2.2', snap.metadata['microversion'])
+        self.assertEqual('http://cyborg/v2', snap.metadata['endpoint'])
+        self.assertEqual('host-1', snap.get('devices', 'dev-1')['hostname'])
+        self.assertEqual(1, snap.get('deployables', 'dep-1')['device_id'])
+        self.assertEqual('dp-1', snap.get('device_profiles',
+                                          'profile')['uuid'])
+
+    def test_snapshot_save_failure(self):
+        path = os.path.join(self.path, 'missing', 'inventory.snap')
+        parsed_args = self.check_parser(self.cmd, [path], [('file', path)])
+
+        self.assertRaises(exc.CommandError, self.cmd.take_action, parsed_args)
+
+    def test_snapshot_save_streams(self):
+        self.useFixture(fixtures.MockPatchObject(snapshot, 'CHUNK_SIZE', 1))
+        compress = self.useFixture(fixtures.MockPatch(
+            'zlib.compress', wraps=zlib.compress)).mock
+        compressed = []
+
+        def devices():
+            for i in range(3):
+                yield resources.Device(uuid='dev-%d' % i)
+                compressed.append(compress.call_count)
+        self.mock_acc_client.devices.side_effect = devices
+        parsed_args = self.check_parser(self.cmd, [self.path], [])
+        columns, data = self.cmd.take_action(parsed_args)
+
+        self.assertEqual(3, dict(zip(columns, data))['devices'])
+        # Each chunk is written before the next records are listed.
+        self.assertEqual([1, 2, 3], compressed)
+
+
+class TestSnapshotDiff(acc_fakes.TestAccelerator):
+
+    def setUp(self):
+        super(TestSnapshotDiff, self).setUp()
+
+        directory = self.useFixture(fixtures.TempDir()).path
+        self.old = os.path.join(directory, 'old.snap')
+        self.new = os.path.join(directory, 'new.snap')
+        snapshot.write(self.old, {
+            'devices': [{'uuid': 'dev-1', 'status': 'enabled'}],
+            'deployables': [{'uuid': 'dep-1', 'num_accelerators': 1}],
+        })
+        snapshot.write(self.new, {
+            'devices': [{'uuid': 'dev-1', 'status': 'disabled'}],
+            'deployables': [{'uuid': 'dep-2', 'num_accelerators': 1}],
+        })
+        self.cmd = osc_snapshot.DiffSnapshot(self.app, None)
+
+    def test_snapshot_diff(self):
+        parsed_args = self.check_parser(self.cmd, [self.old, self.new],
+                                        [('old', self.old),
+                                         ('new', self.new)])
+        columns, rows = self.cmd.take_action(parsed_args)
+
+        self.assertEqual(osc_snapshot.DiffSnapshot.columns, columns)
+        self.assertEqual([
+            ('update', 'devices', 'dev-1', 'status', 'enabled', 'disabled'),
+            ('add', 'deployables', 'dep-2', None, None, None),
+            ('delete', 'deployables', 'dep-1', None, None, None),
+        ], rows)
+
+    def test_snapshot_diff_collection(self):
+        arglist = [self.old, self.new, '--collection', 'deployables']
+        parsed_args = self.check_parser(self.cmd, arglist,
+                                        [('collections', ['deployables'])])
+        columns, rows = self.cmd.take_action(parsed_args)
+
+        self.assertEqual(['deployables', 'deployables'],
+                         [row[1] for row in rows])
+
+    def test_snapshot_diff_invalid_file(self):
+        with open(self.new, 'w') as f:
+            f.write('not a snapshot')
+        parsed_args = self.check_parser(self.cmd, [self.old, self.new], [])
+
+        self.assertRaises(exc.CommandError, self.cmd.take_action, parsed_args)